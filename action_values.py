@@ -0,0 +1,100 @@
+"""
+Valoración xT de todas las acciones con balón en una sola pasada vectorizada.
+Cada evento recibe el cambio de xT que produce su acción, con las coordenadas
+canónicas (cada equipo ataca hacia x=100):
+- pase / centro exitoso: xT(destino) - xT(origen); fallido u offside: -xT(origen)
+- regate exitoso: xT donde el mismo equipo vuelve a tocar el balón en la cadena - xT(origen);
+  fallido: -xT(origen)
+- recuperación, intercepción, entrada ganada, captura del arquero: +xT(lugar)
+- pérdida (desposesión, mal control): -xT(lugar)
+Los carries se suman aparte sobre el evento donde terminan (el jugador que conduce),
+salvo los que arrancan en un regate exitoso, que ya están en el valor del regate.
+Los tipos de evento son los códigos Opta de opta_events.json (constantes de match_events).
+"""
+
+import numpy as np
+
+from match_events import (PASS, OFFSIDE_PASS, TAKE_ON, TACKLE, INTERCEPTION, CLAIM, BALL_RECOVERY,
+                          DISPOSSESSED, KEEPER_PICKUP, BALL_TOUCH, has_qualifier)
+from event_query import query
+from xt_calculator import get_xt_values
+
+Q_CROSS = 2
+# Categorías de acción valoradas (índice = código guardado en 'action_kind')
+ACTION_KINDS = ('none', 'pass', 'cross', 'take_on', 'recovery', 'loss')
+PASS_TYPES = (PASS, OFFSIDE_PASS)
+RECOVERY_TYPES = (BALL_RECOVERY, INTERCEPTION, TACKLE, CLAIM, KEEPER_PICKUP)
+LOSS_TYPES = (DISPOSSESSED, BALL_TOUCH)
+
+
+def action_kinds(events):
+    """Categoría de acción de cada evento (índice en ACTION_KINDS)"""
+    type_id, outcome = events['type_id'], events['outcome']
+    kind = np.zeros(len(type_id), dtype=np.int8)
+    is_pass = np.isin(type_id, PASS_TYPES)
+    kind[is_pass] = ACTION_KINDS.index('pass')
+    kind[is_pass & has_qualifier(events, Q_CROSS)] = ACTION_KINDS.index('cross')
+    kind[type_id == TAKE_ON] = ACTION_KINDS.index('take_on')
+    # Una entrada fallida no recupera el balón; un toque solo cuenta si pierde el control
+    kind[np.isin(type_id, RECOVERY_TYPES) & ((type_id != TACKLE) | outcome)] = ACTION_KINDS.index('recovery')
+    kind[np.isin(type_id, LOSS_TYPES) & ((type_id != BALL_TOUCH) | ~outcome)] = ACTION_KINDS.index('loss')
+    kind[events['team'] < 0] = 0
+    return kind
+
+
+def compute_action_values(events, chains, carries):
+    """xT por evento: 'action_xt' (la acción) y 'carry_xt' (conducciones que terminan en el evento)"""
+    n = len(events['type_id'])
+    x, y = np.nan_to_num(events['x']), np.nan_to_num(events['y'])
+    kind = action_kinds(events)
+    outcome = events['outcome']
+    start = get_xt_values(x, y).astype(np.float32)
+    value = np.zeros(n, dtype=np.float32)
+
+    moves = np.isin(kind, (ACTION_KINDS.index('pass'), ACTION_KINDS.index('cross')))
+    failed = moves & (~outcome | (events['type_id'] == OFFSIDE_PASS))
+    done = moves & ~failed & ~np.isnan(events['end_x']) & ~np.isnan(events['end_y'])
+    value[done] = get_xt_values(events['end_x'][done], events['end_y'][done]) - start[done]
+    value[failed] = -start[failed]
+
+    # Regate exitoso: el balón viaja hasta la siguiente acción de control de la misma cadena
+    take_on = kind == ACTION_KINDS.index('take_on')
+    chain_id = chains['chain_id']
+    control = np.flatnonzero(chain_id >= 0)
+    won = np.flatnonzero(take_on & outcome & (chain_id >= 0))
+    nxt = np.searchsorted(control, won, side='right')
+    has_next = nxt < len(control)
+    nxt = np.where(has_next, control[np.minimum(nxt, len(control) - 1)], 0)
+    has_next &= chain_id[nxt] == chain_id[won]
+    value[won[has_next]] = start[nxt[has_next]] - start[won[has_next]]
+    value[take_on & ~outcome] = -start[take_on & ~outcome]
+
+    recovery = kind == ACTION_KINDS.index('recovery')
+    value[recovery] = start[recovery]
+    loss = kind == ACTION_KINDS.index('loss')
+    value[loss] = -start[loss]
+
+    carry_xt = np.zeros(n, dtype=np.float32)
+    from_take_on = np.isin(carries['carry_start_event'], won[has_next])
+    np.add.at(carry_xt, carries['carry_end_event'][~from_take_on], carries['carry_xt'][~from_take_on])
+    return {'action_kind': kind, 'action_xt': value, 'carry_xt': carry_xt}
+
+
+def event_xt(values):
+    """xT total de cada evento (acción + conducciones que terminan en él)"""
+    return values['action_xt'] + values['carry_xt']
+
+
+def season_action_xt(by='player_id', competition=None, season=None, processed_dir=None):
+    """xT por jugador (o equipo) y categoría en todo el archivo: suma agrupada sobre la tabla de eventos"""
+    df = query(competition=competition, season=season, processed_dir=processed_dir,
+               columns=[by, 'action_kind', 'action_xt', 'carry_xt'])
+    if df is None:
+        return None
+    df = df[df[by] != '']
+    table = df.pivot_table(index=by, columns='action_kind', values='action_xt', aggfunc='sum', fill_value=0.0)
+    table = table.reindex(columns=range(1, len(ACTION_KINDS)), fill_value=0.0)
+    table.columns = list(ACTION_KINDS[1:])
+    table['carry'] = df.groupby(by)['carry_xt'].sum()
+    table['total'] = table.sum(axis=1)
+    return table.sort_values('total', ascending=False)
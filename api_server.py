@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local (asyncio) que expone redes de pases y xT en JSON.
+Reutiliza las mismas funciones de extracción y red que la app (pass_network, sin Streamlit),
+con caché de respuestas, ETag / GET condicional y cálculo en un pool de procesos
+(un partido por tarea; los agregados de equipo suman las redes de cada partido).
+min_minute / max_minute son minutos absolutos del partido (reloj Opta: el 2do tiempo
+va de 45 a 90+), igual que el slider de la app.
+
+Endpoints:
+    GET /health
+    GET /catalog?country=&competition=&season=&team=&limit=
+    GET /matches/<match_id>/network?period=&min_minute=&max_minute=
+    GET /teams/<team_name>/aggregates?competition=&season=
+
+Uso: python api_server.py --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from raw_storage import DEFAULT_RAW_DIR, match_key
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error'
+}
+
+
+# ===== CÁLCULO (se ejecuta en el pool de procesos) =====
+
+def _network_to_json(positions, connections):
+    """Convierte la salida de calculate_pass_network_positions a nodos y aristas JSON"""
+    nodes = []
+    for player_id, pos in positions.items():
+        nodes.append({
+            'player_id': player_id,
+            'name': pos['name'],
+            'x': round(float(pos['x']), 2),
+            'y': round(float(pos['y']), 2),
+            'passes': int(pos['passes']),
+            'xt': round(float(pos['xt']), 5)
+        })
+    edges = []
+    for (passer, receiver), conn in connections.items():
+        edges.append({
+            'passer_id': passer,
+            'receiver_id': receiver,
+            'count': int(conn['count']),
+            'xt': round(float(conn['xt']), 5)
+        })
+    edges.sort(key=lambda e: e['count'], reverse=True)
+    return nodes, edges
+
+
+def load_events(json_path, match_id=None):
+    """Eventos normalizados: desde el store mapeado si el partido es del catálogo"""
+    from match_events import read_match_file, normalize_events
+    if match_id is None:
+        return normalize_events(read_match_file(json_path))
+    from ingest import ingest_match
+    from processed_store import load_arrays
+    try:
+        ingest_match(json_path, match_id, stages=['events'])
+    except ValueError:
+        return None
+    # Vistas de solo lectura: los workers comparten las páginas del archivo
+    return load_arrays('events', match_id)
+
+
+def compute_match_network(json_path, period=None, time_range=None, match_id=None):
+    """Calcula la red de pases de ambos equipos de un partido (time_range en minutos absolutos)"""
+    from pass_network import extract_passes_from_events, calculate_pass_network_positions
+    events = load_events(json_path, match_id)
+    if events is None:
+        return None
+    players = dict(zip(events['player_ids'].tolist(), events['player_names'].tolist()))
+    result = {'format': str(events['format']), 'teams': []}
+    for team, (team_id, team_name) in enumerate(zip(events['team_ids'].tolist(), events['team_names'].tolist())):
+        passes = extract_passes_from_events(events, team, period, time_range)
+        positions, connections = calculate_pass_network_positions(passes, players)
+        nodes, edges = _network_to_json(positions, connections)
+        total = len(passes['x'])
+        successful = int(passes['outcome'].sum())
+        result['teams'].append({
+            'team_id': team_id,
+            'name': team_name,
+            'passes': total,
+            'successful_passes': successful,
+            'accuracy': round(successful / total * 100, 2) if total else 0.0,
+            'xt': round(float(passes['xt'].sum()), 5),
+            'nodes': nodes,
+            'edges': edges
+        })
+    return result
+
+
+def compute_team_aggregates(bodies, team_name):
+    """Suma pases, precisión y xT por jugador de un equipo desde las redes serializadas de cada partido"""
+    totals = {'team': team_name, 'matches': 0, 'passes': 0, 'successful_passes': 0, 'xt': 0.0}
+    players = {}
+    for body in bodies:
+        network = json.loads(body)
+        for team in network['teams']:
+            if team['name'].lower() != team_name.lower():
+                continue
+            totals['matches'] += 1
+            totals['passes'] += team['passes']
+            totals['successful_passes'] += team['successful_passes']
+            totals['xt'] += team['xt']
+            for node in team['nodes']:
+                player = players.setdefault(node['player_id'], {
+                    'player_id': node['player_id'], 'name': node['name'],
+                    'matches': 0, 'passes': 0, 'xt': 0.0
+                })
+                player['matches'] += 1
+                player['passes'] += node['passes']
+                player['xt'] += node['xt']
+    totals['accuracy'] = round(totals['successful_passes'] / totals['passes'] * 100, 2) if totals['passes'] else 0.0
+    totals['xt'] = round(totals['xt'], 5)
+    for player in players.values():
+        player['xt'] = round(player['xt'], 5)
+    totals['players'] = sorted(players.values(), key=lambda p: p['xt'], reverse=True)
+    return totals
+
+
+def encode_response(result):
+    """Serializa un resultado y calcula su ETag (fuera del event loop)"""
+    body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+    return '"' + hashlib.sha1(body).hexdigest() + '"', body
+
+
+def file_versions(paths):
+    """Tamaño + mtime de cada archivo fuente ('missing' si no existe)"""
+    versions = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            versions.append(f'{stat.st_size}:{stat.st_mtime_ns}')
+        except OSError:
+            versions.append('missing')
+    return versions
+
+
+# ===== SERVIDOR =====
+
+class ResponseCache:
+    """Caché LRU de respuestas serializadas con su ETag"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, body, etag=None):
+        if etag is None:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self._entries[key] = (etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return etag, body
+
+
+class ApiServer:
+    """Servidor HTTP/1.1 mínimo sobre asyncio.start_server"""
+
+    def __init__(self, raw_dir=DEFAULT_RAW_DIR, workers=None, cache_entries=256):
+        self.raw_dir = Path(raw_dir)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.cache = ResponseCache(cache_entries)
+        self._catalog = None
+        self._catalog_mtime = None
+        self._inflight = {}
+
+    # --- Catálogo ---
+
+    def load_catalog(self):
+        """Carga matches_metadata.json global, recargando si cambió en disco"""
+        metadata_file = self.raw_dir / 'matches_metadata.json'
+        if not metadata_file.exists():
+            return []
+        mtime = metadata_file.stat().st_mtime_ns
+        if self._catalog is None or mtime != self._catalog_mtime:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                catalog = json.load(f)
+            for match in catalog:
+                match['filepath'] = match.get('filepath', '').replace('\\', '/')
+            catalog.sort(key=lambda m: m.get('date', ''), reverse=True)
+            self._catalog = catalog
+            self._catalog_mtime = mtime
+        return self._catalog
+
+    def filter_catalog(self, params):
+        matches = self.load_catalog()
+        for field in ('country', 'competition', 'season'):
+            value = params.get(field)
+            if value:
+                matches = [m for m in matches
+                           if value in (m.get(field), m.get('competition_full_name' if field == 'competition' else field))]
+        team = params.get('team')
+        if team:
+            matches = [m for m in matches if team.lower() in m.get('description', '').lower()]
+        return matches
+
+    @staticmethod
+    def match_id(match):
+        """Id del partido en data/processed"""
+        return match_key(match)
+
+    def find_match(self, match_id):
+        for match in self.load_catalog():
+            if match_key(match) == match_id:
+                return match
+        return None
+
+    async def _source_versions(self, paths):
+        """Identidad de cada archivo fuente (tamaño + mtime), leída en un hilo para no bloquear el loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, file_versions, paths)
+
+    @staticmethod
+    def _network_key(match_id, version, period=None, time_range=None):
+        return ('network', match_id, version, period, time_range)
+
+    async def _run_cached(self, key, func, *args):
+        """Ejecuta func en el pool una sola vez por clave (coalesce peticiones simultáneas)"""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, func, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await task
+
+    async def _compute(self, key, func, *args):
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, func, *args)
+        if result is None:
+            return None
+        etag, body = await loop.run_in_executor(None, encode_response, result)
+        return self.cache.put(key, body, etag)
+
+    # --- Endpoints ---
+
+    async def handle_catalog(self, params):
+        matches = self.filter_catalog(params)
+        limit = int(params.get('limit', 0) or 0)
+        if limit > 0:
+            matches = matches[:limit]
+        key = ('catalog', self._catalog_mtime, tuple(sorted(params.items())))
+        cached = self.cache.get(key)
+        if cached is None:
+            body = json.dumps({'count': len(matches), 'matches': matches}, ensure_ascii=False).encode('utf-8')
+            cached = self.cache.put(key, body)
+        return 200, cached
+
+    async def handle_network(self, match_id, params):
+        match = self.find_match(match_id)
+        if match is None:
+            return 404, None
+        json_path = self.raw_dir / match['filepath']
+        period = int(params['period']) if params.get('period') else None
+        time_range = None
+        if params.get('min_minute') or params.get('max_minute'):
+            time_range = (int(params.get('min_minute') or 0), int(params.get('max_minute') or 120))
+        version, = await self._source_versions([json_path])
+        key = self._network_key(match_id, version, period, time_range)
+        cached = await self._run_cached(key, compute_match_network, str(json_path), period, time_range,
+                                        self.match_id(match))
+        if cached is None:
+            return 404, None
+        return 200, cached
+
+    async def handle_team(self, team_name, params):
+        matches = self.filter_catalog({**params, 'team': team_name})
+        if not matches:
+            return 404, None
+        paths = [str(self.raw_dir / m['filepath']) for m in matches]
+        versions = await self._source_versions(paths)
+        key = ('team', team_name.lower(), hashlib.sha1('|'.join(versions).encode()).hexdigest(),
+               tuple(sorted(params.items())))
+        cached = self.cache.get(key)
+        if cached is None:
+            # Un partido por tarea del pool (redes compartidas con /matches/<id>/network)
+            networks = await asyncio.gather(*(
+                self._run_cached(self._network_key(self.match_id(m), version), compute_match_network,
+                                 path, None, None, self.match_id(m))
+                for m, path, version in zip(matches, paths, versions)))
+            bodies = [body for _, body in filter(None, networks)]
+            loop = asyncio.get_running_loop()
+            totals = await loop.run_in_executor(None, compute_team_aggregates, bodies, team_name)
+            etag, body = await loop.run_in_executor(None, encode_response, totals)
+            cached = self.cache.put(key, body, etag)
+        return 200, cached
+
+    async def route(self, method, target, headers):
+        if method != 'GET':
+            return 405, None
+        url = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+        if parts == ['health']:
+            return 200, (None, b'{"status": "ok"}')
+        if parts == ['catalog']:
+            return await self.handle_catalog(params)
+        if len(parts) == 3 and parts[0] == 'matches' and parts[2] == 'network':
+            return await self.handle_network(parts[1], params)
+        if len(parts) == 3 and parts[0] == 'teams' and parts[2] == 'aggregates':
+            return await self.handle_team(parts[1], params)
+        return 404, None
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._send(writer, 400, None, {})
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    status, payload = await self.route(method, target, headers)
+                except (ValueError, KeyError):
+                    status, payload = 400, None
+                except Exception as e:
+                    print(f"⚠️  Error procesando {target}: {e}")
+                    status, payload = 500, None
+                if status == 200 and payload and payload[0] and headers.get('if-none-match') == payload[0]:
+                    status = 304
+                await self._send(writer, status, payload, headers)
+                if headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status, payload, headers):
+        etag, body = payload if payload else (None, None)
+        if body is None and status != 304:
+            body = json.dumps({'error': STATUS_TEXT.get(status, '')}).encode('utf-8')
+        if status == 304:
+            body = b''
+        lines = [f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}',
+                 'Content-Type: application/json; charset=utf-8',
+                 f'Content-Length: {len(body)}',
+                 'Cache-Control: no-cache']
+        if etag:
+            lines.append(f'ETag: {etag}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"🚀 API escuchando en http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API HTTP de redes de pases y xT')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help='Procesos para el cálculo (por defecto: CPUs)')
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--cache-entries', type=int, default=256)
+    args = parser.parse_args()
+    server = ApiServer(args.raw_dir, args.workers, args.cache_entries)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@
 # Versión: 1.3 - Sistema de análisis de fútbol con OPTA F24 (SIN PLOTLY)
 # ACTUALIZADO: 26 Enero 2025
 import streamlit as st
+import os
 import sys
+import time
 from pathlib import Path
 
 # Agregar carpeta Codigos al path
@@ -18,6 +20,52 @@ st.set_page_config(
 
 # Importar módulos de pestañas
 from passing_network_tab import show_passing_network_tab
+from match_stats_tab import show_match_stats_tab
+from xt_analysis_tab import show_xt_analysis_tab
+from shot_analysis_tab import show_shot_analysis_tab
+from carry_analysis_tab import show_carry_analysis_tab
+from ingest_daemon import read_status
+
+# Precalentamiento opcional de la caché con los partidos más recientes
+if os.environ.get('FUTBOL_PREWARM') == '1':
+    from prewarm import start_background_prewarm
+    start_background_prewarm()
+
+def _ago(seconds):
+    """Duración legible: '12 s', '3 min', '2 h'"""
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.0f} h"
+
+def show_ingest_status():
+    """Estado del demonio de ingesta (ingest_daemon.py) en la barra lateral"""
+    status = read_status()
+    if status is None:
+        return
+    st.subheader("🛰️ Ingesta automática")
+    if status['stale']:
+        st.warning(f"⚠️ Sin señales del demonio hace {_ago(status['age_s'])}: el catálogo puede estar desactualizado")
+    elif status['state'] == 'stopped':
+        st.info("⏸️ Demonio detenido (`python ingest_daemon.py`)")
+    elif status['state'] == 'ingesting':
+        st.info(f"⏳ Ingiriendo {status['completed']}/{status['queued']} partidos")
+    elif status['state'] == 'materializing':
+        st.info("🧮 Actualizando tablas y agregados")
+    else:
+        st.success(f"✅ Catálogo al día · {status['matches']} partidos")
+    if status.get('pending'):
+        st.caption(f"🕒 {status['pending']} archivos esperando terminar de copiarse")
+    batch = status.get('last_batch')
+    if batch:
+        st.caption(f"Última tanda hace {_ago(time.time() - batch['finished_at'])}: "
+                   f"{batch['ingested']} nuevos, {batch['removed']} eliminados, {batch['errors']} errores")
+    if status.get('recent_errors'):
+        with st.expander(f"⚠️ {len(status['recent_errors'])} errores recientes"):
+            for error in status['recent_errors'][-5:]:
+                st.caption(f"{error['filepath']}: {error['error']}")
+    st.markdown("---")
 
 def main():
     """Aplicación principal de Streamlit"""
@@ -54,6 +102,7 @@ def main():
             st.info("💡 Crea una carpeta 'data' y coloca tus archivos F24 JSON")
         
         st.markdown("---")
+        show_ingest_status()
         st.caption("Powered by OPTA Data & Streamlit")
     
     # Crear pestañas principales
@@ -69,53 +118,21 @@ def main():
     with tabs[0]:
         show_passing_network_tab()
     
-    # Pestaña 2: Match Stats (placeholder)
+    # Pestaña 2: Match Stats
     with tabs[1]:
-        st.header("📊 Match Statistics")
-        st.info("🚧 Esta sección estará disponible próximamente")
-        st.markdown("""
-        **Funcionalidades planeadas:**
-        - Comparación de estadísticas entre equipos
-        - Gráficos de posesión por zona
-        - Métricas de presión
-        - Análisis de transiciones
-        """)
+        show_match_stats_tab()
     
-    # Pestaña 3: xT Analysis (placeholder)
+    # Pestaña 3: xT Analysis
     with tabs[2]:
-        st.header("📈 Expected Threat Analysis")
-        st.info("🚧 Esta sección estará disponible próximamente")
-        st.markdown("""
-        **Funcionalidades planeadas:**
-        - Mapa de calor de xT
-        - Jugadores con mayor xT
-        - Análisis de progresión de balón
-        - Zonas de peligro
-        """)
+        show_xt_analysis_tab()
     
-    # Pestaña 4: Shot Analysis (placeholder)
+    # Pestaña 4: Shot Analysis
     with tabs[3]:
-        st.header("🎯 Shot Analysis")
-        st.info("🚧 Esta sección estará disponible próximamente")
-        st.markdown("""
-        **Funcionalidades planeadas:**
-        - Mapa de tiros (Shot map)
-        - xG por jugador
-        - Análisis de finalizaciones
-        - Comparación de porteros
-        """)
+        show_shot_analysis_tab()
     
-    # Pestaña 5: Carry Analysis (placeholder)
+    # Pestaña 5: Carry Analysis
     with tabs[4]:
-        st.header("🏃 Carry Analysis")
-        st.info("🚧 Esta sección estará disponible próximamente")
-        st.markdown("""
-        **Funcionalidades planeadas:**
-        - Mapa de carries
-        - Distancias recorridas con balón
-        - Carries progresivos
-        - Jugadores más dinámicos
-        """)
+        show_carry_analysis_tab()
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Pipeline por streaming para trabajos sobre todo el archivo en memoria acotada.
+Los partidos del catálogo pasan de a uno por generadores encadenados:
+    fuente (catálogo + filtros) -> decodificación (etapas del store) -> map -> agregación
+La decodificación carga las etapas pedidas de cada partido (vistas mapeadas del store,
+solo los arrays de `keys`; si se pasa raw_dir, ingiere los partidos que falten). Un
+partido sin alguna etapa requerida se descarta y se informa; las etapas `optional` que
+falten llegan como None. Los map reducen cada partido a lo que necesita el trabajo
+antes de seguir. Con workers > 0 decodificación y map corren en
+un pool de procesos con contrapresión: solo hay `prefetch` partidos en vuelo, y menos si
+el tamaño medio de los resultados haría superar el techo de memoria. Cada etapa informa
+partidos, MB y partidos por segundo.
+
+Uso: python archive_pipeline.py --job {xg,event-table} [--workers 2] [--memory-mb 512] [--season 2025]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from processed_store import load_arrays
+from raw_storage import match_key
+
+PIPELINE_MEMORY_MB = int(os.environ.get('FUTBOL_PIPELINE_MEMORY_MB', 512))
+PIPELINE_WORKERS = int(os.environ.get('FUTBOL_PIPELINE_WORKERS', 0))
+# Partidos en vuelo por worker cuando el techo de memoria lo permite
+PIPELINE_PREFETCH = int(os.environ.get('FUTBOL_PIPELINE_PREFETCH', 2))
+
+
+def payload_bytes(value):
+    """Tamaño aproximado en memoria de un resultado (arrays, tablas Arrow, DataFrames y contenedores)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pa.Table, pa.RecordBatch, pa.Array, pa.ChunkedArray)):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(payload_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def peak_memory_mb():
+    """Memoria residente pico del proceso (None si el sistema no la informa)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageStats:
+    """Contadores de una etapa: partidos, bytes producidos y segundos de trabajo"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def add(self, seconds, size=0):
+        self.items += 1
+        self.seconds += seconds
+        self.bytes += size
+
+    def rate(self):
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.name}: {self.items} partidos, {self.bytes / 1e6:.1f} MB, "
+                f"{self.seconds:.1f}s de trabajo ({self.rate():.1f} partidos/s)")
+
+
+def process_match(match, stages, maps, raw_dir=None, processed_dir=None, optional=(), keys=None):
+    """Decodifica un partido y le aplica los map (en el proceso actual o en un worker).
+
+    keys: {etapa: arrays a cargar}. Devuelve (partido, valor, tiempos por etapa, error);
+    valor None = descartado.
+    """
+    timings = []
+    t0 = time.perf_counter()
+    keys = keys or {}
+    try:
+        if raw_dir is not None:
+            # Import diferido: ingest importa módulos que a su vez usan este pipeline
+            from ingest import load_stage
+            arrays = {stage: load_stage(match, stage, raw_dir, processed_dir, keys.get(stage))
+                      for stage in stages + optional}
+        else:
+            match_id = match_key(match)
+            arrays = {stage: load_arrays(stage, match_id, processed_dir, keys.get(stage))
+                      for stage in stages + optional}
+        value = None if any(arrays[stage] is None for stage in stages) else arrays
+        timings.append(('decode', time.perf_counter() - t0, payload_bytes(value)))
+        for func in maps:
+            if value is None:
+                break
+            t0 = time.perf_counter()
+            value = func(match, value)
+            timings.append((func.__name__.lstrip('_'), time.perf_counter() - t0, payload_bytes(value)))
+    except Exception as e:
+        return match, None, timings, str(e)
+    return match, value, timings, None
+
+
+class ArchivePipeline:
+    """Recorre el catálogo en streaming: filter() y map() encadenan etapas, run() agrega"""
+
+    def __init__(self, catalog, stages=('events',), raw_dir=None, processed_dir=None,
+                 workers=PIPELINE_WORKERS, memory_mb=PIPELINE_MEMORY_MB, prefetch=PIPELINE_PREFETCH,
+                 optional=(), keys=None):
+        self.catalog = catalog
+        self.stages = tuple(stages)
+        self.optional = tuple(optional)
+        self.keys = dict(keys or {})
+        self.raw_dir = str(raw_dir) if raw_dir is not None else None
+        self.processed_dir = str(processed_dir) if processed_dir is not None else None
+        self.workers = max(0, workers)
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.prefetch = max(1, prefetch)
+        self.filters = []
+        self.maps = []
+        self.stats = {}
+        self.errors = []
+        self.discarded = []
+        self.consumed = 0
+        self.elapsed = 0.0
+
+    def filter(self, predicate):
+        """Descarta partidos por su metadata antes de decodificarlos"""
+        self.filters.append(predicate)
+        return self
+
+    def map(self, func):
+        """func(partido, valor) -> nuevo valor (None lo descarta); con workers debe ser de módulo"""
+        self.maps.append(func)
+        return self
+
+    def _stage(self, name):
+        if name not in self.stats:
+            self.stats[name] = StageStats(name)
+        return self.stats[name]
+
+    def _source(self):
+        for match in self.catalog:
+            if all(predicate(match) for predicate in self.filters):
+                yield match
+
+    def _collect(self, result):
+        match, value, timings, error = result
+        for name, seconds, size in timings:
+            self._stage(name).add(seconds, size)
+        if error is not None:
+            self.errors.append((match.get('filepath', ''), error))
+            print(f"  ⚠️  Error procesando {match.get('filepath', '')}: {error}")
+        elif value is None:
+            self.discarded.append(match.get('filepath', ''))
+        return match, value
+
+    def _max_in_flight(self):
+        """Partidos en vuelo permitidos: prefetch por worker, limitado por el techo de memoria"""
+        limit = self.prefetch * self.workers
+        decoded = self.stats.get(self.maps[-1].__name__.lstrip('_') if self.maps else 'decode')
+        if decoded is not None and decoded.items and decoded.bytes:
+            limit = min(limit, int(self.memory_bytes // (decoded.bytes / decoded.items)))
+        return max(1, limit)
+
+    def _pooled(self, matches):
+        context = multiprocessing.get_context('spawn')
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            for match in matches:
+                # Contrapresión: no se encola otro partido hasta que el consumidor libere lugar
+                while len(pending) >= self._max_in_flight():
+                    yield self._collect(pending.popleft().result())
+                pending.append(pool.submit(process_match, match, self.stages, self.maps,
+                                           self.raw_dir, self.processed_dir, self.optional, self.keys))
+            while pending:
+                yield self._collect(pending.popleft().result())
+
+    def stream(self):
+        """Genera (partido, valor) en el orden del catálogo, sin retener partidos ya consumidos"""
+        t0 = time.perf_counter()
+        if self.workers:
+            results = self._pooled(self._source())
+        else:
+            results = (self._collect(process_match(match, self.stages, self.maps, self.raw_dir,
+                                                   self.processed_dir, self.optional, self.keys))
+                       for match in self._source())
+        try:
+            for match, value in results:
+                if value is not None:
+                    self.consumed += 1
+                    yield match, value
+        finally:
+            self.elapsed += time.perf_counter() - t0
+
+    def run(self, reduce, initial=None):
+        """Agrega el stream con reduce(acumulado, partido, valor) -> acumulado"""
+        accumulated = initial
+        aggregate = self._stage('aggregate')
+        for match, value in self.stream():
+            t0 = time.perf_counter()
+            accumulated = reduce(accumulated, match, value)
+            aggregate.add(time.perf_counter() - t0)
+        return accumulated
+
+    def report(self):
+        """Imprime el rendimiento de cada etapa y el total"""
+        for stats in self.stats.values():
+            print(f"  📈 {stats}")
+        if self.discarded:
+            shown = ', '.join(self.discarded[:5]) + (' ...' if len(self.discarded) > 5 else '')
+            print(f"  🗑️  {len(self.discarded)} partidos descartados (sin {', '.join(self.stages)} "
+                  f"o sin datos para el trabajo): {shown}")
+        rate = self.consumed / self.elapsed if self.elapsed > 0 else 0.0
+        peak = peak_memory_mb()
+        print(f"  ⏱️  {self.consumed} partidos en {self.elapsed:.1f}s ({rate:.1f} partidos/s, "
+              f"{self.workers or 'sin'} workers, techo {self.memory_bytes / 1048576:.0f} MB"
+              + (f", pico {peak:.0f} MB)" if peak is not None else ")"))
+
+
+def memory_batches(items, memory_bytes, size=payload_bytes):
+    """Agrupa un stream en listas cuyo tamaño total no supera memory_bytes (al menos un elemento)"""
+    batch, total = [], 0
+    for item in items:
+        item_bytes = size(item)
+        if batch and total + item_bytes > memory_bytes:
+            yield batch
+            batch, total = [], 0
+        batch.append(item)
+        total += item_bytes
+    if batch:
+        yield batch
+
+
+def main():
+    from ingest import DEFAULT_RAW_DIR, load_catalog
+    from processed_store import DEFAULT_PROCESSED_DIR
+    parser = argparse.ArgumentParser(description='Trabajos sobre todo el archivo en memoria acotada')
+    parser.add_argument('--job', choices=('xg', 'event-table'), required=True)
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--processed-dir', default=str(DEFAULT_PROCESSED_DIR))
+    parser.add_argument('--workers', type=int, default=PIPELINE_WORKERS, help='Procesos (0 = en este proceso)')
+    parser.add_argument('--memory-mb', type=int, default=PIPELINE_MEMORY_MB, help='Techo de memoria en vuelo')
+    parser.add_argument('--competition')
+    parser.add_argument('--season')
+    args = parser.parse_args()
+    catalog = [m for m in load_catalog(args.raw_dir)
+               if (args.competition is None or args.competition in (m.get('competition'),
+                                                                    m.get('competition_full_name')))
+               and (args.season is None or str(m.get('season')) == str(args.season))]
+    options = {'workers': args.workers, 'memory_mb': args.memory_mb}
+    if args.job == 'xg':
+        from xg_model import train_from_corpus
+        train_from_corpus(args.raw_dir, args.processed_dir, catalog=catalog, **options)
+    else:
+        from event_query import materialize_event_table
+        rows = materialize_event_table(catalog, args.processed_dir, verbose=True, **options)
+        print(f"✅ Tabla de eventos: {rows} filas")
+
+
+if __name__ == "__main__":
+    main()
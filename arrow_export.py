@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Exportación de eventos normalizados, qualifiers, pases y redes a Arrow IPC (Feather v2).
+Un archivo sin comprimir por partido y tabla, particionado estilo Hive:
+    <salida>/<tabla>/competition=<comp>/season=<temp>/<match_id>.arrow
+Los archivos se pueden abrir con memory-map sin copiar (pyarrow.memory_map,
+pyarrow.feather.read_table(memory_map=True), polars.scan_ipc). _manifest.json guarda la
+identidad de cada partido exportado: una exportación incremental solo reescribe
+los partidos nuevos o modificados.
+
+Uso: python arrow_export.py --output data/exports [--competition X] [--season 2025] [--force]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+
+from ingest import DEFAULT_RAW_DIR, events_identity, ingest_match, load_catalog, stage_version
+from match_events import PASS, qualifier_rows
+from processed_store import load_arrays, temp_path
+from raw_storage import match_key
+from xt_calculator import get_xt_values
+
+DEFAULT_EXPORT_DIR = Path(__file__).parent / 'data' / 'exports'
+EXPORT_TABLES = ('events', 'qualifiers', 'passes', 'network_nodes', 'network_edges')
+EXPORT_VERSION = 1
+MANIFEST = '_manifest.json'
+
+
+def _ids(values, index):
+    """Ids (str) por fila desde un índice local (-1 = vacío) como columna diccionario"""
+    index = np.asarray(index)
+    labels = np.append(np.asarray(values, dtype=str), '')
+    return pa.DictionaryArray.from_arrays(pa.array(np.where(index >= 0, index, len(labels) - 1), pa.int32()),
+                                          pa.array(labels))
+
+
+def match_tables(events, network, match_id):
+    """Tablas Arrow de un partido a partir de las etapas 'events' y 'network'"""
+    n = len(events['type_id'])
+    team_ids, player_ids = events['team_ids'], events['player_ids']
+    match_col = pa.array(np.full(n, match_id, dtype=object), pa.string())
+    event_index = np.arange(n, dtype=np.int32)
+    tables = {}
+    tables['events'] = pa.table({
+        'match_id': match_col,
+        'event_index': event_index,
+        'event_id': events['event_id'],
+        'type_id': events['type_id'],
+        'period': events['period'],
+        'minute': events['minute'],
+        'second': events['second'],
+        'time_s': events['time_s'],
+        'team_id': _ids(team_ids, events['team']),
+        'player_id': _ids(player_ids, events['player']),
+        'x': events['x'],
+        'y': events['y'],
+        'end_x': events['end_x'],
+        'end_y': events['end_y'],
+        'outcome': events['outcome'],
+    })
+    rows = qualifier_rows(events)
+    tables['qualifiers'] = pa.table({
+        'match_id': pa.array(np.full(len(rows), match_id, dtype=object), pa.string()),
+        'event_index': rows.astype(np.int32),
+        'qualifier_id': events['qual_id'],
+        'value': events['qual_value'],
+    })
+
+    is_pass = np.flatnonzero(events['type_id'] == PASS)
+    x, y = events['x'][is_pass], events['y'][is_pass]
+    end_x, end_y = events['end_x'][is_pass], events['end_y'][is_pass]
+    ok = events['outcome'][is_pass] & ~np.isnan(end_x) & ~np.isnan(end_y)
+    xt = np.zeros(len(is_pass), dtype=np.float32)
+    xt[ok] = get_xt_values(end_x[ok], end_y[ok]) - get_xt_values(x[ok], y[ok])
+    tables['passes'] = pa.table({
+        'match_id': pa.array(np.full(len(is_pass), match_id, dtype=object), pa.string()),
+        'event_index': is_pass.astype(np.int32),
+        'period': events['period'][is_pass],
+        'time_s': events['time_s'][is_pass],
+        'team_id': _ids(team_ids, events['team'][is_pass]),
+        'player_id': _ids(player_ids, events['player'][is_pass]),
+        'x': x, 'y': y, 'end_x': end_x, 'end_y': end_y,
+        'outcome': events['outcome'][is_pass],
+        'xt': xt,
+    })
+
+    node_cols = {k: [] for k in ('team_id', 'player_id', 'x', 'y', 'passes', 'xt')}
+    edge_cols = {k: [] for k in ('team_id', 'passer_id', 'receiver_id', 'passes', 'xt')}
+    for team in range(len(network.get('net_player', []))):
+        player = network['net_player'][team]
+        active = np.flatnonzero(player >= 0)
+        ids = player_ids[player[active]] if len(active) else np.zeros(0, dtype=str)
+        node_cols['team_id'].extend([team_ids[team]] * len(active))
+        node_cols['player_id'].extend(ids)
+        node_cols['x'].extend(network['net_x'][team][active])
+        node_cols['y'].extend(network['net_y'][team][active])
+        node_cols['passes'].extend(network['net_passes'][team][active])
+        node_cols['xt'].extend(network['net_xt'][team][active])
+        counts = network['net_counts'][team][np.ix_(active, active)]
+        src, dst = np.nonzero(counts)
+        edge_cols['team_id'].extend([team_ids[team]] * len(src))
+        edge_cols['passer_id'].extend(ids[src])
+        edge_cols['receiver_id'].extend(ids[dst])
+        edge_cols['passes'].extend(counts[src, dst].astype(np.int32))
+        edge_cols['xt'].extend(network['net_xt_flow'][team][np.ix_(active, active)][src, dst])
+    node_types = {'team_id': pa.string(), 'player_id': pa.string(), 'x': pa.float32(), 'y': pa.float32(),
+                  'passes': pa.int32(), 'xt': pa.float32()}
+    edge_types = {'team_id': pa.string(), 'passer_id': pa.string(), 'receiver_id': pa.string(),
+                  'passes': pa.int32(), 'xt': pa.float32()}
+    tables['network_nodes'] = pa.table(
+        {'match_id': pa.array([match_id] * len(node_cols['team_id']), pa.string()),
+         **{k: pa.array([str(v) if t == pa.string() else v for v in node_cols[k]], t)
+            for k, t in node_types.items()}})
+    tables['network_edges'] = pa.table(
+        {'match_id': pa.array([match_id] * len(edge_cols['team_id']), pa.string()),
+         **{k: pa.array([str(v) if t == pa.string() else v for v in edge_cols[k]], t)
+            for k, t in edge_types.items()}})
+    return tables
+
+
+def _partition(match):
+    competition = str(match.get('competition') or match.get('competition_full_name') or 'unknown')
+    season = str(match.get('season') or 'unknown')
+    return f"competition={competition.replace('/', '_')}", f"season={season.replace('/', '_')}"
+
+
+def _write_table(table, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    # Sin compresión: condición para poder leer con memory-map sin copiar
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def _load_manifest(export_dir):
+    path = Path(export_dir) / MANIFEST
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def export_matches(raw_dir=DEFAULT_RAW_DIR, export_dir=DEFAULT_EXPORT_DIR, processed_dir=None,
+                   competition=None, season=None, force=False):
+    """Exporta los partidos del catálogo que cambiaron desde la última exportación"""
+    raw_dir, export_dir = Path(raw_dir), Path(export_dir)
+    catalog = [m for m in load_catalog(raw_dir)
+               if (competition is None or competition in (m.get('competition'), m.get('competition_full_name')))
+               and (season is None or str(m.get('season')) == str(season))]
+    manifest = _load_manifest(export_dir)
+    network_version = stage_version('network')
+    t0 = time.perf_counter()
+    exported = skipped = errors = 0
+    for match in catalog:
+        json_path = raw_dir / match['filepath']
+        if not json_path.exists():
+            continue
+        match_id = match_key(match)
+        identity = f'{events_identity(json_path)}:n{network_version}:x{EXPORT_VERSION}'
+        partition = _partition(match)
+        entry = manifest.get(match_id)
+        if not force and entry and entry['identity'] == identity and entry['partition'] == list(partition):
+            skipped += 1
+            continue
+        try:
+            ingest_match(json_path, match_id, processed_dir, stages=['network'])
+            events = load_arrays('events', match_id, processed_dir)
+            network = load_arrays('network', match_id, processed_dir) or {}
+            for name, table in match_tables(events, network, match_id).items():
+                _write_table(table, export_dir.joinpath(name, *partition, f'{match_id}.arrow'))
+            if entry and entry['partition'] != list(partition):
+                # El partido cambió de partición: borrar la copia vieja
+                for name in EXPORT_TABLES:
+                    export_dir.joinpath(name, *entry['partition'], f'{match_id}.arrow').unlink(missing_ok=True)
+            manifest[match_id] = {'identity': identity, 'partition': list(partition)}
+            exported += 1
+        except Exception as e:
+            errors += 1
+            print(f"  ⚠️  Error exportando {match['filepath']}: {e}")
+    export_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(export_dir / MANIFEST)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, export_dir / MANIFEST)
+    print(f"✅ {exported} partidos exportados, {skipped} sin cambios en {time.perf_counter() - t0:.1f}s "
+          f"({errors} errores)")
+    return exported, skipped, errors
+
+
+def open_export(table, export_dir=DEFAULT_EXPORT_DIR):
+    """Dataset Arrow de una tabla exportada (particiones competition/season como columnas)"""
+    return ds.dataset(Path(export_dir) / table, format='ipc', partitioning='hive')
+
+
+def read_match_table(path):
+    """Lee un archivo exportado con memory-map (las columnas apuntan al archivo, sin copia)"""
+    # El mapa queda abierto mientras vivan los buffers de la tabla
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta eventos, pases y redes a Arrow IPC/Feather')
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--processed-dir')
+    parser.add_argument('--output', default=str(DEFAULT_EXPORT_DIR))
+    parser.add_argument('--competition', help='Carpeta o nombre completo de la competición')
+    parser.add_argument('--season')
+    parser.add_argument('--force', action='store_true', help='Reexportar aunque no haya cambios')
+    args = parser.parse_args()
+    _, _, errors = export_matches(args.raw_dir, args.output, args.processed_dir,
+                                  args.competition, args.season, args.force)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
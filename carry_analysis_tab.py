@@ -0,0 +1,88 @@
+# carry_analysis_tab.py
+# Pestaña de carries: lee los carries precalculados en la ingesta (data/processed/carries)
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+from mplsoccer import Pitch
+
+from carry_detection import carries_by_player
+from ingest import load_stage
+from match_selector import select_match
+from passing_network_tab import scan_data_directories, get_player_short_name
+
+
+def plot_carries(carries, mask, team_name, ax):
+    """Mapa de carries: progresivos resaltados, resto atenuados"""
+    pitch = Pitch(pitch_type='custom', pitch_length=105, pitch_width=68,
+                  line_color='white', pitch_color='#0a3d0a', linewidth=2)
+    pitch.draw(ax=ax)
+    scale_x, scale_y = 105 / 100, 68 / 100
+    for progressive, color, alpha in ((False, '#9aa5b1', 0.35), (True, '#00d9ff', 0.9)):
+        sel = mask & (carries['carry_progressive'] == progressive)
+        if not sel.any():
+            continue
+        pitch.arrows(carries['carry_x'][sel] * scale_x, carries['carry_y'][sel] * scale_y,
+                     carries['carry_end_x'][sel] * scale_x, carries['carry_end_y'][sel] * scale_y,
+                     ax=ax, color=color, alpha=alpha, width=2, headwidth=4, headlength=4, zorder=2)
+    ax.set_title(f'{team_name} - Carries', fontsize=16, weight='bold', color='white', pad=15)
+
+
+def show_carry_analysis_tab():
+    """Muestra la pestaña de análisis de carries"""
+    st.header("🏃 Carry Analysis")
+    raw_dir = scan_data_directories()['raw_dir']
+    match = select_match(raw_dir, key='carry')
+    if match is None:
+        return
+    with st.spinner('Cargando carries precalculados...'):
+        events = load_stage(match, 'events', raw_dir)
+        carries = load_stage(match, 'carries', raw_dir)
+    if events is None or carries is None:
+        st.error("❌ No se pudieron cargar los carries de este partido")
+        return
+
+    team_names = list(events['team_names'])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        team = st.selectbox("Equipo:", range(len(team_names)), format_func=lambda i: team_names[i],
+                            key="carry_team")
+    with col2:
+        min_distance = st.slider("Distancia mínima (m):", 3, 30, 5, key="carry_min_distance")
+    with col3:
+        only_progressive = st.checkbox("Solo progresivos", value=False, key="carry_progressive")
+
+    mask = (carries['carry_team'] == team) & (carries['carry_distance'] >= min_distance)
+    if only_progressive:
+        mask &= carries['carry_progressive']
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Carries", int(mask.sum()))
+    with col2:
+        st.metric("Progresivos", int((mask & carries['carry_progressive']).sum()))
+    with col3:
+        st.metric("Metros con balón", f"{carries['carry_distance'][mask].sum():.0f}")
+    with col4:
+        st.metric("xT por carries", f"{carries['carry_xt'][mask].sum():.3f}")
+
+    fig, ax = plt.subplots(figsize=(12, 8), facecolor='#0e1117')
+    plot_carries(carries, mask, team_names[team], ax)
+    st.pyplot(fig)
+    plt.close()
+
+    st.subheader("🎯 Jugadores más dinámicos")
+    filtered = {k: v[mask] for k, v in carries.items()}
+    summary = carries_by_player(events, filtered)
+    if summary.empty:
+        st.warning("⚠️ No hay carries con los filtros seleccionados")
+        return
+    names = dict(zip(events['player_ids'], events['player_names']))
+    table = pd.DataFrame({
+        'Jugador': [get_player_short_name(names.get(pid, pid)) for pid in summary['player_id']],
+        'Carries': summary['carries'],
+        'Metros': summary['distance'].round(0).astype(int),
+        'Progresivos': summary['progressive'].astype(int),
+        'xT': summary['xt'].map(lambda v: f"{v:.3f}")
+    }).head(10)
+    table.insert(0, '#', range(1, len(table) + 1))
+    st.dataframe(table, use_container_width=True, hide_index=True)
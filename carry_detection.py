@@ -0,0 +1,104 @@
+"""
+Detección de carries (conducciones) sobre los arrays de match_events.
+Opta no registra carries: se infieren entre dos acciones consecutivas del mismo
+equipo dentro de una cadena de posesión, desde donde el jugador recibe o gana
+el balón hasta donde ejecuta su siguiente acción.
+"""
+
+import numpy as np
+
+from match_events import (PASS, TAKE_ON, TACKLE, INTERCEPTION, MISS, POST, ATTEMPT_SAVED, GOAL,
+                          BALL_RECOVERY, BALL_TOUCH)
+from possession_chains import segment_possessions
+from xt_calculator import get_xt_values
+
+# Acciones tras las cuales el jugador tiene el balón controlado
+CARRY_START_TYPES = (PASS, TAKE_ON, TACKLE, INTERCEPTION, BALL_RECOVERY, BALL_TOUCH)
+# Acciones que cierran un carry
+CARRY_END_TYPES = (PASS, TAKE_ON, MISS, POST, ATTEMPT_SAVED, GOAL, BALL_TOUCH)
+
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+
+CARRY_FIELDS = ('carry_start_event', 'carry_end_event', 'carry_team', 'carry_player', 'carry_period',
+                'carry_time', 'carry_duration', 'carry_x', 'carry_y', 'carry_end_x', 'carry_end_y',
+                'carry_distance', 'carry_progressive', 'carry_xt')
+
+
+def detect_carries(events, chains=None, min_distance=3.0, max_duration=10.0, progressive_fraction=0.25):
+    """Detecta carries de un partido.
+
+    min_distance: metros mínimos recorridos con el balón.
+    max_duration: segundos máximos entre recibir y la siguiente acción.
+    progressive_fraction: reducción mínima (fracción) de la distancia al arco rival
+    para marcar el carry como progresivo.
+    """
+    if chains is None:
+        chains = segment_possessions(events)
+    type_id = events['type_id']
+    chain_id = chains['chain_id']
+
+    idx = np.flatnonzero(chain_id >= 0)
+    prev, nxt = idx[:-1], idx[1:]
+    # El primer evento debe dejar el balón en poder del equipo
+    prev_ok = np.isin(type_id[prev], CARRY_START_TYPES) & events['outcome'][prev]
+    candidate = (prev_ok & np.isin(type_id[nxt], CARRY_END_TYPES)
+                 & (chain_id[prev] == chain_id[nxt]) & (events['player'][nxt] >= 0))
+    prev, nxt = prev[candidate], nxt[candidate]
+
+    # El carry empieza donde llega el pase o donde se ganó el balón
+    is_pass = (type_id[prev] == PASS) & ~np.isnan(events['end_x'][prev])
+    start_x = np.where(is_pass, events['end_x'][prev], events['x'][prev])
+    start_y = np.where(is_pass, events['end_y'][prev], events['y'][prev])
+    # Si no es un pase, el mismo jugador debe continuar la jugada
+    same_player = is_pass | (events['player'][prev] == events['player'][nxt])
+    end_x, end_y = events['x'][nxt], events['y'][nxt]
+
+    dx = (end_x - start_x) * PITCH_LENGTH / 100
+    dy = (end_y - start_y) * PITCH_WIDTH / 100
+    distance = np.hypot(dx, dy)
+    duration = events['time_s'][nxt] - events['time_s'][prev]
+    keep = same_player & (distance >= min_distance) & (duration <= max_duration) & (duration >= 0)
+
+    prev, nxt = prev[keep], nxt[keep]
+    start_x, start_y, end_x, end_y = start_x[keep], start_y[keep], end_x[keep], end_y[keep]
+    goal_dist_start = np.hypot((100 - start_x) * PITCH_LENGTH / 100, (50 - start_y) * PITCH_WIDTH / 100)
+    goal_dist_end = np.hypot((100 - end_x) * PITCH_LENGTH / 100, (50 - end_y) * PITCH_WIDTH / 100)
+    progressive = (goal_dist_start - goal_dist_end) >= progressive_fraction * goal_dist_start
+
+    return {
+        'carry_start_event': prev.astype(np.int32),
+        'carry_end_event': nxt.astype(np.int32),
+        'carry_team': events['team'][nxt],
+        'carry_player': events['player'][nxt],
+        'carry_period': events['period'][nxt],
+        'carry_time': events['time_s'][prev],
+        'carry_duration': duration[keep].astype(np.float32),
+        'carry_x': start_x.astype(np.float32),
+        'carry_y': start_y.astype(np.float32),
+        'carry_end_x': end_x.astype(np.float32),
+        'carry_end_y': end_y.astype(np.float32),
+        'carry_distance': distance[keep].astype(np.float32),
+        'carry_progressive': progressive,
+        'carry_xt': (get_xt_values(end_x, end_y) - get_xt_values(start_x, start_y)).astype(np.float32)
+    }
+
+
+def carries_by_player(events, carries, team=None):
+    """Resumen por jugador: carries, metros, progresivos y xT"""
+    import pandas as pd
+    df = pd.DataFrame({
+        'team': carries['carry_team'],
+        'player': carries['carry_player'],
+        'distance': carries['carry_distance'],
+        'progressive': carries['carry_progressive'],
+        'xt': carries['carry_xt']
+    })
+    if team is not None:
+        df = df[df['team'] == team]
+    if df.empty:
+        return pd.DataFrame(columns=['player_id', 'carries', 'distance', 'progressive', 'xt'])
+    summary = df.groupby('player').agg(carries=('distance', 'size'), distance=('distance', 'sum'),
+                                       progressive=('progressive', 'sum'), xt=('xt', 'sum'))
+    summary.insert(0, 'player_id', events['player_ids'][summary.index.to_numpy()])
+    return summary.sort_values('xt', ascending=False).reset_index(drop=True)
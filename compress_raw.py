@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Recomprime en su lugar los JSON de partido de data/raw (.json -> .json.zst o .json.gz).
+Cada archivo se reescribe minificado y comprimido en un temporal, se verifica
+releyéndolo y comparando con el original, y solo entonces reemplaza al original.
+Al terminar regenera matches_metadata.json para que el catálogo apunte a los nuevos nombres.
+
+Uso: python compress_raw.py [--format zst|gz] [--level N] [--dry-run]
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from generate_metadata import generate_metadata_from_jsons
+from processed_store import temp_path
+from raw_storage import DEFAULT_RAW_DIR, zstandard, is_match_file, match_stem, match_suffix, load_json
+
+DEFAULT_LEVELS = {'zst': 15, 'gz': 9}
+
+
+def _open_compressed_writer(path, fmt, level):
+    if fmt == 'gz':
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=level)
+    raw = open(path, 'wb')
+    writer = zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=True)
+    return io.TextIOWrapper(writer, encoding='utf-8')
+
+
+def compress_file(json_path, fmt='zst', level=None):
+    """Comprime un JSON de partido y verifica el resultado. Devuelve (ruta nueva, bytes antes, bytes después)"""
+    json_path = Path(json_path)
+    level = level or DEFAULT_LEVELS[fmt]
+    target = json_path.with_name(f'{match_stem(json_path)}.json.{fmt}')
+    tmp_path = temp_path(target)
+    data = load_json(json_path)
+    try:
+        with _open_compressed_writer(tmp_path, fmt, level) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        # Verificación: el archivo comprimido debe decodificar al mismo contenido
+        if load_json(tmp_path, f'.json.{fmt}') != data:
+            raise ValueError('el contenido descomprimido no coincide con el original')
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    before = json_path.stat().st_size
+    os.replace(tmp_path, target)
+    if target != json_path:
+        json_path.unlink()
+    return target, before, target.stat().st_size
+
+
+def compress_archive(raw_dir, fmt='zst', level=None, dry_run=False):
+    """Recomprime todos los JSON de partido que no estén ya en el formato pedido"""
+    raw_dir = Path(raw_dir)
+    pending = [p for p in sorted(raw_dir.rglob('*'))
+               if p.is_file() and is_match_file(p) and match_suffix(p) != f'.json.{fmt}']
+    print(f"🔍 {len(pending)} archivos para comprimir a .json.{fmt}")
+    if dry_run:
+        for path in pending:
+            print(f"  {path.relative_to(raw_dir)}")
+        return 0, 0
+    t0 = time.perf_counter()
+    total_before = total_after = errors = 0
+    for path in pending:
+        try:
+            _, before, after = compress_file(path, fmt, level)
+            total_before += before
+            total_after += after
+        except Exception as e:
+            errors += 1
+            print(f"  ⚠️  Error comprimiendo {path.relative_to(raw_dir)}: {e}")
+    elapsed = time.perf_counter() - t0
+    if total_after:
+        print(f"✅ {len(pending) - errors} archivos en {elapsed:.1f}s: "
+              f"{total_before / 1e6:.1f} MB -> {total_after / 1e6:.1f} MB "
+              f"({total_before / total_after:.1f}x)")
+    return len(pending) - errors, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recomprime el archivo crudo de partidos')
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--format', choices=['zst', 'gz'], default='zst' if zstandard else 'gz')
+    parser.add_argument('--level', type=int, help='Nivel de compresión (por defecto: zst 15, gz 9)')
+    parser.add_argument('--dry-run', action='store_true', help='Solo listar los archivos a comprimir')
+    args = parser.parse_args()
+    if args.format == 'zst' and zstandard is None:
+        print("❌ Falta 'zstandard' (pip install zstandard) o usa --format gz")
+        sys.exit(1)
+    compressed, errors = compress_archive(args.raw_dir, args.format, args.level, args.dry_run)
+    if compressed and not args.dry_run:
+        generate_metadata_from_jsons(args.raw_dir)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
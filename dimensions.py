@@ -0,0 +1,149 @@
+"""
+Tablas de dimensión de jugadores y equipos para todo el archivo.
+Se construyen en la ingesta a partir de los eventos normalizados (nombres de
+eventos y alineaciones) y se guardan ordenadas por id en data/processed/tables:
+dim_players, dim_teams y dim_player_teams (historial jugador-equipo).
+La resolución de nombres es una búsqueda O(1) en diccionarios cargados una vez.
+"""
+
+import pandas as pd
+
+from processed_store import load_arrays, temp_path
+from match_stats import tables_dir
+from raw_storage import match_key
+
+DIMENSION_TABLES = ('dim_players', 'dim_teams', 'dim_player_teams')
+NAME_KEYS = ('team_ids', 'team_names', 'player_ids', 'player_names', 'player_full_names', 'player_team')
+
+
+def short_name(full_name):
+    """Convierte nombre completo a formato con inicial"""
+    if not full_name or pd.isna(full_name):
+        return "Unknown"
+    parts = str(full_name).strip().split()
+    if len(parts) == 1:
+        return parts[0]
+    return f"{parts[0][0]}. {parts[-1]}"
+
+
+def build_dimensions(catalog, processed_dir=None):
+    """Construye las tablas de dimensión recorriendo los eventos de cada partido del catálogo"""
+    player_rows, team_rows = [], []
+    for match in catalog:
+        match_id = match_key(match)
+        events = load_arrays('events', match_id, processed_dir, keys=NAME_KEYS)
+        if events is None or 'player_team' not in events:
+            continue
+        date = match.get('date', '')
+        team_ids = events['team_ids']
+        for team_id, team_name in zip(team_ids, events['team_names']):
+            team_rows.append((str(team_id), str(team_name), match_id, date,
+                              match.get('competition_full_name', '')))
+        for player_id, name, full_name, team in zip(events['player_ids'], events['player_names'],
+                                                    events['player_full_names'], events['player_team']):
+            team_id = str(team_ids[team]) if 0 <= team < len(team_ids) else ''
+            player_rows.append((str(player_id), str(name), str(full_name), team_id, match_id, date))
+    if not player_rows:
+        return {}
+
+    appearances = pd.DataFrame(player_rows, columns=['player_id', 'display_name', 'full_name',
+                                                     'team_id', 'match_id', 'date'])
+    appearances['date'] = pd.to_datetime(appearances['date'], errors='coerce')
+    team_matches = pd.DataFrame(team_rows, columns=['team_id', 'team_name', 'match_id', 'date', 'competition'])
+    team_matches['date'] = pd.to_datetime(team_matches['date'], errors='coerce')
+
+    # Nombre y equipo actuales = los del partido más reciente
+    latest = appearances.sort_values('date').groupby('player_id').tail(1).set_index('player_id')
+    players = appearances.groupby('player_id').agg(matches=('match_id', 'nunique'),
+                                                   first_date=('date', 'min'), last_date=('date', 'max'))
+    players['display_name'] = latest['display_name']
+    players['full_name'] = latest['full_name']
+    players['short_name'] = players['display_name'].map(short_name)
+    players['team_id'] = latest['team_id']
+
+    history = appearances.groupby(['player_id', 'team_id']).agg(
+        matches=('match_id', 'nunique'), first_date=('date', 'min'), last_date=('date', 'max'))
+
+    latest_team = team_matches.sort_values('date').groupby('team_id').tail(1).set_index('team_id')
+    teams = team_matches.groupby('team_id').agg(matches=('match_id', 'nunique'),
+                                                first_date=('date', 'min'), last_date=('date', 'max'))
+    teams['team_name'] = latest_team['team_name']
+    teams['competition'] = latest_team['competition']
+
+    tables = {
+        'dim_players': players.reset_index()[['player_id', 'display_name', 'full_name', 'short_name',
+                                              'team_id', 'matches', 'first_date', 'last_date']],
+        'dim_teams': teams.reset_index()[['team_id', 'team_name', 'competition', 'matches',
+                                          'first_date', 'last_date']],
+        'dim_player_teams': history.reset_index().sort_values(['player_id', 'first_date']),
+    }
+    out_dir = tables_dir(processed_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for name, table in tables.items():
+        path = out_dir / f'{name}.parquet'
+        tmp_path = temp_path(path)
+        table.to_parquet(tmp_path, index=False)
+        tmp_path.replace(path)
+        written[name] = len(table)
+    return written
+
+
+_dimensions = {}
+
+
+def load_dimensions(processed_dir=None):
+    """Tablas de dimensión indexadas por id (se recargan solo si cambian en disco)"""
+    out_dir = tables_dir(processed_dir)
+    paths = [out_dir / f'{name}.parquet' for name in DIMENSION_TABLES]
+    if not all(path.exists() for path in paths):
+        return None
+    version = tuple(path.stat().st_mtime_ns for path in paths)
+    cached = _dimensions.get(str(out_dir))
+    if cached is not None and cached['version'] == version:
+        return cached
+    players, teams, history = (pd.read_parquet(path) for path in paths)
+    cached = {
+        'version': version,
+        'players': players.set_index('player_id'),
+        'teams': teams.set_index('team_id'),
+        'history': history.set_index('player_id').sort_index(),
+        # Diccionarios para resolución O(1) desde los tabs
+        'player_names': dict(zip(players['player_id'], players['display_name'])),
+        'player_short_names': dict(zip(players['player_id'], players['short_name'])),
+        'team_names': dict(zip(teams['team_id'], teams['team_name'])),
+    }
+    _dimensions[str(out_dir)] = cached
+    return cached
+
+
+def player_name(player_id, short=False, processed_dir=None, default=None):
+    dims = load_dimensions(processed_dir)
+    if dims is None:
+        return default
+    return dims['player_short_names' if short else 'player_names'].get(str(player_id), default)
+
+
+def resolve_short_names(player_ids, fallback_names, processed_dir=None):
+    """Nombres cortos desde la dimensión de jugadores; si falta, se derivan del nombre del partido"""
+    dims = load_dimensions(processed_dir)
+    lookup = dims['player_short_names'] if dims else {}
+    return [lookup.get(str(pid)) or short_name(name) for pid, name in zip(player_ids, fallback_names)]
+
+
+def team_name(team_id, processed_dir=None, default=None):
+    dims = load_dimensions(processed_dir)
+    if dims is None:
+        return default
+    return dims['team_names'].get(str(team_id), default)
+
+
+def player_history(player_id, processed_dir=None):
+    """Equipos por los que pasó un jugador (partidos, primera y última fecha)"""
+    dims = load_dimensions(processed_dir)
+    if dims is None:
+        return pd.DataFrame()
+    try:
+        return dims['history'].loc[[str(player_id)]].reset_index()
+    except KeyError:
+        return pd.DataFrame()
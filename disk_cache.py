@@ -0,0 +1,143 @@
+"""
+Caché en disco compartida entre procesos (varios servidores Streamlit, API, prewarm).
+Un índice SQLite (modo WAL) guarda clave, tamaño y último acceso; los valores son
+archivos escritos de forma atómica (temporal + os.replace). Las claves incluyen la
+identidad del archivo fuente y la versión de la matriz xT, así que un JSON modificado
+o una matriz nueva nunca devuelven resultados viejos. Cuando el total supera el
+límite se desalojan las entradas menos usadas recientemente.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from processed_store import DEFAULT_PROCESSED_DIR, temp_path
+from xt_calculator import xt_version
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('FUTBOL_CACHE_DIR', Path(DEFAULT_PROCESSED_DIR) / 'cache'))
+DEFAULT_MAX_BYTES = int(float(os.environ.get('FUTBOL_CACHE_MAX_MB', 1024)) * 1024 * 1024)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def cache_key(namespace, source, params=None):
+    """Clave estable: espacio de nombres + identidad de la fuente + versión xT + parámetros"""
+    payload = json.dumps([namespace, str(source), xt_version(), params], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes or DEFAULT_MAX_BYTES
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.cache_dir / 'index.sqlite', timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f'{key}.bin'
+
+    def get(self, key):
+        """Bytes guardados para la clave o None"""
+        try:
+            data = self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            with self._connect() as conn:
+                conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+        except sqlite3.OperationalError:
+            pass  # El acceso es solo para el desalojo; no bloquear la lectura
+        return data
+
+    def put(self, key, data, namespace=''):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(path)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                         (key, namespace, len(data), now, now))
+        self.evict()
+
+    def get_or_compute(self, namespace, source, params, compute, dumps=pickle.dumps, loads=pickle.loads):
+        """Devuelve el valor cacheado o lo calcula y lo guarda para el resto de procesos"""
+        key = cache_key(namespace, source, params)
+        data = self.get(key)
+        if data is not None:
+            try:
+                return loads(data)
+            except Exception:
+                pass  # Entrada corrupta o de otra versión: se recalcula
+        value = compute()
+        if value is not None:
+            self.put(key, dumps(value), namespace)
+        return value
+
+    def evict(self, max_bytes=None):
+        """Borra las entradas menos usadas hasta quedar bajo el 90% del límite"""
+        max_bytes = max_bytes or self.max_bytes
+        with self._connect() as conn:
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= max_bytes:
+                return 0
+            target = max_bytes * 0.9
+            removed = []
+            for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed'):
+                if total <= target:
+                    break
+                removed.append(key)
+                total -= size
+            conn.executemany('DELETE FROM entries WHERE key = ?', [(k,) for k in removed])
+        for key in removed:
+            self._path(key).unlink(missing_ok=True)
+        return len(removed)
+
+    def stats(self):
+        with self._connect() as conn:
+            rows = conn.execute('SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace').fetchall()
+        return {namespace: {'entries': n, 'bytes': size} for namespace, n, size in rows}
+
+    def clear(self):
+        with self._connect() as conn:
+            keys = [row[0] for row in conn.execute('SELECT key FROM entries')]
+            conn.execute('DELETE FROM entries')
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Caché por defecto del proceso (mismo directorio para todos los procesos)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DiskCache()
+    return _default_cache
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Consultas de eventos con filtros y proyección empujados al almacenamiento columnar.
+select_events filtra los arrays normalizados de un partido; query hace lo mismo sobre
+todo el archivo. materialize_event_table consolida los eventos de todos los partidos
+en tables/events.parquet, en streaming y por tandas acotadas en memoria; cada tanda
+se ordena por (type_id, player_id, partido) en grupos de filas chicos: con las
+estadísticas min/max de cada grupo pyarrow descarta sin leerlos los que no pueden
+contener el tipo, jugador o equipo pedido, y de los demás lee solo las columnas
+necesarias. Los qualifiers se guardan como lista por evento.
+
+Uso: python event_query.py --type 1 --qualifier 4 --player <id> [--season 2025] [--columns match_id,minute,x,y]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from archive_pipeline import PIPELINE_MEMORY_MB, ArchivePipeline, memory_batches
+from match_events import has_qualifier
+from match_stats import tables_dir
+from processed_store import temp_path
+from raw_storage import match_key
+
+EVENT_TABLE = 'events'
+ROW_GROUP_SIZE = 16_384
+EVENT_COLUMNS = ('match_id', 'competition', 'season', 'date', 'event_index', 'event_id', 'type_id',
+                 'period', 'minute', 'second', 'time_s', 'team_id', 'player_id', 'x', 'y',
+                 'end_x', 'end_y', 'outcome', 'qualifier_ids', 'qualifier_values',
+                 'action_kind', 'action_xt', 'carry_xt')
+# Arrays de la etapa 'events' que usa la tabla (el resto no se mapea)
+SOURCE_KEYS = ('event_id', 'type_id', 'period', 'minute', 'second', 'time_s', 'team', 'player',
+               'x', 'y', 'end_x', 'end_y', 'outcome', 'qual_ptr', 'qual_id', 'qual_value',
+               'team_ids', 'player_ids')
+
+
+def _values(value):
+    """Escalar o iterable -> lista (None se mantiene)"""
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes, int, np.integer)):
+        return [value]
+    return list(value)
+
+
+def select_events(events, event_types=None, team=None, player=None, period=None, minute_range=None,
+                  qualifiers=None):
+    """Índices de los eventos de un partido que cumplen los filtros.
+
+    team y player son índices locales del partido; event_types, period y qualifiers
+    aceptan un valor o varios (qualifiers: alguno de ellos); minute_range es inclusivo.
+    """
+    mask = np.ones(len(events['type_id']), dtype=bool)
+    if event_types is not None:
+        mask &= np.isin(events['type_id'], _values(event_types))
+    if team is not None:
+        mask &= np.isin(events['team'], _values(team))
+    if player is not None:
+        mask &= np.isin(events['player'], _values(player))
+    if period:
+        mask &= np.isin(events['period'], _values(period))
+    if minute_range:
+        mask &= (events['minute'] >= minute_range[0]) & (events['minute'] <= minute_range[1])
+    if qualifiers is not None:
+        mask &= has_qualifier(events, _values(qualifiers))
+    return np.flatnonzero(mask)
+
+
+def match_event_table(events, match_id, match=None, values=None):
+    """Tabla Arrow con los eventos de un partido (columnas de EVENT_COLUMNS; values: etapa 'action_values')"""
+    match = match or {}
+    n = len(events['type_id'])
+    if values is None:
+        values = {'action_kind': np.zeros(n, dtype=np.int8), 'action_xt': np.zeros(n, dtype=np.float32),
+                  'carry_xt': np.zeros(n, dtype=np.float32)}
+    team_ids = np.append(events['team_ids'].astype(object), '')
+    player_ids = np.append(events['player_ids'].astype(object), '')
+    qual_ptr = events['qual_ptr'].astype(np.int32)
+    return pa.table({
+        'match_id': pa.array([match_id] * n, pa.string()),
+        'competition': pa.array([match.get('competition_full_name', '')] * n, pa.string()),
+        'season': pa.array([str(match.get('season', ''))] * n, pa.string()),
+        'date': pa.array(pd.to_datetime([match.get('date')] * n, errors='coerce')),
+        'event_index': np.arange(n, dtype=np.int32),
+        'event_id': events['event_id'],
+        'type_id': events['type_id'],
+        'period': events['period'],
+        'minute': events['minute'],
+        'second': events['second'],
+        'time_s': events['time_s'],
+        # Índice -1 (sin equipo/jugador) -> ''
+        'team_id': pa.array(team_ids[events['team']], pa.string()),
+        'player_id': pa.array(player_ids[events['player']], pa.string()),
+        'x': events['x'],
+        'y': events['y'],
+        'end_x': events['end_x'],
+        'end_y': events['end_y'],
+        'outcome': events['outcome'],
+        'qualifier_ids': pa.ListArray.from_arrays(qual_ptr, pa.array(events['qual_id'])),
+        'qualifier_values': pa.ListArray.from_arrays(qual_ptr, pa.array(events['qual_value'])),
+        'action_kind': values['action_kind'],
+        'action_xt': values['action_xt'],
+        'carry_xt': values['carry_xt'],
+    })
+
+
+def _event_table(match, arrays):
+    """Map del pipeline: tabla Arrow de los eventos de un partido (sin action_values: ceros)"""
+    match_id = match_key(match)
+    return match_event_table(arrays['events'], match_id, match, arrays.get('action_values'))
+
+
+def materialize_event_table(catalog, processed_dir=None, workers=0, memory_mb=None, verbose=False):
+    """Consolida los eventos de todo el catálogo en tables/events.parquet en memoria acotada.
+
+    Los partidos llegan en streaming y se escriben por tandas que no superan el techo de
+    memoria: cada tanda se ordena antes de escribirse, así los grupos de filas siguen
+    siendo podables por min/max sin tener todo el archivo en memoria. Los partidos sin
+    etapa 'action_values' entran con valores en cero; los que no tienen eventos se
+    descartan y se informan.
+    """
+    pipeline = ArchivePipeline(catalog, ('events',), processed_dir=processed_dir, workers=workers,
+                               memory_mb=memory_mb or PIPELINE_MEMORY_MB, optional=('action_values',),
+                               keys={'events': SOURCE_KEYS})
+    tables = (table for _, table in pipeline.map(_event_table).stream())
+    out_dir = tables_dir(processed_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f'{EVENT_TABLE}.parquet'
+    tmp_path = temp_path(path)
+    writer, rows = None, 0
+    # Media tanda por techo: concatenar y ordenar duplica la tanda en memoria
+    for batch in memory_batches(tables, pipeline.memory_bytes // 2):
+        # Orden = qué predicados pueden descartar grupos de filas por min/max
+        table = pa.concat_tables(batch).sort_by([('type_id', 'ascending'), ('player_id', 'ascending'),
+                                                 ('match_id', 'ascending'), ('event_index', 'ascending')])
+        del batch
+        if writer is None:
+            writer = pq.ParquetWriter(tmp_path, table.schema, write_statistics=True)
+        writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        rows += len(table)
+    if verbose:
+        pipeline.report()
+    elif pipeline.discarded:
+        print(f"  ⚠️  Tabla de eventos: {len(pipeline.discarded)} partidos sin eventos procesados (descartados)")
+    if writer is None:
+        return 0
+    writer.close()
+    tmp_path.replace(path)
+    return rows
+
+
+_datasets = {}
+
+
+def event_dataset(processed_dir=None):
+    """Dataset de la tabla de eventos (se reabre solo si cambia en disco)"""
+    path = tables_dir(processed_dir) / f'{EVENT_TABLE}.parquet'
+    if not path.exists():
+        return None
+    version = path.stat().st_mtime_ns
+    cached = _datasets.get(str(path))
+    if cached is None or cached[0] != version:
+        cached = (version, ds.dataset(path, format='parquet'))
+        _datasets[str(path)] = cached
+    return cached[1]
+
+
+def _isin(name, values):
+    values = _values(values)
+    return ds.field(name) == values[0] if len(values) == 1 else ds.field(name).isin(values)
+
+
+def query(matches=None, event_types=None, team=None, player=None, period=None, minute_range=None,
+          qualifiers=None, columns=None, competition=None, season=None, processed_dir=None):
+    """Eventos de todo el archivo que cumplen los filtros, como DataFrame.
+
+    matches, team y player son ids (uno o varios); columns limita las columnas leídas.
+    Ejemplo: todos los pases filtrados (qualifier 4) de un jugador en todas las temporadas:
+        query(event_types=1, player='p123', qualifiers=4, columns=['match_id', 'minute', 'x', 'y'])
+    """
+    dataset = event_dataset(processed_dir)
+    if dataset is None:
+        return None
+    ids = (('match_id', matches), ('team_id', team), ('player_id', player),
+           ('competition', competition), ('season', season))
+    filters = [_isin(name, [str(v) for v in _values(value)]) for name, value in ids if value is not None]
+    for name, value in (('type_id', event_types), ('period', period or None)):
+        if value is not None:
+            filters.append(_isin(name, [int(v) for v in _values(value)]))
+    if minute_range:
+        filters.append((ds.field('minute') >= minute_range[0]) & (ds.field('minute') <= minute_range[1]))
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+
+    columns = list(columns) if columns else list(EVENT_COLUMNS)
+    read_columns = list(columns)
+    if qualifiers is not None and 'qualifier_ids' not in columns:
+        read_columns.append('qualifier_ids')
+    table = dataset.to_table(columns=read_columns, filter=expression)
+    if qualifiers is not None:
+        # Las listas no tienen estadísticas por grupo: se filtran después de la poda
+        lists = table['qualifier_ids'].combine_chunks()
+        hits = pc.is_in(pc.list_flatten(lists), value_set=pa.array(_values(qualifiers), lists.type.value_type))
+        rows = np.unique(pc.list_parent_indices(lists).to_numpy()[hits.to_numpy(zero_copy_only=False)])
+        table = table.take(rows).select(columns)
+    return table.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consulta eventos de todo el archivo')
+    parser.add_argument('--processed-dir')
+    parser.add_argument('--type', type=int, action='append', help='type_id (repetible)')
+    parser.add_argument('--qualifier', type=int, action='append', help='qualifier_id (repetible, alguno)')
+    parser.add_argument('--player', action='append')
+    parser.add_argument('--team', action='append')
+    parser.add_argument('--match', action='append')
+    parser.add_argument('--period', type=int, action='append')
+    parser.add_argument('--minutes', help='Rango de minutos, p. ej. 60-90')
+    parser.add_argument('--competition')
+    parser.add_argument('--season')
+    parser.add_argument('--columns', help='Columnas separadas por coma')
+    args = parser.parse_args()
+    minute_range = tuple(int(m) for m in args.minutes.split('-')) if args.minutes else None
+    t0 = time.perf_counter()
+    df = query(args.match, args.type, args.team, args.player, args.period, minute_range, args.qualifier,
+               args.columns.split(',') if args.columns else None, args.competition, args.season,
+               args.processed_dir)
+    if df is None:
+        print("❌ Falta la tabla de eventos: ejecuta `python ingest.py`")
+        sys.exit(1)
+    print(df.head(20).to_string(index=False))
+    print(f"\n✅ {len(df)} eventos en {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,57 @@ import json
 from pathlib import Path
 import sys
 
+from processed_store import temp_path
+from raw_storage import DEFAULT_RAW_DIR, iter_match_files, load_json
+
+def match_metadata(json_file, raw_path):
+    """Entrada del catálogo para un JSON en País/Competición/Temporada/"""
+    json_file, raw_path = Path(json_file), Path(raw_path)
+    country_name, comp_name, season_name = json_file.relative_to(raw_path).parts[:3]
+    data = load_json(json_file)
+    match_info = data.get('matchInfo', {})
+    
+    # Extraer información relevante
+    return {
+        'id': match_info.get('id', ''),
+        'filename': json_file.name,
+        'filepath': str(json_file.relative_to(raw_path)),
+        'country': country_name,
+        'competition': comp_name,
+        'competition_full_name': match_info.get('competition', {}).get('name', comp_name),
+        'competition_code': match_info.get('competition', {}).get('competitionCode', ''),
+        'season': season_name,
+        'date': match_info.get('localDate', ''),
+        'time': match_info.get('localTime', ''),
+        'description': match_info.get('description', ''),
+        'stage': match_info.get('stage', {}).get('name', ''),
+        'week': match_info.get('week', '')
+    }
+
+def _write_json_atomic(path, data):
+    tmp_path = temp_path(path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+def write_metadata(raw_dir, catalog):
+    """Reescribe matches_metadata.json en cada nivel a partir del catálogo global (sin reescanear)"""
+    raw_path = Path(raw_dir)
+    by_country, by_competition = {}, {}
+    for match in catalog:
+        by_country.setdefault(match['country'], []).append(match)
+        by_competition.setdefault((match['country'], match['competition']), []).append(match)
+    # Carpetas que se quedaron sin partidos: metadata vacía en lugar de la anterior
+    for stale in raw_path.glob('*/*/matches_metadata.json'):
+        by_competition.setdefault((stale.parent.parent.name, stale.parent.name), [])
+    for stale in raw_path.glob('*/matches_metadata.json'):
+        by_country.setdefault(stale.parent.name, [])
+    for (country, competition), matches in by_competition.items():
+        _write_json_atomic(raw_path / country / competition / 'matches_metadata.json', matches)
+    for country, matches in by_country.items():
+        _write_json_atomic(raw_path / country / 'matches_metadata.json', matches)
+    _write_json_atomic(raw_path / 'matches_metadata.json', catalog)
+
 def generate_metadata_from_jsons(raw_dir):
     """
     Genera archivos matches_metadata.json para cada nivel de la jerarquía.
@@ -65,32 +116,9 @@ def generate_metadata_from_jsons(raw_dir):
                 json_count = 0
                 
                 # Procesar JSONs en esta temporada
-                for json_file in sorted(season_dir.glob('*.json')):
-                    if json_file.name == 'matches_metadata.json':
-                        continue
-                    
+                for json_file in iter_match_files(season_dir):
                     try:
-                        with open(json_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        match_info = data.get('matchInfo', {})
-                        
-                        # Extraer información relevante
-                        match_data = {
-                            'id': match_info.get('id', ''),
-                            'filename': json_file.name,
-                            'filepath': str(json_file.relative_to(raw_path)),
-                            'country': country_name,
-                            'competition': comp_name,
-                            'competition_full_name': match_info.get('competition', {}).get('name', comp_name),
-                            'competition_code': match_info.get('competition', {}).get('competitionCode', ''),
-                            'season': season_name,
-                            'date': match_info.get('localDate', ''),
-                            'time': match_info.get('localTime', ''),
-                            'description': match_info.get('description', ''),
-                            'stage': match_info.get('stage', {}).get('name', ''),
-                            'week': match_info.get('week', '')
-                        }
+                        match_data = match_metadata(json_file, raw_path)
                         
                         # Agregar a todos los niveles
                         comp_metadata.append(match_data)
@@ -147,9 +175,8 @@ def generate_metadata_from_jsons(raw_dir):
         return False
 
 def main():
-    # Determinar la ruta base del proyecto
-    script_dir = Path(__file__).parent
-    raw_dir = script_dir / 'data' / 'raw'
+    # Ruta base del proyecto (o FUTBOL_RAW_DIR)
+    raw_dir = DEFAULT_RAW_DIR
     
     print("=" * 60)
     print("🏆 GENERADOR DE METADATA PARA PASSING NETWORK ANALYZER")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Ingesta: precalcula por partido los datos derivados que usan las pestañas.
+Lee el catálogo (matches_metadata.json), normaliza los eventos una sola vez y
+ejecuta cada etapa registrada en STAGES, guardando el resultado en data/processed.
+Las etapas ya calculadas para la misma versión del JSON se saltan.
+
+Uso: python ingest.py [--force] [--stage chains]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from match_events import read_match_file, normalize_events
+from raw_storage import DEFAULT_RAW_DIR, match_key
+from possession_chains import segment_possessions
+from carry_detection import detect_carries
+from action_values import compute_action_values
+from xg_model import score_shots, model_version
+from match_stats import compute_team_stats, compute_player_stats, materialize_tables, tables_dir
+from zone_heatmaps import compute_heatmaps, materialize_heatmaps
+from match_timeline import compute_timeline, materialize_timelines
+from dimensions import build_dimensions
+from network_analytics import build_networks
+from network_embeddings import network_embeddings, materialize_embedding_index
+from event_query import materialize_event_table
+from season_rollups import update_rollups
+from processed_store import (DEFAULT_PROCESSED_DIR, source_identity, save_arrays,
+                             load_arrays, is_fresh)
+
+
+def _events_stage(events, outputs):
+    return events
+
+
+def _chains_stage(events, outputs):
+    return segment_possessions(events)
+
+
+def _carries_stage(events, outputs):
+    return detect_carries(events, outputs['chains'])
+
+
+def _action_values_stage(events, outputs):
+    return compute_action_values(events, outputs['chains'], outputs['carries'])
+
+
+def _shots_stage(events, outputs):
+    return score_shots(events)
+
+
+def _team_stats_stage(events, outputs):
+    return compute_team_stats(events, outputs['shots'], outputs['action_values'])
+
+
+def _player_stats_stage(events, outputs):
+    return compute_player_stats(events, outputs['shots'], outputs['action_values'])
+
+
+def _heatmaps_stage(events, outputs):
+    return compute_heatmaps(events)
+
+
+def _timeline_stage(events, outputs):
+    return compute_timeline(events, outputs['chains'], outputs['action_values'])
+
+
+def _network_stage(events, outputs):
+    return build_networks(events)
+
+
+def _embedding_stage(events, outputs):
+    return {'embedding': network_embeddings(outputs['network'])}
+
+
+# Orden de ejecución: (nombre, función(events, outputs) -> dict de arrays, versión)
+# Subir la versión de una etapa fuerza su recálculo en la próxima ingesta;
+# la versión puede ser una función (p. ej. el hash del modelo xG en uso)
+STAGES = [
+    ('events', _events_stage, 5),
+    ('chains', _chains_stage, 1),
+    ('carries', _carries_stage, 1),
+    ('action_values', _action_values_stage, 1),
+    ('shots', _shots_stage, lambda: f'2-{model_version()}'),
+    ('team_stats', _team_stats_stage, lambda: f'2-{model_version()}'),
+    ('player_stats', _player_stats_stage, lambda: f'2-{model_version()}'),
+    ('heatmaps', _heatmaps_stage, 1),
+    ('timeline', _timeline_stage, 2),
+    ('network', _network_stage, 1),
+    ('embedding', _embedding_stage, 1),
+]
+# Etapas que cada etapa lee de outputs: sus versiones entran en la identidad de la dependiente
+STAGE_DEPENDENCIES = {
+    'carries': ('chains',),
+    'action_values': ('chains', 'carries'),
+    'team_stats': ('shots', 'action_values'),
+    'player_stats': ('shots', 'action_values'),
+    'timeline': ('chains', 'action_values'),
+    'embedding': ('network',),
+}
+
+
+def stage_version(name):
+    """Versión de una etapa incluyendo (recursivamente) las de sus dependencias"""
+    version = {stage_name: v for stage_name, _, v in STAGES}[name]
+    version = version() if callable(version) else version
+    deps = STAGE_DEPENDENCIES.get(name, ())
+    if not deps:
+        return str(version)
+    return f"{version}({','.join(f'{dep}={stage_version(dep)}' for dep in deps)})"
+
+
+def stage_identity(identity, name):
+    """Fuente guardada en el encabezado de una etapa: identidad del JSON + versión de la etapa"""
+    return f'{identity}:v{stage_version(name)}'
+
+
+class StageOutputs(dict):
+    """Resultados de etapas del partido; carga desde disco las dependencias frescas y recalcula las demás"""
+
+    def __init__(self, events, match_id, processed_dir, identity):
+        super().__init__()
+        self.events = events
+        self.match_id = match_id
+        self.processed_dir = processed_dir
+        self.identity = identity
+        self.computed = []
+
+    def __missing__(self, name):
+        funcs = {stage_name: func for stage_name, func, _ in STAGES}
+        if name not in funcs:
+            raise KeyError(name)
+        source = stage_identity(self.identity, name)
+        arrays = None
+        if is_fresh(name, self.match_id, source, self.processed_dir):
+            arrays = load_arrays(name, self.match_id, self.processed_dir)
+        if arrays is None:
+            # Dependencia vieja (JSON o versión cambiados) o ausente: se recalcula y se guarda
+            arrays = funcs[name](self.events, self)
+            save_arrays(name, self.match_id, arrays, source, self.processed_dir)
+            self.computed.append(name)
+        self[name] = arrays
+        return arrays
+
+
+def events_identity(json_path):
+    """Identidad del JSON más la versión de los eventos normalizados"""
+    # Todas las etapas dependen de los eventos normalizados: su versión entra en la identidad
+    return f'{source_identity(json_path)}:e{STAGES[0][2]}'
+
+
+def ingest_match(json_path, match_id, processed_dir=None, stages=None, force=False):
+    """Ejecuta las etapas pendientes para un partido. Devuelve la lista de etapas calculadas"""
+    identity = events_identity(json_path)
+    selected = [(name, func, stage_identity(identity, name)) for name, func, _ in STAGES
+                if stages is None or name in stages or name == 'events']
+    pending = [name for name, _, source in selected
+               if force or not is_fresh(name, match_id, source, processed_dir)]
+    if not pending:
+        return []
+    events = None
+    if 'events' not in pending:
+        events = load_arrays('events', match_id, processed_dir)
+    if events is None:
+        events = normalize_events(read_match_file(json_path))
+        if events is None:
+            raise ValueError('formato de partido no soportado')
+        if 'events' not in pending:
+            pending.insert(0, 'events')
+    outputs = StageOutputs(events, match_id, processed_dir, identity)
+    for name, func, source in selected:
+        if name not in pending:
+            continue
+        outputs[name] = func(events, outputs)
+        save_arrays(name, match_id, outputs[name], source, processed_dir)
+    return pending + [name for name in outputs.computed if name not in pending]
+
+
+def load_stage(match_meta, stage, raw_dir=DEFAULT_RAW_DIR, processed_dir=None, keys=None):
+    """Devuelve los arrays precalculados de una etapa, ingiriendo el partido si falta o está desactualizado"""
+    json_path = Path(raw_dir) / str(match_meta['filepath']).replace('\\', '/')
+    match_id = match_key(match_meta)
+    if not json_path.exists():
+        return load_arrays(stage, match_id, processed_dir, keys)
+    try:
+        ingest_match(json_path, match_id, processed_dir, stages=[stage])
+    except ValueError:
+        return None
+    return load_arrays(stage, match_id, processed_dir, keys)
+
+
+def load_catalog(raw_dir):
+    metadata_file = Path(raw_dir) / 'matches_metadata.json'
+    if not metadata_file.exists():
+        return []
+    with open(metadata_file, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    for match in catalog:
+        match['filepath'] = match.get('filepath', '').replace('\\', '/')
+    return catalog
+
+
+def materialize_aggregates(catalog, processed_dir=None):
+    """Reconstruye las tablas y los agregados apilados de todo el catálogo"""
+    written = materialize_tables(catalog, processed_dir)
+    written.update(build_dimensions(catalog, processed_dir))
+    written['events'] = materialize_event_table(catalog, processed_dir)
+    for table, rows in written.items():
+        print(f"  📊 Tabla {table}: {rows} filas")
+    print(f"  🗺️  Mapas de calor apilados: {materialize_heatmaps(catalog, processed_dir)} partido-equipo")
+    print(f"  ⏱️  Series por minuto apiladas: {materialize_timelines(catalog, processed_dir)} partido-equipo")
+    print(f"  🔎 Índice de redes similares: {materialize_embedding_index(catalog, processed_dir)} partido-equipo")
+    applied, removed = update_rollups(catalog, processed_dir)
+    print(f"  🏅 Acumulados de temporada: {applied} partidos aplicados, {removed} retirados")
+    return written
+
+
+def ingest_catalog(raw_dir=DEFAULT_RAW_DIR, processed_dir=None, stages=None, force=False):
+    """Ingesta todos los partidos del catálogo global"""
+    raw_dir = Path(raw_dir)
+    catalog = load_catalog(raw_dir)
+    t0 = time.perf_counter()
+    updated = errors = 0
+    for match in catalog:
+        json_path = raw_dir / match['filepath']
+        if not json_path.exists():
+            continue
+        try:
+            if ingest_match(json_path, match_key(match), processed_dir, stages, force):
+                updated += 1
+        except Exception as e:
+            errors += 1
+            print(f"  ⚠️  Error procesando {match['filepath']}: {e}")
+    if updated or not (tables_dir(processed_dir) / 'dim_players.parquet').exists():
+        materialize_aggregates(catalog, processed_dir)
+    else:
+        # Sin partidos nuevos: solo se completan acumulados faltantes o interrumpidos
+        update_rollups(catalog, processed_dir)
+    elapsed = time.perf_counter() - t0
+    print(f"✅ {updated} partidos actualizados de {len(catalog)} en {elapsed:.1f}s ({errors} errores)")
+    return updated, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precalcula datos derivados por partido')
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--processed-dir', default=str(DEFAULT_PROCESSED_DIR))
+    parser.add_argument('--stage', action='append', help='Etapa a ejecutar (repetible). Por defecto: todas')
+    parser.add_argument('--force', action='store_true', help='Recalcular aunque esté actualizado')
+    args = parser.parse_args()
+    print(f"⚙️  Etapas: {', '.join(args.stage or [name for name, _, _ in STAGES])}")
+    _, errors = ingest_catalog(args.raw_dir, args.processed_dir, args.stage, args.force)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Demonio de ingesta: mantiene el catálogo y los datos derivados al día vigilando data/raw.
+Recorre el árbol País/Competición/Temporada cada --interval segundos (polling, sin
+depender de notificaciones del sistema de archivos). Un archivo nuevo o modificado se
+procesa recién cuando su tamaño y mtime no cambian durante --debounce segundos, para
+no leer copias a medio escribir. Cada tanda se reparte en un pool acotado de procesos
+(metadata + ingest_match); al terminar se reescribe matches_metadata.json y se
+rematerializan las tablas y agregados. El estado se publica en
+data/processed/ingest_status.json, que la barra lateral de la app muestra.
+
+Uso: python ingest_daemon.py [--interval 5] [--debounce 10] [--workers 2] [--once]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from generate_metadata import match_metadata, write_metadata
+from ingest import ingest_match, load_catalog, materialize_aggregates
+from prewarm import lower_priority
+from processed_store import DEFAULT_PROCESSED_DIR, temp_path
+from raw_storage import DEFAULT_RAW_DIR, is_match_file, match_key
+
+WATCH_INTERVAL = float(os.environ.get('FUTBOL_WATCH_INTERVAL', 5))
+WATCH_DEBOUNCE = float(os.environ.get('FUTBOL_WATCH_DEBOUNCE', 10))
+WATCH_WORKERS = int(os.environ.get('FUTBOL_WATCH_WORKERS', 2))
+STATUS_FILENAME = 'ingest_status.json'
+MAX_RECENT_ERRORS = 20
+# Cada cuántos partidos terminados se actualiza el estado durante una tanda
+STATUS_EVERY = 10
+
+
+def scan_raw_tree(raw_dir):
+    """{filepath relativo: (tamaño, mtime_ns)} de los JSON en País/Competición/Temporada/"""
+    raw_dir = Path(raw_dir)
+    files = {}
+    for path in raw_dir.glob('*/*/*/*'):
+        relative = path.relative_to(raw_dir)
+        if any(part.startswith('.') for part in relative.parts) or not is_match_file(path):
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue  # borrado entre el listado y el stat
+        files[relative.as_posix()] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def process_file(raw_dir, filepath, processed_dir=None, entry=None):
+    """Ingiere un partido (worker). Devuelve (entrada del catálogo, etapas recalculadas)"""
+    json_path = Path(raw_dir) / filepath
+    meta = entry or match_metadata(json_path, raw_dir)
+    updated = ingest_match(json_path, match_key(meta), processed_dir)
+    if updated and entry is not None:
+        # El JSON cambió: la metadata también puede haber cambiado
+        meta = match_metadata(json_path, raw_dir)
+    return meta, updated
+
+
+def status_path(processed_dir=None):
+    return Path(processed_dir or DEFAULT_PROCESSED_DIR) / STATUS_FILENAME
+
+
+def read_status(processed_dir=None):
+    """Estado publicado por el demonio (None si nunca corrió); 'stale' si dejó de actualizarlo"""
+    path = status_path(processed_dir)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return None
+    age = time.time() - status.get('updated_at', 0)
+    status['age_s'] = age
+    status['stale'] = status.get('state') != 'stopped' and age > 3 * status.get('interval', WATCH_INTERVAL) + 60
+    return status
+
+
+class IngestDaemon:
+    """Vigila data/raw por polling y mantiene catálogo, etapas y agregados al día"""
+
+    def __init__(self, raw_dir=DEFAULT_RAW_DIR, processed_dir=None, interval=WATCH_INTERVAL,
+                 debounce=WATCH_DEBOUNCE, workers=WATCH_WORKERS):
+        self.raw_dir = Path(raw_dir)
+        self.processed_dir = Path(processed_dir or DEFAULT_PROCESSED_DIR)
+        self.interval = interval
+        self.debounce = debounce
+        self.workers = max(1, workers)
+        self.catalog = {m['filepath']: m for m in load_catalog(self.raw_dir)}
+        # filepath -> (stat, momento en que se vio ese stat por primera vez)
+        self.seen = {}
+        # filepath -> stat ya procesado (al arrancar todo se revisa una vez: lo fresco se salta rápido)
+        self.done = {}
+        self.errors = deque(maxlen=MAX_RECENT_ERRORS)
+        self.status = {
+            'state': 'starting', 'pid': os.getpid(), 'started_at': time.time(),
+            'raw_dir': str(self.raw_dir), 'interval': interval, 'debounce': debounce,
+            'workers': self.workers, 'matches': len(self.catalog), 'pending': 0,
+            'queued': 0, 'completed': 0, 'last_batch': None, 'recent_errors': []
+        }
+        self._pool = None
+
+    def write_status(self, **changes):
+        """Publica el estado (escritura atómica: la app puede leerlo en cualquier momento)"""
+        self.status.update(changes, updated_at=time.time(), matches=len(self.catalog),
+                           recent_errors=list(self.errors))
+        path = status_path(self.processed_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.status, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def pool(self):
+        if self._pool is None:
+            # spawn + baja prioridad, igual que prewarm: la app puede estar sirviendo en la misma máquina
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=lower_priority,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def poll(self):
+        """Un ciclo: detecta cambios, ingiere los archivos estables y actualiza catálogo y agregados"""
+        files = scan_raw_tree(self.raw_dir)
+        now = time.monotonic()
+        wall = time.time()
+        for filepath, stat in files.items():
+            if self.seen.get(filepath, (None,))[0] != stat:
+                # Un archivo que ya no se modifica hace más de `debounce` segundos está estable
+                quiet = wall - stat[1] / 1e9 >= self.debounce
+                self.seen[filepath] = (stat, now - self.debounce if quiet else now)
+        removed = [filepath for filepath in set(self.catalog) | set(self.seen) if filepath not in files]
+        for filepath in removed:
+            self.seen.pop(filepath, None)
+            self.done.pop(filepath, None)
+        removed = [filepath for filepath in removed if self.catalog.pop(filepath, None) is not None]
+
+        changed = [filepath for filepath, (stat, _) in self.seen.items() if self.done.get(filepath) != stat]
+        ready = sorted(filepath for filepath in changed if now - self.seen[filepath][1] >= self.debounce)
+        pending = len(changed) - len(ready)
+        if not ready and not removed:
+            self.write_status(state='idle', pending=pending, queued=0)
+            return pending
+
+        t0 = time.perf_counter()
+        ingested = unchanged = errors = 0
+        self.write_status(state='ingesting', pending=pending, queued=len(ready), completed=0)
+        futures = {self.pool().submit(process_file, str(self.raw_dir), filepath, str(self.processed_dir),
+                                      self.catalog.get(filepath)): filepath
+                   for filepath in ready}
+        for completed, future in enumerate(as_completed(futures), 1):
+            filepath = futures[future]
+            # Con error también se marca como procesado: se reintenta cuando el archivo vuelva a cambiar
+            self.done[filepath] = self.seen[filepath][0]
+            try:
+                meta, updated = future.result()
+            except Exception as e:
+                errors += 1
+                self.errors.append({'filepath': filepath, 'error': str(e), 'at': time.time()})
+                print(f"  ⚠️  Error procesando {filepath}: {e}")
+            else:
+                if updated or filepath not in self.catalog:
+                    ingested += 1
+                else:
+                    unchanged += 1
+                self.catalog[filepath] = meta
+            if completed % STATUS_EVERY == 0:
+                self.write_status(completed=completed)
+
+        if ingested or removed:
+            self.write_status(state='materializing', completed=len(ready))
+            catalog = [self.catalog[filepath] for filepath in sorted(self.catalog)]
+            write_metadata(self.raw_dir, catalog)
+            materialize_aggregates(catalog, self.processed_dir)
+        elapsed = time.perf_counter() - t0
+        print(f"✅ {ingested} partidos ingeridos, {unchanged} sin cambios, {len(removed)} eliminados "
+              f"en {elapsed:.1f}s ({errors} errores)")
+        self.write_status(state='idle', pending=pending, queued=0, completed=len(ready), last_batch={
+            'finished_at': time.time(), 'ingested': ingested, 'unchanged': unchanged,
+            'removed': len(removed), 'errors': errors, 'seconds': round(elapsed, 2)
+        })
+        return pending
+
+    def run(self, once=False):
+        """Bucle principal; con once=True termina cuando no quedan archivos por estabilizarse"""
+        print(f"👀 Vigilando {self.raw_dir} cada {self.interval:g}s (debounce {self.debounce:g}s, "
+              f"{self.workers} procesos)")
+        try:
+            while True:
+                pending = self.poll()
+                if once and not pending:
+                    break
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\n🛑 Detenido")
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+            self.write_status(state='stopped', queued=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mantiene catálogo y datos derivados al día vigilando data/raw')
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--processed-dir', default=str(DEFAULT_PROCESSED_DIR))
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL, help='Segundos entre recorridos')
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                        help='Segundos sin cambios antes de procesar un archivo')
+    parser.add_argument('--workers', type=int, default=WATCH_WORKERS, help='Procesos de ingesta en paralelo')
+    parser.add_argument('--once', action='store_true', help='Procesar lo pendiente y salir')
+    args = parser.parse_args()
+    IngestDaemon(args.raw_dir, args.processed_dir, args.interval, args.debounce, args.workers).run(args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Redes de pases por segmento de alineación.
+Los límites de segmento son los cambios (jugador que sale) y las expulsiones
+(segunda amarilla o roja) de cualquiera de los equipos: dentro de un segmento las
+dos alineaciones son fijas, así que las posiciones promedio no mezclan jugadores
+que nunca estuvieron juntos en cancha. Todas las redes de un equipo salen de un
+solo ordenamiento de sus pases por (segmento, jugador) y reducciones por grupo.
+"""
+
+import numpy as np
+
+from dimensions import short_name
+from event_query import select_events
+from match_events import PASS, CARD, PLAYER_OFF, PLAYER_ON, Q_SECOND_YELLOW, Q_RED_CARD, has_qualifier
+from network_analytics import infer_receivers
+from xt_calculator import get_xt_values
+
+
+def lineup_boundaries(events, teams=None):
+    """Índices de evento donde cambia alguna alineación (uno por instante)"""
+    change = events['type_id'] == PLAYER_OFF
+    change |= (events['type_id'] == CARD) & has_qualifier(events, (Q_SECOND_YELLOW, Q_RED_CARD))
+    if teams is not None:
+        change &= np.isin(events['team'], teams)
+    idx = np.flatnonzero(change)
+    # Varios cambios en el mismo instante abren un solo segmento
+    instant = np.stack([events['period'][idx], events['time_s'][idx]], axis=1).astype(float)
+    first = np.r_[True, np.any(np.diff(instant, axis=0) != 0, axis=1)] if len(idx) else np.zeros(0, bool)
+    return idx[first]
+
+
+def lineup_segments(events, teams=None):
+    """Segmentos [start, end) en índices de evento con minutos y los cambios que los abren"""
+    n = len(events['type_id'])
+    bounds = lineup_boundaries(events, teams)
+    starts, ends = np.r_[0, bounds], np.r_[bounds, n]
+    names = events['player_full_names']
+    segments = []
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        if end <= start:
+            continue
+        changes = []
+        if i > 0:
+            # Eventos de cambio/expulsión del mismo instante que el límite
+            same = ((events['period'] == events['period'][start]) & (events['time_s'] == events['time_s'][start])
+                    & (events['player'] >= 0))
+            if teams is not None:
+                same &= np.isin(events['team'], teams)
+            off = np.flatnonzero(same & (events['type_id'] == PLAYER_OFF))
+            on = np.flatnonzero(same & (events['type_id'] == PLAYER_ON))
+            red = np.flatnonzero(same & (events['type_id'] == CARD)
+                                 & has_qualifier(events, (Q_SECOND_YELLOW, Q_RED_CARD)))
+            for k, j in enumerate(off):
+                incoming = [on[m] for m in range(len(on)) if events['team'][on[m]] == events['team'][j]]
+                entering = short_name(names[events['player'][incoming[k]]]) if k < len(incoming) else '?'
+                changes.append(f"🔄 {short_name(names[events['player'][j]])} ➜ {entering}")
+            changes.extend(f"🟥 {short_name(names[events['player'][j]])}" for j in red)
+        minute_start = int(events['minute'][start]) if i > 0 else 0
+        minute_end = int(events['minute'][end - 1]) if end < n else int(events['minute'].max(initial=0))
+        segments.append({
+            'start': int(start), 'end': int(end),
+            'minute_start': minute_start, 'minute_end': minute_end,
+            'changes': changes,
+            'label': f"{minute_start}' - {minute_end}'" + (f"  {' · '.join(changes)}" if changes else '')
+        })
+    return segments
+
+
+def segment_team_networks(events, team, segments, invert_coords=False):
+    """Redes de un equipo en cada segmento (misma estructura que build_match_networks)"""
+    idx = select_events(events, PASS, team)
+    idx = idx[events['player'][idx] >= 0]
+    n_segments = len(segments)
+    starts = np.array([s['start'] for s in segments[1:]], dtype=np.int64)
+    seg = np.searchsorted(starts, idx, side='right')
+    players, local = np.unique(events['player'][idx], return_inverse=True)
+    n = len(players)
+    x, y = events['x'][idx].astype(float), events['y'][idx].astype(float)
+    end_x, end_y = events['end_x'][idx].astype(float), events['end_y'][idx].astype(float)
+    ok = events['outcome'][idx] & ~np.isnan(end_x) & ~np.isnan(end_y)
+    pass_xt = np.zeros(len(idx), dtype=np.float32)
+    pass_xt[ok] = get_xt_values(end_x[ok], end_y[ok]) - get_xt_values(x[ok], y[ok])
+
+    # Un solo orden por (segmento, jugador); cada grupo es un tramo contiguo
+    order = np.lexsort((local, seg))
+    key = seg[order] * max(n, 1) + local[order]
+    group_start = np.flatnonzero(np.r_[True, np.diff(key) != 0]) if len(key) else np.zeros(0, dtype=int)
+    group_seg, group_player = seg[order][group_start], local[order][group_start]
+    shape = (n_segments, n)
+    total = np.zeros(shape, dtype=int)
+    successful = np.zeros(shape, dtype=int)
+    node_xt = np.zeros(shape)
+    pos_x = np.full(shape, np.nan)
+    pos_y = np.full(shape, np.nan)
+    if len(key):
+        total[group_seg, group_player] = np.diff(np.r_[group_start, len(key)])
+        successful[group_seg, group_player] = np.add.reduceat(ok[order].astype(int), group_start)
+        node_xt[group_seg, group_player] = np.add.reduceat(np.where(ok, pass_xt, 0)[order], group_start)
+        pos_x[group_seg, group_player] = np.add.reduceat(x[order], group_start) / total[group_seg, group_player]
+        pos_y[group_seg, group_player] = np.add.reduceat(y[order], group_start) / total[group_seg, group_player]
+
+    # Receptor con las posiciones del segmento de cada pase (ausentes = NaN)
+    counts = np.zeros((n_segments, n, n), dtype=int)
+    flow = np.zeros((n_segments, n, n))
+    if ok.any() and n > 1:
+        passer, pass_seg = local[ok], seg[ok]
+        receiver, close = infer_receivers(passer, pos_x[pass_seg], pos_y[pass_seg], end_x[ok], end_y[ok])
+        at = (pass_seg[close], passer[close], receiver[close])
+        np.add.at(counts, at, 1)
+        np.add.at(flow, at, pass_xt[ok][close])
+
+    player_ids = events['player_ids'][players] if n else np.zeros(0, dtype=str)
+    player_names = events['player_names'][players] if n else np.zeros(0, dtype=str)
+    networks = []
+    for s in range(n_segments):
+        present = np.flatnonzero(total[s] > 0)
+        px, py = pos_x[s], pos_y[s]
+        if invert_coords:
+            px, py = 100 - px, 100 - py
+        positions = {str(player_ids[p]): {'x': px[p], 'y': py[p], 'name': str(player_names[p]),
+                                          'passes': int(successful[s, p]), 'xt': float(node_xt[s, p])}
+                     for p in present}
+        src, dst = np.nonzero(counts[s])
+        connections = {(str(player_ids[a]), str(player_ids[b])): {'count': int(counts[s, a, b]),
+                                                                 'xt': float(flow[s, a, b])}
+                       for a, b in zip(src, dst)}
+        networks.append({'positions': positions, 'connections': connections,
+                         'total': int(total[s].sum()), 'successful': int(successful[s].sum())})
+    return networks
+
+
+def build_segment_networks(events):
+    """Segmentos del partido y, por segmento, las redes de ambos equipos (el segundo invertido)"""
+    segments = lineup_segments(events, teams=[0, 1])
+    by_team = [segment_team_networks(events, team, segments, invert_coords=team == 1) for team in range(2)]
+    return {'segments': segments, 'networks': [list(pair) for pair in zip(*by_team)]}
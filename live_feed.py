@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Modo en vivo: redes de pases que se actualizan a medida que crece el feed del partido.
+FeedTail lee solo lo nuevo de un feed NDJSON que crece por append (un evento por
+línea; una línea con matchInfo aporta los equipos) o de un JSON que el proveedor
+reescribe cada tanto. LiveNetwork acumula por jugador y período sumas de posiciones,
+pases, xT y conexiones, de modo que cada actualización cuesta O(eventos nuevos).
+
+Las sumas se guardan en coordenadas crudas: la dirección de ataque de cada equipo y
+período (mismo criterio que normalize_direction) se aplica al armar la red, porque
+recién se conoce cuando llegan los primeros tiros. Los receptores de los pases nuevos
+se infieren con las posiciones promedio de ese momento; reassign_receivers recalcula
+todas las conexiones con las posiciones actuales (igual que la red del partido completo).
+
+La app solo sigue feeds de la carpeta de feeds en vivo (FUTBOL_LIVE_DIR, data/live).
+Un JSON a medio reescribir no corta el seguimiento: se conserva el estado anterior y
+se reintenta en la próxima lectura. Una línea NDJSON completa pero inválida se descarta
+(el feed es append-only, no se va a corregir) y se cuenta en FeedTail.skipped.
+
+Uso: python live_feed.py data/live/partido.ndjson [--interval 5]
+     python live_feed.py data/live/partido.ndjson --simulate partido.json [--batch 25]
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from match_events import (PASS, SHOT_TYPES, Q_GOAL_KICK, Q_OWN_GOAL, detect_match_format, has_qualifier,
+                          normalize_events)
+from network_analytics import infer_receivers
+from raw_storage import is_match_file, load_json
+from xt_calculator import get_xt_values
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+# Períodos 1-4 (tiempos y alargue) y 5 (penales); el 0 agrupa eventos sin período
+N_PERIODS = 6
+LIVE_REFRESH_SECONDS = int(os.environ.get('FUTBOL_LIVE_REFRESH', 5))
+DEFAULT_LIVE_DIR = Path(os.environ.get('FUTBOL_LIVE_DIR', Path(__file__).parent / 'data' / 'live'))
+
+
+def list_live_feeds(live_dir=DEFAULT_LIVE_DIR):
+    """Feeds (NDJSON o JSON de partido) de la carpeta de feeds en vivo, ordenados por nombre"""
+    live_dir = Path(live_dir)
+    if not live_dir.is_dir():
+        return []
+    return sorted(p for p in live_dir.iterdir()
+                  if p.is_file() and (p.name.lower().endswith(NDJSON_SUFFIXES) or is_match_file(p)))
+
+
+class FeedTail:
+    """Lee los eventos crudos nuevos de un feed (NDJSON por append o JSON reescrito)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.ndjson = self.path.name.lower().endswith(NDJSON_SUFFIXES)
+        self.format = None
+        self.match_info = {}
+        self.lineup = []
+        self._offset = 0
+        self._seen = 0
+        self._version = None
+        # Último error de lectura (None si la última lectura fue válida) y líneas descartadas
+        self.error = None
+        self.skipped = 0
+
+    def poll(self):
+        """(eventos nuevos, reset). reset=True si el feed se truncó o se reescribió desde cero"""
+        try:
+            return self._poll_ndjson() if self.ndjson else self._poll_json()
+        except FileNotFoundError:
+            return [], False
+
+    def _poll_ndjson(self):
+        size = os.path.getsize(self.path)
+        reset = size < self._offset
+        if reset:
+            self._offset = 0
+            self.skipped = 0
+        if size == self._offset:
+            return [], reset
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # Una línea sin '\n' todavía se está escribiendo: se lee en la próxima vuelta
+        end = chunk.rfind(b'\n') + 1
+        events = []
+        consumed = 0
+        self.error = None
+        while consumed < end:
+            line_end = chunk.index(b'\n', consumed) + 1
+            line = chunk[consumed:line_end]
+            if not line.strip():
+                consumed = line_end
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                # La línea ya terminó de escribirse: reintentarla congelaría el feed
+                self.error = f'línea inválida descartada en el byte {self._offset + consumed}: {e}'
+                self.skipped += 1
+                consumed = line_end
+                continue
+            consumed = line_end
+            if 'matchInfo' in record:
+                self.match_info = record['matchInfo']
+                self.format = 'stats_perform'
+            elif 'lineup' in record:
+                self.lineup = record['lineup']
+            else:
+                if self.format is None:
+                    self.format = 'stats_perform' if 'typeId' in record else 'f24'
+                events.append(record)
+        self._offset += consumed
+        return events, reset
+
+    def _poll_json(self):
+        stat = os.stat(self.path)
+        version = (stat.st_size, stat.st_mtime_ns)
+        if version == self._version:
+            return [], False
+        # El proveedor reescribe el archivo completo: hay que decodificarlo, pero solo
+        # los eventos a partir del último visto pasan a la red
+        try:
+            data = load_json(self.path)
+        except (ValueError, EOFError) as e:
+            # Reescritura a medio camino: sin cambios hasta la próxima lectura
+            self.error = f'JSON inválido: {e}'
+            return [], False
+        self.error = None
+        self._version = version
+        self.format = detect_match_format(data)
+        if self.format == 'stats_perform':
+            self.match_info = data.get('matchInfo', {})
+            self.lineup = data.get('liveData', {}).get('lineup', [])
+            raw_events = data.get('liveData', {}).get('event', [])
+        else:
+            raw_events = data.get('Event', [])
+        reset = len(raw_events) < self._seen
+        if reset:
+            self._seen = 0
+        events = raw_events[self._seen:]
+        self._seen = len(raw_events)
+        return events, reset
+
+    def decode(self, raw_events):
+        """Arrays normalizados (coordenadas crudas) de un lote de eventos del feed"""
+        if self.format == 'stats_perform':
+            data = {'matchInfo': self.match_info, 'liveData': {'event': raw_events, 'lineup': self.lineup}}
+        else:
+            data = {'Event': raw_events}
+        return normalize_events({'format': self.format, 'data': data}, canonical=False)
+
+
+class LiveNetwork:
+    """Acumuladores de la red de pases de ambos equipos, actualizados por lotes de eventos"""
+
+    def __init__(self):
+        self.team_ids, self.team_names = [], []
+        self.player_ids, self.player_names = [], []
+        self.player_team = np.zeros(0, dtype=int)
+        self._team_index, self._player_index = {}, {}
+        # Por jugador y período: suma de x/y de todos sus pases, pases, pases exitosos
+        # y xT en coordenadas crudas [0] o invertidas [1]
+        self.pos_sum = np.zeros((0, N_PERIODS, 2))
+        self.total = np.zeros((0, N_PERIODS), dtype=int)
+        self.successful = np.zeros((0, N_PERIODS), dtype=int)
+        self.xt = np.zeros((0, N_PERIODS, 2))
+        # Conexiones por período (pasador, receptor)
+        self.counts = np.zeros((N_PERIODS, 0, 0), dtype=int)
+        self.xt_flow = np.zeros((N_PERIODS, 0, 0))
+        # Evidencia de dirección por (equipo, período): x de tiros y de saques de arco
+        self.shot_x, self.goal_kick_x = {}, {}
+        # Pases exitosos con destino (para reasignar receptores)
+        self._completed = []
+        self.n_events = 0
+
+    def _team(self, team_id, name):
+        if team_id not in self._team_index:
+            self._team_index[team_id] = len(self.team_ids)
+            self.team_ids.append(team_id)
+            self.team_names.append(name)
+        return self._team_index[team_id]
+
+    def _player(self, player_id, name, team):
+        idx = self._player_index.get(player_id)
+        if idx is None:
+            idx = self._player_index[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+            self.player_names.append(name)
+            self.player_team = np.append(self.player_team, team)
+        else:
+            if self.player_names[idx].startswith('Player ') and not name.startswith('Player '):
+                self.player_names[idx] = name
+            if self.player_team[idx] < 0:
+                self.player_team[idx] = team
+        return idx
+
+    def _grow(self):
+        n, old = len(self.player_ids), len(self.total)
+        if n == old:
+            return
+        extra = n - old
+        self.pos_sum = np.concatenate([self.pos_sum, np.zeros((extra, N_PERIODS, 2))])
+        self.total = np.concatenate([self.total, np.zeros((extra, N_PERIODS), dtype=int)])
+        self.successful = np.concatenate([self.successful, np.zeros((extra, N_PERIODS), dtype=int)])
+        self.xt = np.concatenate([self.xt, np.zeros((extra, N_PERIODS, 2))])
+        self.counts = np.pad(self.counts, ((0, 0), (0, extra), (0, extra)))
+        self.xt_flow = np.pad(self.xt_flow, ((0, 0), (0, extra), (0, extra)))
+
+    def update(self, events):
+        """Incorpora un lote de eventos (normalize_events con canonical=False)"""
+        if events is None or not len(events['type_id']):
+            return 0
+        team_map = np.array([self._team(tid, name) for tid, name in
+                             zip(events['team_ids'].tolist(), events['team_names'].tolist())] + [-1])
+        player_team = team_map[events['player_team']] if len(events['player_team']) else np.zeros(0, dtype=int)
+        player_map = np.array([self._player(pid, name, team) for pid, name, team in
+                               zip(events['player_ids'].tolist(), events['player_names'].tolist(),
+                                   player_team.tolist())] + [-1])
+        self._grow()
+        team = team_map[events['team']]
+        player = player_map[events['player']]
+        period = np.clip(events['period'], 0, N_PERIODS - 1)
+        x, y = events['x'].astype(float), events['y'].astype(float)
+
+        shots = np.isin(events['type_id'], SHOT_TYPES) & ~has_qualifier(events, Q_OWN_GOAL) & (team >= 0)
+        goal_kicks = (events['type_id'] == PASS) & has_qualifier(events, Q_GOAL_KICK) & (team >= 0)
+        for mask, evidence in ((shots, self.shot_x), (goal_kicks, self.goal_kick_x)):
+            for t, p, value in zip(team[mask], period[mask], x[mask]):
+                evidence.setdefault((int(t), int(p)), []).append(value)
+
+        passes = (events['type_id'] == PASS) & (team >= 0) & (player >= 0)
+        p, per = player[passes], period[passes]
+        px, py = x[passes], y[passes]
+        end_x, end_y = events['end_x'][passes].astype(float), events['end_y'][passes].astype(float)
+        np.add.at(self.pos_sum, (p, per, 0), px)
+        np.add.at(self.pos_sum, (p, per, 1), py)
+        np.add.at(self.total, (p, per), 1)
+        ok = events['outcome'][passes] & ~np.isnan(end_x) & ~np.isnan(end_y)
+        p, per, px, py, end_x, end_y = p[ok], per[ok], px[ok], py[ok], end_x[ok], end_y[ok]
+        xt = np.stack([get_xt_values(end_x, end_y) - get_xt_values(px, py),
+                       get_xt_values(100 - end_x, 100 - end_y) - get_xt_values(100 - px, 100 - py)], axis=1)
+        np.add.at(self.successful, (p, per), 1)
+        np.add.at(self.xt, (p, per, 0), xt[:, 0])
+        np.add.at(self.xt, (p, per, 1), xt[:, 1])
+        completed = (p, per, end_x, end_y, xt)
+        self._completed.append(completed)
+        self._assign(*completed)
+        self.n_events += len(events['type_id'])
+        return len(events['type_id'])
+
+    def flips(self):
+        """(equipo, período) -> True si ataca hacia x=0 (criterio de attack_direction_flips)"""
+        flips = np.zeros((max(len(self.team_ids), 1), N_PERIODS), dtype=bool)
+        for (team, period), values in self.goal_kick_x.items():
+            flips[team, period] = period > 0 and np.median(values) > 50
+        for (team, period), values in self.shot_x.items():
+            flips[team, period] = period > 0 and np.median(values) < 50
+        return flips
+
+    def _player_flips(self):
+        flips = self.flips()
+        return np.where(self.player_team[:, None] >= 0, flips[np.maximum(self.player_team, 0)], False)
+
+    def positions(self, period=None):
+        """Posición promedio canónica (x, y) y pases totales por jugador"""
+        flipped = self._player_flips()
+        n = self.total
+        sums = np.where(flipped[..., None], 100 * n[..., None] - self.pos_sum, self.pos_sum)
+        if period is not None:
+            sums, n = sums[:, period], n[:, period]
+        else:
+            sums, n = sums.sum(axis=1), n.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums[:, 0] / n, sums[:, 1] / n, n
+
+    def _assign(self, player, period, end_x, end_y, xt):
+        """Suma a las conexiones los pases dados, con receptor según las posiciones actuales"""
+        if not len(player):
+            return
+        pos_x, pos_y, n = self.positions()
+        flipped = self._player_flips()[player, period]
+        end_x = np.where(flipped, 100 - end_x, end_x)
+        end_y = np.where(flipped, 100 - end_y, end_y)
+        pass_xt = np.where(flipped, xt[:, 1], xt[:, 0])
+        for team in np.unique(self.player_team[player]):
+            members = np.flatnonzero((self.player_team == team) & (n > 0))
+            sel = self.player_team[player] == team
+            if len(members) < 2 or not sel.any():
+                continue
+            passer = np.searchsorted(members, player[sel])
+            receiver, close = infer_receivers(passer, pos_x[members], pos_y[members], end_x[sel], end_y[sel])
+            index = (period[sel][close], player[sel][close], members[receiver[close]])
+            np.add.at(self.counts, index, 1)
+            np.add.at(self.xt_flow, index, pass_xt[sel][close])
+
+    def reassign_receivers(self):
+        """Recalcula todas las conexiones con las posiciones promedio actuales"""
+        self.counts[:] = 0
+        self.xt_flow[:] = 0
+        if self._completed:
+            self._assign(*(np.concatenate(parts) for parts in zip(*self._completed)))
+            self._completed = [tuple(np.concatenate(parts) for parts in zip(*self._completed))]
+
+    def snapshot(self, period=None):
+        """Redes de ambos equipos con la misma estructura que build_match_networks"""
+        pos_x, pos_y, n = self.positions(period)
+        flipped = self._player_flips()
+        take = slice(None) if period is None else slice(period, period + 1)
+        successful = self.successful[:, take].sum(axis=1)
+        xt = np.where(flipped, self.xt[..., 1], self.xt[..., 0])[:, take].sum(axis=1)
+        counts = self.counts[take].sum(axis=0)
+        xt_flow = self.xt_flow[take].sum(axis=0)
+        networks = []
+        for team in range(2):
+            members = np.flatnonzero((self.player_team == team) & (n > 0))
+            positions = {}
+            for i in members:
+                positions[self.player_ids[i]] = {
+                    # El segundo equipo se dibuja atacando hacia la izquierda
+                    'x': 100 - pos_x[i] if team == 1 else pos_x[i],
+                    'y': 100 - pos_y[i] if team == 1 else pos_y[i],
+                    'name': self.player_names[i],
+                    'passes': int(successful[i]),
+                    'xt': float(xt[i])
+                }
+            connections = {}
+            sub = counts[np.ix_(members, members)]
+            for a, b in zip(*np.nonzero(sub)):
+                connections[(self.player_ids[members[a]], self.player_ids[members[b]])] = {
+                    'count': int(sub[a, b]), 'xt': float(xt_flow[members[a], members[b]])}
+            networks.append({
+                'positions': positions,
+                'connections': connections,
+                'total': int(n[members].sum()),
+                'successful': int(successful[members].sum())
+            })
+        return networks
+
+
+class LiveMatch:
+    """Feed + red en vivo: poll() incorpora solo los eventos nuevos"""
+
+    def __init__(self, path):
+        self.feed = FeedTail(path)
+        self.network = LiveNetwork()
+        self.updated_at = None
+        # Última figura renderizada por la pestaña y sus parámetros
+        self.figure = None
+        self.figure_params = None
+
+    def poll(self):
+        """Lee el feed y actualiza la red. Devuelve la cantidad de eventos nuevos"""
+        raw_events, reset = self.feed.poll()
+        if reset:
+            self.network = LiveNetwork()
+        if not raw_events:
+            return 0
+        added = self.network.update(self.feed.decode(raw_events))
+        self.updated_at = time.time()
+        return added
+
+    def team_names(self):
+        names = list(self.network.team_names[:2])
+        contestants = self.feed.match_info.get('contestant', [])
+        for i, contestant in enumerate(contestants[:2]):
+            if i >= len(names):
+                names.append(contestant.get('name', f"Team {contestant.get('id')}"))
+        return names + [f'Team {i + 1}' for i in range(len(names), 2)]
+
+
+def simulate_feed(match_path, feed_path, batch=25, interval=1.0):
+    """Escribe un partido terminado como feed NDJSON que crece de a lotes (feed local de prueba)"""
+    data = load_json(match_path)
+    format_type = detect_match_format(data)
+    if format_type == 'stats_perform':
+        raw_events = data.get('liveData', {}).get('event', [])
+        header = [{'matchInfo': data.get('matchInfo', {})}, {'lineup': data.get('liveData', {}).get('lineup', [])}]
+    else:
+        raw_events = data.get('Event', [])
+        header = []
+    feed_path = Path(feed_path)
+    feed_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(feed_path, 'w', encoding='utf-8') as f:
+        for record in header:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        for start in range(0, len(raw_events), batch):
+            for event in raw_events[start:start + batch]:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+            f.flush()
+            time.sleep(interval)
+    return len(raw_events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sigue un feed en vivo y actualiza las redes de pases')
+    parser.add_argument('feed', help='Feed NDJSON (.ndjson/.jsonl) o JSON reescrito periódicamente')
+    parser.add_argument('--interval', type=float, default=LIVE_REFRESH_SECONDS, help='Segundos entre lecturas')
+    parser.add_argument('--simulate', help='JSON de un partido terminado para generar un feed de prueba')
+    parser.add_argument('--batch', type=int, default=25, help='Eventos por escritura en --simulate')
+    args = parser.parse_args()
+
+    if args.simulate:
+        print(f"📡 Simulando feed {args.feed} desde {args.simulate}")
+        total = simulate_feed(args.simulate, args.feed, args.batch, args.interval)
+        print(f"✅ {total} eventos escritos")
+        return
+
+    live = LiveMatch(args.feed)
+    print(f"📡 Siguiendo {args.feed} (Ctrl+C para salir)")
+    try:
+        while True:
+            t0 = time.perf_counter()
+            added = live.poll()
+            if live.feed.error:
+                print(f"  ⚠️  {live.feed.error} ({live.feed.skipped} líneas descartadas)")
+            if added:
+                names = live.team_names()
+                summary = ', '.join(f"{name}: {net['successful']}/{net['total']} pases"
+                                    for name, net in zip(names, live.network.snapshot()))
+                print(f"  +{added} eventos ({live.network.n_events} total) en "
+                      f"{(time.perf_counter() - t0) * 1000:.1f} ms - {summary}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
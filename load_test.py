@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de extremo a extremo del dashboard (app.py).
+Genera un archivo de partidos sintéticos (synthetic_data.py) y simula N sesiones
+concurrentes con streamlit.testing (AppTest). Cada sesión corre en su propio hilo,
+como en el servidor de Streamlit, abre la app y sigue un guion reproducible (misma
+semilla = mismas acciones): elige competición, temporada, partido, período y sliders.
+Informa percentiles de latencia y throughput por etapa, errores y pico de RSS del
+proceso; --output guarda el reporte en JSON para comparar configuraciones.
+
+Uso: python load_test.py --sessions 8 --actions 6 [--matches 30] [--seed 7] [--ingest] [--output reporte.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_PATH = Path(__file__).parent / 'app.py'
+# (país, competición) de los archivos sintéticos; una semilla distinta por competición
+COMPETITIONS = [('Argentina', 'Liga_Profesional'), ('Argentina', 'Copa_Argentina'), ('Ecuador', 'Liga_Pro')]
+ACTIONS = ('competition', 'season', 'match', 'period', 'min_passes', 'time_range')
+STAGES = ('open',) + ACTIONS
+PERCENTILES = (50, 90, 95, 99)
+
+
+def prepare_data(work_dir, n_matches, seed, n_competitions, ingest=False):
+    """Archivo sintético en work_dir/raw (+ metadata y, opcionalmente, ingesta completa)"""
+    # Las rutas de datos se leen de FUTBOL_* al importar los módulos de la app
+    work_dir = Path(work_dir)
+    os.environ['FUTBOL_RAW_DIR'] = str(work_dir / 'raw')
+    os.environ['FUTBOL_PROCESSED_DIR'] = str(work_dir / 'processed')
+    os.environ.setdefault('FUTBOL_CACHE_DIR', str(work_dir / 'processed' / 'cache'))
+    from synthetic_data import generate_archive
+    from generate_metadata import generate_metadata_from_jsons
+
+    raw_dir = work_dir / 'raw'
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not (raw_dir / 'matches_metadata.json').exists():
+            per_competition = max(1, n_matches // n_competitions)
+            for i, (country, competition) in enumerate(COMPETITIONS[:n_competitions]):
+                generate_archive(work_dir, per_competition, seed + i, country, competition)
+            generate_metadata_from_jsons(raw_dir)
+        if ingest:
+            from ingest import ingest_catalog
+            ingest_catalog(raw_dir, work_dir / 'processed')
+    return raw_dir
+
+
+def session_plan(seed, session, n_actions):
+    """Guion de una sesión: acciones y generador aleatorio propio (reproducibles)"""
+    rng = random.Random(f'{seed}:{session}')
+    return [rng.choice(ACTIONS) for _ in range(n_actions)], rng
+
+
+def _widget(elements, label, key=None):
+    for element in elements:
+        if element.label == label and element.key == key:
+            return element
+    return None
+
+
+def _interactions(at, action, rng):
+    """Widgets a modificar (en orden) para una acción, o [] si no aplica en la pantalla actual"""
+    sidebar = at.sidebar
+    if action == 'competition':
+        box = _widget(sidebar.selectbox, "Liga:")
+        return [(box, rng.choice(box.options))] if box else []
+    if action == 'season':
+        box = _widget(sidebar.selectbox, "Season:")
+        return [(box, rng.choice(box.options))] if box else []
+    if action == 'match':
+        steps = []
+        mode = _widget(sidebar.radio, "Match type:")
+        if mode is not None and mode.value != "Partido específico":
+            steps.append((mode, "Partido específico"))
+        return steps + [('match', None)]
+    if action == 'period':
+        box = _widget(at.selectbox, "Período:")
+        return [(box, rng.choice([("Partido Completo", None), ("1er Tiempo", 1), ("2do Tiempo", 2)]))] if box else []
+    if action == 'min_passes':
+        slider = _widget(at.slider, "Pases mínimos (conexiones):")
+        return [(slider, rng.randint(1, 10))] if slider else []
+    if action == 'time_range':
+        check = _widget(at.checkbox, "Filtrar por minutos")
+        if check is None:
+            return []
+        start = rng.randint(0, 60)
+        return [(check, True), ('time_range', (start, rng.randint(start + 10, 90)))]
+    return []
+
+
+def _resolve(at, target, rng, value):
+    """Widgets que solo existen después del paso anterior (selector de partido, rango de minutos)"""
+    if target == 'match':
+        box = _widget(at.selectbox, "Partido:")
+        if box is None:
+            return None, None
+        # Las opciones son ids de partido mostrados con labels.get: se elige un id de la página
+        labels = getattr(box.format_func, '__self__', None)
+        return box, rng.choice(list(labels)) if isinstance(labels, dict) and labels else box.value
+    if target == 'time_range':
+        return _widget(at.slider, "Selecciona rango de minutos:"), value
+    return target, value
+
+
+def run_session(session, args, results, errors, barrier):
+    """Ejecuta el guion de una sesión y registra la latencia de cada interacción"""
+    from streamlit.testing.v1 import AppTest
+    actions, rng = session_plan(args.seed, session, args.actions)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=args.timeout)
+    barrier.wait()
+
+    def timed(stage, func):
+        t0 = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            errors.append((session, stage, repr(e)))
+            return False
+        results.append((stage, time.perf_counter() - t0, t0))
+        if at.exception:
+            errors.append((session, stage, at.exception[0].value))
+        return True
+
+    if not timed('open', at.run):
+        return
+    for action in actions:
+        for target, value in _interactions(at, action, rng):
+            widget, value = _resolve(at, target, rng, value)
+            if widget is None:
+                break
+            if not timed(action, lambda: widget.set_value(value).run()):
+                break
+
+
+def _rss_mb():
+    """RSS actual del proceso en MB (None si el sistema no lo expone en /proc)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS, bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def summarize(results, wall_time):
+    """Latencias (ms) y throughput por etapa"""
+    rows = []
+    for stage in STAGES + ('total',):
+        latencies = np.array([latency for name, latency, _ in results if stage in (name, 'total')]) * 1000
+        if not len(latencies):
+            continue
+        row = {'stage': stage, 'count': len(latencies)}
+        row.update({f'p{q}_ms': round(float(np.percentile(latencies, q)), 1) for q in PERCENTILES})
+        row['max_ms'] = round(float(latencies.max()), 1)
+        row['throughput_per_s'] = round(len(latencies) / wall_time, 2)
+        rows.append(row)
+    return rows
+
+
+def run_load_test(args):
+    """Prepara los datos, lanza las sesiones en paralelo y devuelve el reporte"""
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix='futbol_load_'))
+    t0 = time.perf_counter()
+    prepare_data(work_dir, args.matches, args.seed, args.competitions, args.ingest)
+    setup_time = time.perf_counter() - t0
+    baseline_rss = _rss_mb()
+
+    results, errors = [], []
+    barrier = threading.Barrier(args.sessions)
+    threads = [threading.Thread(target=run_session, args=(i, args, results, errors, barrier),
+                                name=f'session-{i}', daemon=True)
+               for i in range(args.sessions)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - t0
+
+    return {
+        'config': {
+            'label': args.label, 'sessions': args.sessions, 'actions': args.actions,
+            'matches': args.matches, 'competitions': args.competitions, 'seed': args.seed,
+            'ingest': args.ingest, 'work_dir': str(work_dir),
+            'env': {k: v for k, v in os.environ.items() if k.startswith('FUTBOL_')},
+        },
+        'setup_s': round(setup_time, 2),
+        'wall_s': round(wall_time, 2),
+        'baseline_rss_mb': round(baseline_rss, 1) if baseline_rss is not None else None,
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'stages': summarize(results, wall_time),
+        'errors': [{'session': s, 'stage': stage, 'error': str(e)} for s, stage, e in errors],
+    }
+
+
+def print_report(report):
+    import pandas as pd
+    config = report['config']
+    print(f"\n📊 {config['sessions']} sesiones × {config['actions']} acciones · {config['matches']} partidos "
+          f"· semilla {config['seed']} · {'con' if config['ingest'] else 'sin'} ingesta previa")
+    print(f"⏱️  Preparación {report['setup_s']}s · prueba {report['wall_s']}s")
+    print(pd.DataFrame(report['stages']).to_string(index=False))
+    rss = f"{report['baseline_rss_mb']} MB al inicio, " if report['baseline_rss_mb'] is not None else ''
+    print(f"🧠 RSS: {rss}pico {report['peak_rss_mb']} MB")
+    if report['errors']:
+        print(f"⚠️  {len(report['errors'])} errores")
+        for error in report['errors'][:10]:
+            print(f"  sesión {error['session']} [{error['stage']}]: {error['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga del dashboard con sesiones concurrentes')
+    parser.add_argument('--sessions', type=int, default=8, help='Sesiones concurrentes')
+    parser.add_argument('--actions', type=int, default=6, help='Interacciones por sesión después de abrir la app')
+    parser.add_argument('--matches', type=int, default=30, help='Partidos sintéticos en total')
+    parser.add_argument('--competitions', type=int, default=2, choices=range(1, len(COMPETITIONS) + 1))
+    parser.add_argument('--seed', type=int, default=7, help='Semilla de datos y guiones')
+    parser.add_argument('--ingest', action='store_true', help='Ingerir todo antes de la prueba (caché caliente)')
+    parser.add_argument('--work-dir', help='Carpeta de datos (se reutiliza si ya existe)')
+    parser.add_argument('--timeout', type=float, default=300, help='Segundos máximos por interacción')
+    parser.add_argument('--label', default='', help='Nombre de la configuración en el reporte')
+    parser.add_argument('--output', help='Guardar el reporte en JSON')
+    args = parser.parse_args()
+
+    report = run_load_test(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Reporte guardado en {args.output}")
+    if report['errors']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Normalización de eventos a arrays NumPy columnares.
+Convierte un partido (Stats Perform o F24) en un dict de arrays ordenados
+por período y tiempo, base común para cadenas de posesión, carries, tiros y agregados.
+"""
+
+import numpy as np
+
+from raw_storage import load_json
+
+# Tipos de evento Opta usados por varios módulos
+PASS = 1
+OFFSIDE_PASS = 2
+TAKE_ON = 3
+FOUL = 4
+OUT = 5
+CORNER_AWARDED = 6
+TACKLE = 7
+INTERCEPTION = 8
+SAVE = 10
+CLAIM = 11
+CLEARANCE = 12
+MISS = 13
+POST = 14
+ATTEMPT_SAVED = 15
+GOAL = 16
+CARD = 17
+PLAYER_OFF = 18
+PLAYER_ON = 19
+BALL_RECOVERY = 49
+DISPOSSESSED = 50
+KEEPER_PICKUP = 52
+BALL_TOUCH = 61
+
+SHOT_TYPES = (MISS, POST, ATTEMPT_SAVED, GOAL)
+
+# Qualifiers de coordenadas finales
+Q_PASS_END_X = 140
+Q_PASS_END_Y = 141
+Q_GOAL_KICK = 124
+# Gol en contra: el evento 16 lo lleva el equipo que lo convirtió contra su propio arco
+Q_OWN_GOAL = 28
+# Qualifiers de tarjeta que dejan al equipo con uno menos
+Q_SECOND_YELLOW = 32
+Q_RED_CARD = 33
+
+EVENT_ARRAY_FIELDS = ('event_id', 'type_id', 'period', 'minute', 'second', 'time_s', 'team',
+                      'player', 'x', 'y', 'end_x', 'end_y', 'outcome')
+
+
+def detect_match_format(data):
+    """Detecta el formato de un JSON de partido ya decodificado"""
+    if 'Event' in data:
+        return 'f24'
+    elif 'matchInfo' in data and 'liveData' in data:
+        return 'stats_perform'
+    elif 'events' in data:
+        return 'generic'
+    return 'unknown'
+
+
+def read_match_file(json_path):
+    """Lee un JSON de partido sin depender de Streamlit (para ingesta y procesos batch)"""
+    data = load_json(json_path)
+    return {'format': detect_match_format(data), 'data': data}
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def normalize_events(match_obj, canonical=True):
+    """Convierte match_obj (salida de load_match_data) en arrays columnares ordenados.
+
+    canonical=False deja las coordenadas como vienen en el JSON (sin normalize_direction).
+    """
+    if match_obj is None:
+        return None
+    format_type = match_obj.get('format', 'unknown')
+    data = match_obj.get('data', {})
+    if format_type == 'stats_perform':
+        raw_events = data.get('liveData', {}).get('event', [])
+        keys = {'event_id': 'eventId', 'type': 'typeId', 'period': 'periodId', 'min': 'timeMin',
+                'sec': 'timeSec', 'team': 'contestantId', 'player': 'playerId', 'qid': 'qualifierId'}
+        match_id = data.get('matchInfo', {}).get('id', '')
+        contestants = data.get('matchInfo', {}).get('contestant', [])
+        team_ids = [str(c.get('id')) for c in contestants]
+        team_names = [c.get('name', f"Team {c.get('id')}") for c in contestants]
+    elif format_type == 'f24':
+        raw_events = data.get('Event', [])
+        keys = {'event_id': 'event_id', 'type': 'type_id', 'period': 'period_id', 'min': 'min',
+                'sec': 'sec', 'team': 'team_id', 'player': 'player_id', 'qid': 'qualifier_id'}
+        match_id = str(data.get('id', data.get('game_id', '')))
+        team_ids = []
+        team_names = []
+    else:
+        return None
+
+    n = len(raw_events)
+    event_id = np.zeros(n, dtype=np.int64)
+    type_id = np.zeros(n, dtype=np.int16)
+    period = np.zeros(n, dtype=np.int8)
+    minute = np.zeros(n, dtype=np.int16)
+    second = np.zeros(n, dtype=np.int8)
+    team = np.full(n, -1, dtype=np.int8)
+    player = np.full(n, -1, dtype=np.int32)
+    x = np.zeros(n, dtype=np.float32)
+    y = np.zeros(n, dtype=np.float32)
+    end_x = np.full(n, np.nan, dtype=np.float32)
+    end_y = np.full(n, np.nan, dtype=np.float32)
+    outcome = np.zeros(n, dtype=bool)
+    qual_counts = np.zeros(n, dtype=np.int32)
+    qual_ids = []
+    qual_values = []
+
+    team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+    player_index = {}
+    player_ids = []
+    player_names = []
+    player_team = []
+    default_outcome = 1 if format_type == 'f24' else 0
+    for i, event in enumerate(raw_events):
+        event_id[i] = int(event.get(keys['event_id']) or i)
+        type_id[i] = int(event.get(keys['type'], 0) or 0)
+        period[i] = int(event.get(keys['period'], 0) or 0)
+        minute[i] = int(event.get(keys['min'], 0) or 0)
+        second[i] = int(event.get(keys['sec'], 0) or 0)
+        team_id = event.get(keys['team'])
+        if team_id is not None:
+            team_id = str(team_id)
+            if team_id not in team_index:
+                team_index[team_id] = len(team_ids)
+                team_ids.append(team_id)
+                team_names.append(event.get('team_name', f'Team {team_id}'))
+            team[i] = team_index[team_id]
+        player_id = event.get(keys['player'])
+        if player_id:
+            player_id = str(player_id)
+            if player_id not in player_index:
+                player_index[player_id] = len(player_ids)
+                player_ids.append(player_id)
+                player_names.append('')
+                player_team.append(team[i])
+            player[i] = player_index[player_id]
+            if not player_names[player[i]]:
+                player_names[player[i]] = event.get('playerName') or event.get('player_name') or ''
+        x[i] = _to_float(event.get('x', 0))
+        y[i] = _to_float(event.get('y', 0))
+        outcome[i] = event.get('outcome', default_outcome) == 1
+        qualifiers = event.get('qualifier', [])
+        qual_counts[i] = len(qualifiers)
+        for q in qualifiers:
+            qid = int(q.get(keys['qid'], 0) or 0)
+            value = _to_float(q.get('value'))
+            qual_ids.append(qid)
+            qual_values.append(value)
+            if qid == Q_PASS_END_X:
+                end_x[i] = value
+            elif qid == Q_PASS_END_Y:
+                end_y[i] = value
+
+    # Nombres faltantes, nombres completos y equipo desde las alineaciones (Stats Perform)
+    player_full_names = [''] * len(player_ids)
+    for team_lineup in data.get('liveData', {}).get('lineup', []):
+        lineup_team = team_index.get(str(team_lineup.get('contestantId')), -1)
+        for p in team_lineup.get('player', []):
+            idx = player_index.get(str(p.get('playerId')))
+            if idx is None:
+                continue
+            name = p.get('matchName') or p.get('shortName') or ''
+            if not player_names[idx]:
+                player_names[idx] = name
+            full_name = ' '.join(part for part in (p.get('firstName'), p.get('lastName')) if part)
+            player_full_names[idx] = p.get('knownName') or full_name
+            if lineup_team >= 0:
+                player_team[idx] = lineup_team
+    player_names = [name or f'Player {pid}' for pid, name in zip(player_ids, player_names)]
+    player_full_names = [full or name for full, name in zip(player_full_names, player_names)]
+
+    qual_ptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(qual_counts, out=qual_ptr[1:])
+    qual_id = np.asarray(qual_ids, dtype=np.int16)
+    qual_value = np.asarray(qual_values, dtype=np.float32)
+
+    time_s = minute.astype(np.float32) * 60 + second
+    order = np.lexsort((event_id, time_s, period))
+    if not np.all(order == np.arange(n)):
+        # Reordenar también la tabla CSR de qualifiers
+        counts = qual_counts[order]
+        new_ptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(counts, out=new_ptr[1:])
+        take = np.repeat(qual_ptr[:-1][order] - new_ptr[:-1], counts) + np.arange(new_ptr[-1])
+        qual_id, qual_value = qual_id[take], qual_value[take]
+        qual_ptr = new_ptr
+
+    events = {
+        'format': np.array(format_type, dtype=str),
+        'event_id': event_id[order],
+        'type_id': type_id[order],
+        'period': period[order],
+        'minute': minute[order],
+        'second': second[order],
+        'time_s': time_s[order],
+        'team': team[order],
+        'player': player[order],
+        'x': x[order],
+        'y': y[order],
+        'end_x': end_x[order],
+        'end_y': end_y[order],
+        'outcome': outcome[order],
+        'qual_ptr': qual_ptr,
+        'qual_id': qual_id,
+        'qual_value': qual_value,
+        'team_ids': np.array(team_ids, dtype=str),
+        'team_names': np.array(team_names, dtype=str),
+        'player_ids': np.array(player_ids, dtype=str),
+        'player_names': np.array(player_names, dtype=str),
+        'player_full_names': np.array(player_full_names, dtype=str),
+        'player_team': np.array(player_team, dtype=np.int8),
+        'match_id': np.array(match_id, dtype=str)
+    }
+    if canonical:
+        normalize_direction(events)
+    return events
+
+
+def attack_direction_flips(events):
+    """Detecta por equipo y período si las coordenadas atacan hacia x=0.
+
+    Usa la mediana de x de los tiros, sin goles en contra (deben estar en campo rival) y,
+    si no hay tiros, la de los saques de arco (deben estar en campo propio). Devuelve una
+    matriz bool (equipo, período) con True donde hay que invertir.
+    """
+    n_teams = len(events['team_ids'])
+    n_periods = int(events['period'].max()) + 1 if len(events['period']) else 1
+    flips = np.zeros((n_teams, n_periods), dtype=bool)
+    # Los goles en contra ocurren junto al arco propio: no son evidencia de dirección
+    shots = np.isin(events['type_id'], SHOT_TYPES) & ~has_qualifier(events, Q_OWN_GOAL)
+    goal_kicks = (events['type_id'] == PASS) & has_qualifier(events, Q_GOAL_KICK)
+    for team in range(n_teams):
+        for period in range(1, n_periods):
+            group = (events['team'] == team) & (events['period'] == period)
+            if (group & shots).any():
+                flips[team, period] = np.median(events['x'][group & shots]) < 50
+            elif (group & goal_kicks).any():
+                flips[team, period] = np.median(events['x'][group & goal_kicks]) > 50
+    return flips
+
+
+def normalize_direction(events):
+    """Lleva x/y y end_x/end_y (in-place) a la dirección canónica: cada equipo ataca hacia x=100"""
+    flips = attack_direction_flips(events)
+    events['direction_flipped'] = flips
+    if not flips.any():
+        return events
+    team = events['team'].astype(int)
+    valid = team >= 0
+    flip = np.zeros(len(team), dtype=bool)
+    flip[valid] = flips[team[valid], events['period'][valid]]
+    for key in ('x', 'y', 'end_x', 'end_y'):
+        events[key][flip] = 100 - events[key][flip]
+    return events
+
+
+def qualifier_rows(events):
+    """Índice de evento de cada qualifier en la tabla CSR"""
+    counts = np.diff(events['qual_ptr'])
+    return np.repeat(np.arange(len(counts)), counts)
+
+
+def has_qualifier(events, qualifier_ids):
+    """Máscara booleana por evento: True si tiene alguno de los qualifiers indicados"""
+    n = len(events['type_id'])
+    mask = np.zeros(n, dtype=bool)
+    hits = np.isin(events['qual_id'], np.atleast_1d(qualifier_ids))
+    mask[qualifier_rows(events)[hits]] = True
+    return mask
+
+
+def qualifier_value(events, qualifier_id):
+    """Valor numérico de un qualifier por evento (NaN si no lo tiene)"""
+    values = np.full(len(events['type_id']), np.nan, dtype=np.float32)
+    hits = events['qual_id'] == qualifier_id
+    values[qualifier_rows(events)[hits]] = events['qual_value'][hits]
+    return values
@@ -0,0 +1,20 @@
+# match_selector.py
+# Selector de partido compartido por las pestañas que leen datos precalculados
+import streamlit as st
+
+from passing_network_tab import load_matches_metadata, select_match_paginated
+
+
+def select_match(raw_dir, key):
+    """Selector de partido (competición + partido paginado) dentro de la pestaña; etiquetas solo de la página visible"""
+    df_matches = load_matches_metadata(raw_dir, scope='global')
+    if df_matches is None or len(df_matches) == 0:
+        st.info("💡 Ejecuta `python generate_metadata.py` para habilitar esta sección")
+        return None
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        competitions = sorted(df_matches['competition_full_name'].unique().tolist())
+        competition = st.selectbox("Liga:", competitions, key=f"{key}_competition")
+    filtered = df_matches[df_matches['competition_full_name'] == competition]
+    with col2:
+        return select_match_paginated(filtered, key=key)
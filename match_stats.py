@@ -0,0 +1,239 @@
+"""
+Estadísticas materializadas por partido, equipo, jugador y período.
+La ingesta calcula un esquema fijo de agregados por partido (etapas 'team_stats'
+y 'player_stats') y materialize_tables los consolida en tablas Parquet
+(data/processed/tables) con columnas de catálogo para filtrar entre partidos.
+Período 0 = partido completo.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from archive_pipeline import PIPELINE_MEMORY_MB, memory_batches
+from match_events import PASS, FOUL, TACKLE, INTERCEPTION, SHOT_TYPES, GOAL
+from possession_chains import CONTROL_TYPES
+from processed_store import DEFAULT_PROCESSED_DIR, load_arrays, temp_path
+from raw_storage import match_key
+from xt_calculator import get_xt_values
+
+# Acciones defensivas para PPDA
+DEFENSIVE_ACTION_TYPES = (TACKLE, INTERCEPTION, FOUL)
+# Tercios del campo en coordenadas del equipo (atacando hacia x=100)
+ZONE_EDGES = (100 / 3, 200 / 3)
+ZONE_NAMES = ('def', 'mid', 'att')
+
+TEAM_STAT_COLUMNS = ['passes', 'successful_passes', 'pass_accuracy', 'possession', 'touches',
+                     'zone_def_pct', 'zone_mid_pct', 'zone_att_pct', 'ppda', 'defensive_actions',
+                     'xt', 'action_xt', 'shots', 'goals', 'xg']
+PLAYER_STAT_COLUMNS = ['passes', 'successful_passes', 'pass_accuracy', 'touches', 'xt', 'action_xt',
+                       'shots', 'goals', 'xg']
+CATALOG_COLUMNS = ['country', 'competition', 'competition_full_name', 'season', 'date', 'description']
+
+
+def _periods(events):
+    present = np.unique(events['period'])
+    return [0] + [int(p) for p in present if 0 < p < 5]
+
+
+def _pass_xt(events):
+    """xT de cada pase exitoso (0 para el resto de eventos)"""
+    ok = (events['type_id'] == PASS) & events['outcome'] & ~np.isnan(events['end_x'])
+    xt = np.zeros(len(ok), dtype=np.float32)
+    xt[ok] = (get_xt_values(events['end_x'][ok], events['end_y'][ok])
+              - get_xt_values(events['x'][ok], events['y'][ok]))
+    return xt
+
+
+def _action_xt(events, values):
+    """xT de todas las acciones con balón por evento (0 si no hay valoración)"""
+    if values is None:
+        return np.zeros(len(events['type_id']), dtype=np.float32)
+    return values['action_xt'] + values['carry_xt']
+
+
+def _shot_xg(events, shots):
+    xg = np.zeros(len(events['type_id']), dtype=np.float32)
+    if shots is not None and len(shots['shot_event']):
+        xg[shots['shot_event']] = shots['shot_xg']
+    return xg
+
+
+def compute_team_stats(events, shots=None, values=None):
+    """Agregados por equipo y período como dict de columnas (values: etapa 'action_values')"""
+    n_teams = len(events['team_ids'])
+    type_id, team, x = events['type_id'], events['team'], events['x']
+    is_pass = type_id == PASS
+    success = is_pass & events['outcome']
+    touch = np.isin(type_id, CONTROL_TYPES)
+    defensive = np.isin(type_id, DEFENSIVE_ACTION_TYPES) & ~((type_id == FOUL) & events['outcome'])
+    shot = np.isin(type_id, SHOT_TYPES)
+    zone = np.digitize(x, ZONE_EDGES)
+    pass_xt = _pass_xt(events)
+    action_xt = _action_xt(events, values)
+    xg = _shot_xg(events, shots)
+    everything = np.ones(len(type_id), dtype=bool)
+
+    rows = {'team_id': [], 'team_name': [], 'period': []}
+    rows.update({col: [] for col in TEAM_STAT_COLUMNS})
+    for period in _periods(events):
+        in_period = (events['period'] == period) if period else np.ones(len(type_id), dtype=bool)
+        valid = in_period & (team >= 0)
+        t = team[valid]
+
+        def count(mask):
+            return np.bincount(t[mask[valid]], minlength=n_teams)
+
+        def total(values, mask):
+            return np.bincount(t[mask[valid]], weights=values[valid][mask[valid]], minlength=n_teams)
+
+        passes = count(is_pass)
+        successful = count(success)
+        touches = count(touch)
+        zone_touches = np.stack([count(touch & (zone == z)) for z in range(3)], axis=1)
+        # Pases del rival en su 60% propio / acciones defensivas en el 60% de ataque propio
+        opp_build_up = count(is_pass & (x < 60))
+        pressing = count(defensive & (x > 40))
+        for i in range(n_teams):
+            opp = (i + 1) % n_teams if n_teams > 1 else i
+            rows['team_id'].append(str(events['team_ids'][i]))
+            rows['team_name'].append(str(events['team_names'][i]) if len(events['team_names']) > i else '')
+            rows['period'].append(period)
+            rows['passes'].append(int(passes[i]))
+            rows['successful_passes'].append(int(successful[i]))
+            rows['pass_accuracy'].append(successful[i] / passes[i] * 100 if passes[i] else 0.0)
+            rows['possession'].append(passes[i] / passes.sum() * 100 if passes.sum() else 0.0)
+            rows['touches'].append(int(touches[i]))
+            for z, name in enumerate(ZONE_NAMES):
+                # El tercio z propio es el tercio (2 - z) del rival
+                own, rival = zone_touches[i, z], zone_touches[opp, 2 - z]
+                rows[f'zone_{name}_pct'].append(own / (own + rival) * 100 if own + rival else 0.0)
+            rows['ppda'].append(opp_build_up[opp] / pressing[i] if pressing[i] else np.nan)
+            rows['defensive_actions'].append(int(count(defensive)[i]))
+            rows['xt'].append(float(total(pass_xt, success)[i]))
+            rows['action_xt'].append(float(total(action_xt, everything)[i]))
+            rows['shots'].append(int(count(shot)[i]))
+            rows['goals'].append(int(count(type_id == GOAL)[i]))
+            rows['xg'].append(float(total(xg, shot)[i]))
+    return _columns(rows)
+
+
+def compute_player_stats(events, shots=None, values=None):
+    """Agregados por jugador y período como dict de columnas (values: etapa 'action_values')"""
+    type_id, player = events['type_id'], events['player']
+    is_pass = type_id == PASS
+    success = is_pass & events['outcome']
+    touch = np.isin(type_id, CONTROL_TYPES)
+    shot = np.isin(type_id, SHOT_TYPES)
+    pass_xt = _pass_xt(events)
+    action_xt = _action_xt(events, values)
+    xg = _shot_xg(events, shots)
+    n_players = len(events['player_ids'])
+    player_team = events['player_team']
+    has_player = player >= 0
+
+    rows = {'team_id': [], 'player_id': [], 'player_name': [], 'period': []}
+    rows.update({col: [] for col in PLAYER_STAT_COLUMNS})
+    for period in _periods(events):
+        in_period = has_player & ((events['period'] == period) if period else True)
+        p = player[in_period]
+
+        def count(mask):
+            return np.bincount(p[mask[in_period]], minlength=n_players)
+
+        def total(values, mask):
+            return np.bincount(p[mask[in_period]], weights=values[in_period][mask[in_period]],
+                               minlength=n_players)
+
+        passes, successful, touches = count(is_pass), count(success), count(touch)
+        shots_, goals = count(shot), count(type_id == GOAL)
+        xt, xg_ = total(pass_xt, success), total(xg, shot)
+        all_xt = total(action_xt, np.ones(len(type_id), dtype=bool))
+        active = np.flatnonzero(np.bincount(p, minlength=n_players))
+        for i in active:
+            team_idx = player_team[i]
+            rows['team_id'].append(str(events['team_ids'][team_idx]) if team_idx >= 0 else '')
+            rows['player_id'].append(str(events['player_ids'][i]))
+            rows['player_name'].append(str(events['player_names'][i]))
+            rows['period'].append(period)
+            rows['passes'].append(int(passes[i]))
+            rows['successful_passes'].append(int(successful[i]))
+            rows['pass_accuracy'].append(successful[i] / passes[i] * 100 if passes[i] else 0.0)
+            rows['touches'].append(int(touches[i]))
+            rows['xt'].append(float(xt[i]))
+            rows['action_xt'].append(float(all_xt[i]))
+            rows['shots'].append(int(shots_[i]))
+            rows['goals'].append(int(goals[i]))
+            rows['xg'].append(float(xg_[i]))
+    return _columns(rows)
+
+
+def _columns(rows):
+    columns = {}
+    for name, values in rows.items():
+        if values and isinstance(values[0], str):
+            columns[name] = np.array(values, dtype=str)
+        elif values and isinstance(values[0], (int, np.integer)) and not isinstance(values[0], bool):
+            columns[name] = np.array(values, dtype=np.int32)
+        else:
+            columns[name] = np.array(values, dtype=np.float32)
+    return columns
+
+
+def tables_dir(processed_dir=None):
+    return Path(processed_dir or DEFAULT_PROCESSED_DIR) / 'tables'
+
+
+def _stats_frames(catalog, stage, processed_dir=None):
+    """DataFrame por partido de una etapa de estadísticas, con columnas de catálogo (streaming)"""
+    for match in catalog:
+        match_id = match_key(match)
+        arrays = load_arrays(stage, match_id, processed_dir)
+        if arrays is None:
+            continue
+        df = pd.DataFrame(arrays)
+        df.insert(0, 'match_id', match_id)
+        for col in CATALOG_COLUMNS:
+            df[col] = match.get(col, '')
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        yield df
+
+
+def materialize_tables(catalog, processed_dir=None, memory_mb=None):
+    """Consolida las estadísticas por partido en tablas Parquet con columnas de catálogo.
+
+    Los partidos se escriben por tandas acotadas por memory_mb (techo del pipeline por
+    defecto), sin juntar la tabla completa en memoria.
+    """
+    out_dir = tables_dir(processed_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    memory_bytes = (memory_mb or PIPELINE_MEMORY_MB) * 1024 * 1024
+    written = {}
+    for stage in ('team_stats', 'player_stats'):
+        path = out_dir / f'{stage}.parquet'
+        tmp_path = temp_path(path)
+        writer, rows = None, 0
+        for batch in memory_batches(_stats_frames(catalog, stage, processed_dir), memory_bytes):
+            table = pa.Table.from_pandas(pd.concat(batch, ignore_index=True), preserve_index=False)
+            del batch
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            writer.write_table(table.cast(writer.schema), row_group_size=50_000)
+            rows += len(table)
+        if writer is None:
+            continue
+        writer.close()
+        tmp_path.replace(path)
+        written[stage] = rows
+    return written
+
+
+def read_stats(stage, filters=None, columns=None, processed_dir=None):
+    """Lectura filtrada de una tabla materializada (filters en formato pyarrow)"""
+    path = tables_dir(processed_dir) / f'{stage}.parquet'
+    if not path.exists():
+        return None
+    return pd.read_parquet(path, filters=filters, columns=columns)
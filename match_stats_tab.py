@@ -0,0 +1,126 @@
+# match_stats_tab.py
+# Pestaña de estadísticas: lecturas filtradas de las tablas materializadas en la ingesta
+import streamlit as st
+import pandas as pd
+
+from ingest import load_stage
+from match_selector import select_match
+from match_stats import read_stats
+from dimensions import resolve_short_names, team_name
+from season_rollups import player_leaderboard, connection_leaderboard
+from passing_network_tab import scan_data_directories
+
+METRIC_LABELS = [
+    ('passes', 'Pases', '{:.0f}'),
+    ('pass_accuracy', 'Precisión de pase (%)', '{:.1f}'),
+    ('possession', 'Posesión (%)', '{:.1f}'),
+    ('zone_def_pct', 'Posesión tercio defensivo (%)', '{:.1f}'),
+    ('zone_mid_pct', 'Posesión tercio medio (%)', '{:.1f}'),
+    ('zone_att_pct', 'Posesión tercio ofensivo (%)', '{:.1f}'),
+    ('ppda', 'PPDA', '{:.2f}'),
+    ('defensive_actions', 'Acciones defensivas', '{:.0f}'),
+    ('xt', 'xT (pases)', '{:.3f}'),
+    ('shots', 'Tiros', '{:.0f}'),
+    ('goals', 'Goles', '{:.0f}'),
+    ('xg', 'xG', '{:.2f}'),
+]
+LEADER_METRICS = {'action_xt': 'xT total', 'xt': 'xT pases', 'passes': 'Pases', 'pass_accuracy': 'Precisión'}
+# Pases mínimos para entrar al ranking por precisión
+MIN_PASSES_ACCURACY = 100
+
+
+def show_match_stats_tab():
+    """Muestra la pestaña de estadísticas del partido"""
+    st.header("📊 Match Statistics")
+    raw_dir = scan_data_directories()['raw_dir']
+    match = select_match(raw_dir, key='stats')
+    if match is None:
+        return
+    team_stats = load_stage(match, 'team_stats', raw_dir)
+    player_stats = load_stage(match, 'player_stats', raw_dir)
+    if team_stats is None or player_stats is None:
+        st.error("❌ No se pudieron cargar las estadísticas de este partido")
+        return
+    team_df = pd.DataFrame(team_stats)
+    player_df = pd.DataFrame(player_stats)
+
+    period = st.radio("Período:", [0, 1, 2], horizontal=True, key="stats_period",
+                      format_func=lambda p: {0: "Partido Completo", 1: "1er Tiempo", 2: "2do Tiempo"}[p])
+    team_df = team_df[team_df['period'] == period]
+    if team_df.empty:
+        st.warning("⚠️ No hay datos para este período")
+        return
+
+    st.subheader("⚖️ Comparación")
+    comparison = {'Métrica': [label for _, label, _ in METRIC_LABELS]}
+    for row in team_df.itertuples():
+        comparison[row.team_name] = [fmt.format(getattr(row, col)) if pd.notna(getattr(row, col)) else '-'
+                                     for col, _, fmt in METRIC_LABELS]
+    st.dataframe(pd.DataFrame(comparison), use_container_width=True, hide_index=True)
+
+    st.subheader("🎯 Jugadores")
+    players = player_df[player_df['period'] == period].copy()
+    team_names = dict(zip(team_df['team_id'], team_df['team_name']))
+    players['Equipo'] = players['team_id'].map(team_names)
+    players['Jugador'] = resolve_short_names(players['player_id'], players['player_name'])
+    players = players.sort_values('xt', ascending=False)
+    table = players[['Jugador', 'Equipo', 'passes', 'pass_accuracy', 'xt', 'shots', 'xg']].rename(columns={
+        'passes': 'Pases', 'pass_accuracy': 'Precisión', 'xt': 'xT', 'shots': 'Tiros', 'xg': 'xG'})
+    st.dataframe(table.round({'Precisión': 1, 'xT': 3, 'xG': 2}).head(20),
+                 use_container_width=True, hide_index=True)
+
+    # Comparación con el resto de la temporada (tabla materializada)
+    st.subheader("📅 Promedios de la temporada")
+    season_df = read_stats('team_stats', filters=[
+        ('competition_full_name', '==', match['competition_full_name']),
+        ('season', '==', str(match['season'])),
+        ('period', '==', 0)
+    ])
+    if season_df is None or season_df.empty:
+        st.info("💡 Ejecuta `python ingest.py` para materializar las tablas de la temporada")
+        return
+    columns = [col for col, _, _ in METRIC_LABELS]
+    averages = season_df.groupby('team_name')[columns].mean()
+    averages.insert(0, 'PJ', season_df.groupby('team_name').size())
+    averages = averages.rename(columns={col: label for col, label, _ in METRIC_LABELS})
+    highlight = averages.index.isin(team_df['team_name'])
+    st.dataframe(pd.concat([averages[highlight], averages[~highlight]]).round(2), use_container_width=True)
+    show_season_leaders(match, team_df)
+
+
+def show_season_leaders(match, team_df):
+    """Rankings de la temporada leídos de los acumulados incrementales"""
+    st.subheader("🏅 Líderes de la temporada")
+    col1, col2 = st.columns(2)
+    with col1:
+        team_id = st.selectbox("Equipo:", [None] + list(team_df['team_id']), key="leaders_team",
+                               format_func=lambda t: "Todos" if t is None else team_name(t, default=t))
+    with col2:
+        sort_by = st.radio("Ordenar por:", list(LEADER_METRICS), horizontal=True, key="leaders_metric",
+                           format_func=LEADER_METRICS.get)
+    competition, season = match['competition_full_name'], str(match['season'])
+    min_passes = MIN_PASSES_ACCURACY if sort_by == 'pass_accuracy' else 0
+    players = player_leaderboard(competition, season, team_id, sort_by=sort_by, min_passes=min_passes)
+    if players is None:
+        st.info("💡 Ejecuta `python ingest.py` para materializar los acumulados de la temporada")
+        return
+    players['Jugador'] = resolve_short_names(players['player_id'], players['player_id'])
+    players['Equipo'] = [team_name(t, default=t) for t in players['team_id']]
+    table = players[['Jugador', 'Equipo', 'matches', 'passes', 'pass_accuracy', 'xt', 'action_xt',
+                     'action_xt_per_match']].rename(columns={
+        'matches': 'PJ', 'passes': 'Pases', 'pass_accuracy': 'Precisión', 'xt': 'xT pases',
+        'action_xt': 'xT total', 'action_xt_per_match': 'xT total/PJ'})
+    st.dataframe(table.round({'Precisión': 1, 'xT pases': 3, 'xT total': 3, 'xT total/PJ': 3}),
+                 use_container_width=True, hide_index=True)
+
+    st.markdown("**🔗 Conexiones más frecuentes**")
+    connections = connection_leaderboard(competition, season, team_id,
+                                         sort_by='xt' if sort_by in ('xt', 'action_xt') else 'passes')
+    if connections is None or connections.empty:
+        return
+    connections['Pasador'] = resolve_short_names(connections['passer_id'], connections['passer_id'])
+    connections['Receptor'] = resolve_short_names(connections['receiver_id'], connections['receiver_id'])
+    connections['Equipo'] = [team_name(t, default=t) for t in connections['team_id']]
+    table = connections[['Pasador', 'Receptor', 'Equipo', 'matches', 'passes', 'xt', 'xt_per_pass']].rename(
+        columns={'matches': 'PJ', 'passes': 'Pases', 'xt': 'xT', 'xt_per_pass': 'xT/pase'})
+    st.dataframe(table.round({'xT': 3, 'xT/pase': 4}), use_container_width=True, hide_index=True)
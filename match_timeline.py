@@ -0,0 +1,203 @@
+"""
+Series por minuto de cada partido: xT generado, pases y posesión.
+Para cada partido se guardan arrays con forma (equipo, período, minuto) calculados
+con bincount sobre el xT de cada evento (etapa 'action_values': todas las acciones
+con balón y los carries) y sobre las cadenas de posesión. materialize_timelines
+apila todos los partidos en un .npy por serie (escrito de a una fila, sin juntar el
+archivo en memoria) para sumar temporadas con memory-map, sin recargar eventos.
+index.json (filas y forma de cada .npy) se reemplaza último y se valida al leer.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from action_values import event_xt
+from match_events import PASS
+from processed_store import (DEFAULT_PROCESSED_DIR, StackedWriter, load_arrays, load_stacked,
+                             load_stacked_index, write_stacked_index)
+from raw_storage import match_key
+
+SERIES = ('xt', 'passes', 'passes_ok', 'possession')
+PERIODS = (1, 2, 3, 4)
+# Minuto (reloj Opta) en que empieza y termina cada período reglamentario
+PERIOD_START = {1: 0, 2: 45, 3: 90, 4: 105}
+PERIOD_END = {1: 45, 2: 90, 3: 105, 4: 120}
+MAX_MINUTES = 130
+MOMENTUM_WINDOW = 5
+N_TEAMS = 2
+
+
+def _minute_bins(team, period, minute):
+    """Índice plano (equipo, período, minuto) y máscara de eventos válidos"""
+    valid = (team >= 0) & (team < N_TEAMS) & np.isin(period, PERIODS)
+    period_idx = np.clip(period.astype(int) - 1, 0, len(PERIODS) - 1)
+    minute_idx = np.clip(minute.astype(int), 0, MAX_MINUTES - 1)
+    flat = (team.astype(int) * len(PERIODS) + period_idx) * MAX_MINUTES + minute_idx
+    return flat, valid
+
+
+def _coverage(starts, ends, edges):
+    """Segundos cubiertos por los intervalos [start, end) antes de cada borde"""
+    starts, ends = np.sort(starts), np.sort(ends)
+    cum_s, cum_e = np.r_[0, np.cumsum(starts)], np.r_[0, np.cumsum(ends)]
+    n_s, n_e = np.searchsorted(starts, edges), np.searchsorted(ends, edges)
+    return (n_s * edges - cum_s[n_s]) - (n_e * edges - cum_e[n_e])
+
+
+def possession_seconds(events, chains):
+    """Segundos de posesión por (equipo, período, minuto) repartiendo cada cadena entre los minutos que abarca"""
+    result = np.zeros((N_TEAMS, len(PERIODS), MAX_MINUTES))
+    edges = np.arange(MAX_MINUTES + 1, dtype=np.float64) * 60
+    team, period = chains['chain_team'], chains['chain_period']
+    start = chains['chain_start_time'].astype(np.float64)
+    # La cadena dura hasta que empieza la siguiente del mismo período (o su último evento)
+    end = np.maximum(chains['chain_end_time'].astype(np.float64), start)
+    same_period = np.r_[period[1:] == period[:-1], False]
+    end = np.where(same_period, np.r_[start[1:], 0], end)
+    for t in range(N_TEAMS):
+        for p_idx, p in enumerate(PERIODS):
+            sel = (team == t) & (period == p)
+            if sel.any():
+                result[t, p_idx] = np.diff(_coverage(start[sel], end[sel], edges))
+    return result
+
+
+def compute_timeline(events, chains, values):
+    """Series por minuto de ambos equipos (forma equipo × período × minuto)"""
+    n_bins = N_TEAMS * len(PERIODS) * MAX_MINUTES
+    shape = (N_TEAMS, len(PERIODS), MAX_MINUTES)
+    flat, valid = _minute_bins(events['team'], events['period'], events['minute'])
+    is_pass = (events['type_id'] == PASS) & valid
+    ok_pass = is_pass & events['outcome'] & ~np.isnan(events['end_x']) & ~np.isnan(events['end_y'])
+    xt = np.bincount(flat[valid], weights=event_xt(values)[valid], minlength=n_bins)
+
+    last_minute = np.full(len(PERIODS), -1, dtype=np.int16)
+    for p_idx, p in enumerate(PERIODS):
+        in_period = events['period'] == p
+        if in_period.any():
+            last_minute[p_idx] = min(int(events['minute'][in_period].max()), MAX_MINUTES - 1)
+    return {
+        'tl_xt': xt.reshape(shape).astype(np.float32),
+        'tl_passes': np.bincount(flat[is_pass], minlength=n_bins).reshape(shape).astype(np.uint16),
+        'tl_passes_ok': np.bincount(flat[ok_pass], minlength=n_bins).reshape(shape).astype(np.uint16),
+        'tl_possession': possession_seconds(events, chains).astype(np.float32),
+        'tl_last_minute': last_minute
+    }
+
+
+def minute_label(period, minute):
+    """Etiqueta de reloj: 23' o 45+2' en el descuento"""
+    end = PERIOD_END[period]
+    return f"{minute + 1}'" if minute < end else f"{end}+{minute - end + 1}'"
+
+
+def flatten_timeline(timeline, key, team):
+    """Serie de un equipo encadenando los minutos jugados de cada período.
+
+    Devuelve (valores, período, minuto) con una posición por minuto del partido.
+    """
+    values, periods, minutes = [], [], []
+    for p_idx, p in enumerate(PERIODS):
+        last = int(timeline['tl_last_minute'][p_idx])
+        if last < PERIOD_START[p]:
+            continue
+        span = np.arange(PERIOD_START[p], last + 1)
+        values.append(timeline[f'tl_{key}'][team, p_idx, span].astype(float))
+        periods.append(np.full(len(span), p))
+        minutes.append(span)
+    if not values:
+        return np.zeros(0), np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    return np.concatenate(values), np.concatenate(periods), np.concatenate(minutes)
+
+
+def rolling_sum(values, periods, window=MOMENTUM_WINDOW):
+    """Suma móvil de los últimos `window` minutos, reiniciada en cada período"""
+    result = np.zeros(len(values))
+    for p in np.unique(periods):
+        sel = np.flatnonzero(periods == p)
+        cum = np.r_[0, np.cumsum(values[sel])]
+        end = np.arange(1, len(sel) + 1)
+        result[sel] = cum[end] - cum[np.maximum(end - window, 0)]
+    return result
+
+
+def momentum(timeline, window=MOMENTUM_WINDOW):
+    """Momentum por minuto: xT móvil del primer equipo menos el del segundo"""
+    home, periods, minutes = flatten_timeline(timeline, 'xt', 0)
+    away = flatten_timeline(timeline, 'xt', 1)[0]
+    return rolling_sum(home, periods, window) - rolling_sum(away, periods, window), periods, minutes
+
+
+def timelines_dir(processed_dir=None):
+    return Path(processed_dir or DEFAULT_PROCESSED_DIR) / 'timelines_stacked'
+
+
+def materialize_timelines(catalog, processed_dir=None):
+    """Apila las series de todos los partidos (una fila por partido-equipo) en .npy por serie"""
+    rows = []
+    writer = StackedWriter(timelines_dir(processed_dir), len(catalog) * N_TEAMS)
+    for match in catalog:
+        match_id = match_key(match)
+        timeline = load_arrays('timeline', match_id, processed_dir)
+        events = load_arrays('events', match_id, processed_dir, keys=('team_ids', 'team_names')) \
+            if timeline is not None else None
+        if timeline is None or events is None or len(events['team_ids']) < N_TEAMS:
+            continue
+        for team in range(N_TEAMS):
+            rows.append({
+                'match_id': match_id,
+                'team_id': str(events['team_ids'][team]),
+                'team_name': str(events['team_names'][team]),
+                'opponent_name': str(events['team_names'][1 - team]),
+                'competition': match.get('competition_full_name', ''),
+                'season': str(match.get('season', '')),
+                'date': match.get('date', '')
+            })
+            writer.append({key: timeline[f'tl_{key}'][team] for key in SERIES})
+    shapes = writer.commit()
+    if not shapes:
+        return 0
+    # El índice va último: hasta acá los lectores siguen con el anterior
+    write_stacked_index(timelines_dir(processed_dir), rows, shapes)
+    return len(rows)
+
+
+def load_timeline_index(processed_dir=None):
+    index = load_stacked_index(timelines_dir(processed_dir))
+    return index['rows'] if index is not None else []
+
+
+def sum_timelines(key='xt', team_name=None, competition=None, season=None, against=False,
+                  processed_dir=None):
+    """Suma de una serie de varios partidos leyendo solo las filas seleccionadas (memory-map).
+
+    against=True suma la serie de los rivales del equipo (p. ej. xT concedido).
+    Devuelve (matriz período × minuto, número de partidos sumados).
+    """
+    index, stacked = load_stacked(timelines_dir(processed_dir), key)
+    name_field = 'opponent_name' if against else 'team_name'
+    rows = [i for i, row in enumerate(index)
+            if (team_name is None or row[name_field] == team_name)
+            and (competition is None or row['competition'] == competition)
+            and (season is None or row['season'] == str(season))]
+    total = np.zeros((len(PERIODS), MAX_MINUTES))
+    if not rows:
+        return total, 0
+    # Suma por bloques de filas para no materializar todo el array
+    for start in range(0, len(rows), 256):
+        total += stacked[rows[start:start + 256]].sum(axis=0)
+    return total, len(rows)
+
+
+def minute_buckets(matrix, size=15):
+    """Agrupa una matriz período × minuto en tramos de `size` minutos (descuento en el último tramo)"""
+    labels, values = [], []
+    for p_idx, p in enumerate(PERIODS[:2]):
+        start, end = PERIOD_START[p], PERIOD_END[p]
+        edges = list(range(start, end, size))
+        for i, lo in enumerate(edges):
+            hi = edges[i + 1] if i + 1 < len(edges) else MAX_MINUTES
+            labels.append(f"{lo}-{min(hi, end)}{'+' if hi > end else ''}'")
+            values.append(float(matrix[p_idx, lo:hi].sum()))
+    return labels, np.array(values)
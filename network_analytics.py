@@ -0,0 +1,280 @@
+"""
+Analítica de grafos sobre redes de pases, vectorizada y por lotes.
+Cada red equipo-partido se guarda en la ingesta (etapa 'network') como matriz
+de adyacencia densa de tamaño fijo MAX_PLAYERS × MAX_PLAYERS (pases exitosos
+y xT por pasador -> receptor), con la misma inferencia de receptor que
+calculate_pass_network_positions. Las métricas operan sobre tensores
+(lote, jugador, jugador), así que una temporada entera se calcula de una vez.
+"""
+
+import numpy as np
+import pandas as pd
+
+from match_events import PASS
+from processed_store import load_arrays
+from raw_storage import match_key
+from xt_calculator import get_xt_values
+
+MAX_PLAYERS = 24
+RECEIVER_MAX_DISTANCE = 25
+DAMPING = 0.85
+METRIC_COLUMNS = ['passes_out', 'passes_in', 'degree', 'eigenvector', 'pagerank', 'betweenness',
+                  'clustering', 'xt_out', 'xt_in', 'xt_share']
+
+
+def infer_receivers(passer, pos_x, pos_y, end_x, end_y, max_distance=RECEIVER_MAX_DISTANCE):
+    """Receptor = jugador (distinto del pasador) con posición promedio más cercana al destino.
+
+    pos_x/pos_y son las posiciones por jugador, o una fila por pase (NaN = jugador ausente).
+    Devuelve (índice de receptor, máscara de pases con receptor dentro de max_distance).
+    """
+    pos_x, pos_y = np.atleast_2d(pos_x), np.atleast_2d(pos_y)
+    distance = np.hypot(pos_x - end_x[:, None], pos_y - end_y[:, None])
+    distance[np.isnan(distance)] = np.inf
+    distance[np.arange(len(passer)), passer] = np.inf
+    receiver = distance.argmin(axis=1)
+    close = distance[np.arange(len(receiver)), receiver] < max_distance
+    return receiver, close
+
+
+def build_team_network(events, team, max_players=MAX_PLAYERS):
+    """Red de un equipo en el partido como arrays de tamaño fijo (jugadores por pases exitosos)"""
+    mask = (events['type_id'] == PASS) & (events['team'] == team) & (events['player'] >= 0)
+    player = events['player'][mask]
+    x, y = events['x'][mask].astype(float), events['y'][mask].astype(float)
+    end_x, end_y = events['end_x'][mask].astype(float), events['end_y'][mask].astype(float)
+    ok = events['outcome'][mask] & ~np.isnan(end_x) & ~np.isnan(end_y)
+
+    players, local = np.unique(player, return_inverse=True)
+    n = len(players)
+    pos_x = np.bincount(local, weights=x, minlength=n) / np.maximum(np.bincount(local, minlength=n), 1)
+    pos_y = np.bincount(local, weights=y, minlength=n) / np.maximum(np.bincount(local, minlength=n), 1)
+    passes = np.bincount(local[ok], minlength=n)
+    pass_xt = np.zeros(len(local))
+    pass_xt[ok] = get_xt_values(end_x[ok], end_y[ok]) - get_xt_values(x[ok], y[ok])
+    node_xt = np.bincount(local[ok], weights=pass_xt[ok], minlength=n)
+
+    counts = np.zeros((n, n))
+    xt = np.zeros((n, n))
+    if ok.any() and n > 1:
+        passer = local[ok]
+        receiver, close = infer_receivers(passer, pos_x, pos_y, end_x[ok], end_y[ok])
+        np.add.at(counts, (passer[close], receiver[close]), 1)
+        np.add.at(xt, (passer[close], receiver[close]), pass_xt[ok][close])
+
+    # Los jugadores con más pases ocupan los primeros lugares; el resto queda fuera
+    keep = np.argsort(-passes, kind='stable')[:max_players]
+    k = len(keep)
+    result = {
+        'net_player': np.full(max_players, -1, dtype=np.int32),
+        'net_x': np.zeros(max_players, dtype=np.float32),
+        'net_y': np.zeros(max_players, dtype=np.float32),
+        'net_passes': np.zeros(max_players, dtype=np.int32),
+        'net_xt': np.zeros(max_players, dtype=np.float32),
+        'net_counts': np.zeros((max_players, max_players), dtype=np.float32),
+        'net_xt_flow': np.zeros((max_players, max_players), dtype=np.float32),
+    }
+    result['net_player'][:k] = players[keep]
+    result['net_x'][:k] = pos_x[keep]
+    result['net_y'][:k] = pos_y[keep]
+    result['net_passes'][:k] = passes[keep]
+    result['net_xt'][:k] = node_xt[keep]
+    result['net_counts'][:k, :k] = counts[np.ix_(keep, keep)]
+    result['net_xt_flow'][:k, :k] = xt[np.ix_(keep, keep)]
+    return result
+
+
+def build_networks(events):
+    """Redes de ambos equipos apiladas: arrays con primera dimensión = equipo"""
+    teams = [build_team_network(events, team) for team in range(min(2, len(events['team_ids'])))]
+    if not teams:
+        return {}
+    return {key: np.stack([t[key] for t in teams]) for key in teams[0]}
+
+
+# ===== MÉTRICAS POR LOTES: A tiene forma (lote, P, P) =====
+
+def _active(A):
+    return (A.sum(axis=2) + A.sum(axis=1)) > 0
+
+
+def eigenvector_centrality(A, iterations=100, tol=1e-8):
+    """Centralidad de autovector sobre la red simetrizada (iteración de potencias por lotes)"""
+    W = A + np.swapaxes(A, 1, 2)
+    v = _active(A).astype(float)
+    v /= np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+    for _ in range(iterations):
+        nxt = np.einsum('bij,bj->bi', W, v) + v  # +v evita oscilar en grafos bipartitos
+        nxt /= np.maximum(np.linalg.norm(nxt, axis=1, keepdims=True), 1e-12)
+        if np.abs(nxt - v).max() < tol:
+            return nxt
+        v = nxt
+    return v
+
+
+def pagerank(A, damping=DAMPING, iterations=100, tol=1e-10):
+    """PageRank ponderado por lotes; los nodos sin salida reparten uniformemente entre activos"""
+    active = _active(A)
+    n_active = np.maximum(active.sum(axis=1, keepdims=True), 1)
+    out = A.sum(axis=2, keepdims=True)
+    transition = np.divide(A, out, out=np.zeros_like(A, dtype=float), where=out > 0)
+    dangling = (out[..., 0] == 0) & active
+    teleport = active / n_active
+    rank = teleport.copy()
+    for _ in range(iterations):
+        spread = np.einsum('bi,bij->bj', rank, transition)
+        spread += (rank * dangling).sum(axis=1, keepdims=True) * teleport
+        nxt = (1 - damping) * teleport + damping * spread
+        if np.abs(nxt - rank).max() < tol:
+            return nxt
+        rank = nxt
+    return rank
+
+
+def shortest_paths(A):
+    """Distancias mínimas con costo 1/pases y número de caminos mínimos (Floyd-Warshall por lotes)"""
+    D = np.divide(1.0, A, out=np.full(A.shape, np.inf), where=A > 0)
+    S = (A > 0).astype(float)
+    P = A.shape[1]
+    D[:, np.arange(P), np.arange(P)] = 0
+    S[:, np.arange(P), np.arange(P)] = 1
+    for k in range(P):
+        via = D[:, :, k, None] + D[:, None, k, :]
+        paths = S[:, :, k, None] * S[:, None, k, :]
+        shorter = via < D - 1e-9
+        tie = np.isclose(via, D, rtol=1e-9, atol=1e-12) & np.isfinite(via)
+        # Los caminos que pasan por k como extremo ya están contados
+        tie[:, k, :] = False
+        tie[:, :, k] = False
+        S = np.where(shorter, paths, np.where(tie, S + paths, S))
+        D = np.where(shorter, via, D)
+    return D, S
+
+
+def betweenness(A):
+    """Intermediación normalizada (Brandes): suma sobre pares (s, t) de σ_sv·σ_vt / σ_st"""
+    D, S = shortest_paths(A)
+    B, P, _ = A.shape
+    reachable = np.isfinite(D) & ~np.eye(P, dtype=bool)[None]
+    result = np.zeros((B, P))
+    for v in range(P):
+        on_path = np.isclose(D[:, :, v, None] + D[:, None, v, :], D, rtol=1e-9, atol=1e-12) & reachable
+        on_path[:, v, :] = False
+        on_path[:, :, v] = False
+        share = S[:, :, v, None] * S[:, None, v, :] / np.maximum(S, 1)
+        result[:, v] = (share * on_path).sum(axis=(1, 2))
+    n_active = _active(A).sum(axis=1, keepdims=True)
+    pairs = np.maximum((n_active - 1) * (n_active - 2), 1)
+    return result / pairs
+
+
+def clustering(A):
+    """Coeficiente de clustering ponderado (Onnela) sobre la red simetrizada"""
+    W = A + np.swapaxes(A, 1, 2)
+    max_w = W.max(axis=(1, 2), keepdims=True)
+    W = np.cbrt(np.divide(W, max_w, out=np.zeros_like(W, dtype=float), where=max_w > 0))
+    triangles = np.einsum('bij,bjk,bki->bi', W, W, W)
+    k = (W > 0).sum(axis=2)
+    return np.divide(triangles, k * (k - 1), out=np.zeros_like(triangles), where=k > 1)
+
+
+def network_metrics(counts, xt_flow=None):
+    """Todas las métricas por jugador para un lote de redes. Devuelve dict de arrays (lote, P)"""
+    A = np.asarray(counts, dtype=float)
+    if A.ndim == 2:
+        A = A[None]
+    xt_flow = np.zeros_like(A) if xt_flow is None else np.asarray(xt_flow, dtype=float).reshape(A.shape)
+    xt_out = xt_flow.sum(axis=2)
+    team_xt = xt_out.sum(axis=1, keepdims=True)
+    return {
+        'passes_out': A.sum(axis=2),
+        'passes_in': A.sum(axis=1),
+        'degree': ((A > 0) | (np.swapaxes(A, 1, 2) > 0)).sum(axis=2),
+        'eigenvector': eigenvector_centrality(A),
+        'pagerank': pagerank(A),
+        'betweenness': betweenness(A),
+        'clustering': clustering(A),
+        'xt_out': xt_out,
+        'xt_in': xt_flow.sum(axis=1),
+        'xt_share': np.divide(xt_out, team_xt, out=np.zeros_like(xt_out), where=team_xt > 0),
+    }
+
+
+def load_network_stack(catalog, processed_dir=None):
+    """Apila las redes guardadas de los partidos del catálogo (una fila por equipo-partido)"""
+    rows, blocks = [], {'net_counts': [], 'net_xt_flow': [], 'net_player': []}
+    for match in catalog:
+        match_id = match_key(match)
+        network = load_arrays('network', match_id, processed_dir)
+        if network is None:
+            continue
+        events = load_arrays('events', match_id, processed_dir, keys=('team_ids', 'player_ids'))
+        for team in range(len(network['net_counts'])):
+            player = network['net_player'][team]
+            rows.append({'match_id': match_id, 'team_id': str(events['team_ids'][team]),
+                         'competition': match.get('competition_full_name', ''),
+                         'season': str(match.get('season', '')), 'date': match.get('date', ''),
+                         'player_ids': np.where(player >= 0, events['player_ids'][np.maximum(player, 0)], '')})
+            for key in blocks:
+                blocks[key].append(network[key][team])
+    if not rows:
+        return rows, {}
+    return rows, {key: np.stack(block) for key, block in blocks.items()}
+
+
+def player_rankings(catalog, processed_dir=None, competition=None, season=None, team_id=None):
+    """Ranking de importancia de jugadores en la red sumando todos los partidos seleccionados.
+
+    Devuelve un DataFrame por jugador con partidos, promedios de las métricas y xT total.
+    """
+    selected = [m for m in catalog
+                if (competition is None or m.get('competition_full_name') == competition)
+                and (season is None or str(m.get('season')) == str(season))]
+    rows, stack = load_network_stack(selected, processed_dir)
+    if team_id is not None:
+        keep = [i for i, row in enumerate(rows) if row['team_id'] == str(team_id)]
+        rows = [rows[i] for i in keep]
+        stack = {key: value[keep] for key, value in stack.items()} if keep else {}
+    if not rows:
+        return pd.DataFrame()
+    metrics = network_metrics(stack['net_counts'], stack['net_xt_flow'])
+    player_ids = np.stack([row['player_ids'] for row in rows])
+    valid = player_ids != ''
+    df = pd.DataFrame({name: values[valid] for name, values in metrics.items()})
+    df.insert(0, 'player_id', player_ids[valid])
+    df.insert(1, 'team_id', np.repeat([row['team_id'] for row in rows], valid.sum(axis=1)))
+    df.insert(2, 'match_id', np.repeat([row['match_id'] for row in rows], valid.sum(axis=1)))
+    summary = df.groupby('player_id').agg(
+        team_id=('team_id', 'last'), matches=('match_id', 'nunique'),
+        **{col: (col, 'mean') for col in METRIC_COLUMNS if col not in ('xt_out', 'xt_in')},
+        xt_out=('xt_out', 'sum'), xt_in=('xt_in', 'sum'))
+    return summary.sort_values('pagerank', ascending=False).reset_index()
+
+
+def main():
+    import argparse
+    from dimensions import load_dimensions
+    from ingest import DEFAULT_RAW_DIR, load_catalog
+    from processed_store import DEFAULT_PROCESSED_DIR
+
+    parser = argparse.ArgumentParser(description='Ranking de jugadores por influencia en la red de pases')
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--processed-dir', default=str(DEFAULT_PROCESSED_DIR))
+    parser.add_argument('--competition')
+    parser.add_argument('--season')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+    rankings = player_rankings(load_catalog(args.raw_dir), args.processed_dir, args.competition, args.season)
+    if rankings.empty:
+        print("⚠️  No hay redes precalculadas: ejecuta primero python ingest.py")
+        return
+    dims = load_dimensions(args.processed_dir)
+    if dims:
+        rankings.insert(1, 'player', rankings['player_id'].map(dims['player_short_names']))
+        rankings.insert(2, 'team', rankings['team_id'].map(dims['team_names']))
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(rankings.head(args.top).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
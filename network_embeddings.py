@@ -0,0 +1,184 @@
+"""
+Embeddings de redes de pases e índice de vecinos más cercanos.
+Cada red equipo-partido (etapa 'network') se resume en un vector de longitud fija
+que no depende del orden de los jugadores: distribución espacial de los nodos
+ponderada por pases, histograma de aristas por dirección y largo, distribución
+espacial del xT y descriptores globales del grafo. materialize_embedding_index
+estandariza y normaliza todos los vectores en una matriz; las consultas top-k son
+un producto matriz-vector (similitud coseno) sobre todo el archivo.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from network_analytics import pagerank, clustering
+from processed_store import DEFAULT_PROCESSED_DIR, load_arrays, temp_path
+from raw_storage import match_key
+
+# Grilla gruesa para posiciones y xT (largo × ancho) y bins de aristas
+NODE_GRID = (4, 3)
+EDGE_ANGLE_BINS = 8
+EDGE_LENGTH_EDGES = (15.0, 30.0)
+GLOBAL_FEATURES = ('log_passes', 'density', 'pagerank_max', 'clustering_mean',
+                   'pass_gini', 'xt_total', 'mean_x', 'spread_x', 'spread_y')
+EMBEDDING_SIZE = (2 * NODE_GRID[0] * NODE_GRID[1]
+                  + EDGE_ANGLE_BINS * (len(EDGE_LENGTH_EDGES) + 1)
+                  + len(GLOBAL_FEATURES))
+
+
+def _grid_histogram(x, y, weights):
+    gx, gy = NODE_GRID
+    cell = np.clip((x / 100 * gx).astype(int), 0, gx - 1) * gy + np.clip((y / 100 * gy).astype(int), 0, gy - 1)
+    hist = np.bincount(cell, weights=weights, minlength=gx * gy)
+    total = np.abs(hist).sum()
+    return hist / total if total > 0 else hist
+
+
+def network_embeddings(network):
+    """Vectores de los equipos de un partido desde la etapa 'network'. Devuelve (equipos, EMBEDDING_SIZE)"""
+    counts = network['net_counts'].astype(float)
+    if counts.ndim == 2:
+        counts = counts[None]
+    ranks = pagerank(counts)
+    clusters = clustering(counts)
+    vectors = np.zeros((len(counts), EMBEDDING_SIZE), dtype=np.float32)
+    for team in range(len(counts)):
+        active = network['net_player'][team] >= 0
+        x = network['net_x'][team][active].astype(float)
+        y = network['net_y'][team][active].astype(float)
+        passes = network['net_passes'][team][active].astype(float)
+        node_xt = network['net_xt'][team][active].astype(float)
+        A = counts[team][np.ix_(active, active)]
+        n = int(active.sum())
+
+        positions = _grid_histogram(x, y, passes)
+        xt_map = _grid_histogram(x, y, node_xt)
+
+        # Aristas: vector entre posiciones promedio, ponderado por cantidad de pases
+        src, dst = np.nonzero(A)
+        dx, dy = x[dst] - x[src], y[dst] - y[src]
+        angle = ((np.arctan2(dy, dx) + np.pi) / (2 * np.pi) * EDGE_ANGLE_BINS).astype(int) % EDGE_ANGLE_BINS
+        length = np.digitize(np.hypot(dx, dy), EDGE_LENGTH_EDGES)
+        edges = np.bincount(angle * (len(EDGE_LENGTH_EDGES) + 1) + length, weights=A[src, dst],
+                            minlength=EDGE_ANGLE_BINS * (len(EDGE_LENGTH_EDGES) + 1))
+        edges = edges / edges.sum() if edges.sum() > 0 else edges
+
+        sorted_passes = np.sort(passes)
+        gini = (1 - 2 * np.sum(np.cumsum(sorted_passes)) / (n * sorted_passes.sum()) + 1 / n
+                if n and sorted_passes.sum() > 0 else 0.0)
+        weights = passes / passes.sum() if passes.sum() > 0 else np.zeros(n)
+        mean_x = float(weights @ x) if n else 0.0
+        globals_ = [
+            np.log1p(A.sum()),
+            (A > 0).sum() / (n * (n - 1)) if n > 1 else 0.0,
+            ranks[team].max(),
+            clusters[team][active].mean() if n else 0.0,
+            gini,
+            node_xt.sum(),
+            mean_x / 100,
+            float(np.sqrt(weights @ (x - mean_x) ** 2)) / 100 if n else 0.0,
+            float(np.sqrt(weights @ (y - (weights @ y)) ** 2)) / 100 if n else 0.0,
+        ]
+        vectors[team] = np.concatenate([positions, xt_map, edges, globals_])
+    return vectors
+
+
+def embeddings_dir(processed_dir=None):
+    return Path(processed_dir or DEFAULT_PROCESSED_DIR) / 'embeddings_index'
+
+
+def materialize_embedding_index(catalog, processed_dir=None):
+    """Estandariza los embeddings de todo el catálogo en una matriz normalizada (una fila por equipo-partido)"""
+    rows, vectors = [], []
+    for match in catalog:
+        match_id = match_key(match)
+        embedding = load_arrays('embedding', match_id, processed_dir)
+        events = load_arrays('events', match_id, processed_dir, keys=('team_ids', 'team_names'))
+        if embedding is None or events is None:
+            continue
+        for team, vector in enumerate(embedding['embedding']):
+            rows.append({
+                'match_id': match_id,
+                'team_id': str(events['team_ids'][team]),
+                'team_name': str(events['team_names'][team]),
+                'opponent': str(events['team_names'][1 - team]) if len(events['team_names']) > 1 else '',
+                'competition': match.get('competition_full_name', ''),
+                'season': str(match.get('season', '')),
+                'date': match.get('date', '')
+            })
+            vectors.append(vector)
+    if not rows:
+        return 0
+    matrix = np.stack(vectors).astype(np.float64)
+    mean, std = matrix.mean(axis=0), matrix.std(axis=0)
+    std[std < 1e-9] = 1.0
+    matrix = (matrix - mean) / std
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    out_dir = embeddings_dir(processed_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Las filas viajan dentro del mismo npz: un solo os.replace publica matriz e índice juntos
+    tmp_path = temp_path(out_dir / 'index.npz')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, matrix=matrix.astype(np.float32), mean=mean, std=std,
+                 rows=np.array(json.dumps(rows, ensure_ascii=False)))
+    tmp_path.replace(out_dir / 'index.npz')
+    (out_dir / 'rows.json').unlink(missing_ok=True)
+    return len(rows)
+
+
+_index = {}
+
+
+def load_embedding_index(processed_dir=None):
+    """Matriz e índice de filas (cacheados mientras no cambie el archivo).
+
+    Devuelve None si no hay índice o si es de un formato anterior (filas fuera del npz)
+    o inconsistente; se regenera en la próxima ingesta.
+    """
+    out_dir = embeddings_dir(processed_dir)
+    path = out_dir / 'index.npz'
+    if not path.exists():
+        return None
+    version = path.stat().st_mtime_ns
+    cached = _index.get(str(out_dir))
+    if cached is not None and cached['version'] == version:
+        return cached
+    with np.load(path) as npz:
+        if 'rows' not in npz.files:
+            return None
+        matrix = npz['matrix']
+        rows = json.loads(str(npz['rows']))
+    if matrix.shape[0] != len(rows):
+        return None
+    by_match = {}
+    for i, row in enumerate(rows):
+        by_match.setdefault(row['match_id'], []).append(i)
+    cached = {'version': version, 'matrix': matrix, 'rows': rows, 'by_match': by_match,
+              'position': {(row['match_id'], row['team_id']): i for i, row in enumerate(rows)}}
+    _index[str(out_dir)] = cached
+    return cached
+
+
+def similar_networks(match_id, team_id, k=10, processed_dir=None, exclude_same_match=True):
+    """Las k redes más parecidas a la de (match_id, team_id) en todo el archivo.
+
+    Devuelve una lista de filas del índice con 'similarity' (coseno), de mayor a menor.
+    """
+    index = load_embedding_index(processed_dir)
+    if index is None:
+        return []
+    i = index['position'].get((str(match_id), str(team_id)))
+    if i is None:
+        return []
+    scores = index['matrix'] @ index['matrix'][i]
+    scores[i] = -np.inf
+    if exclude_same_match:
+        scores[index['by_match'][str(match_id)]] = -np.inf
+    k = min(k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [dict(index['rows'][j], similarity=float(scores[j])) for j in top]
@@ -0,0 +1,109 @@
+"""
+Redes de pases por partido desde los eventos normalizados (sin Streamlit ni matplotlib).
+Lo usan la pestaña de redes y los workers de la API, que así no importan la UI.
+"""
+
+import numpy as np
+import pandas as pd
+
+from event_query import select_events
+from match_events import PASS
+from network_analytics import infer_receivers
+
+try:
+    from xt_calculator import get_xt_values
+    XT_AVAILABLE = True
+except ImportError:
+    XT_AVAILABLE = False
+
+
+def extract_passes_from_events(events, team, period=None, time_range=None):
+    """Pases de un equipo (índice) desde los arrays normalizados, como dict de arrays.
+
+    Las coordenadas ya vienen en dirección canónica por equipo y período desde la ingesta.
+    """
+    # time_range en minutos absolutos del partido (reloj Opta: el 2do tiempo va de 45 a 90+)
+    idx = select_events(events, PASS, team, period=period, minute_range=time_range)
+    x, y = events['x'][idx], events['y'][idx]
+    end_x, end_y = events['end_x'][idx], events['end_y'][idx]
+    outcome = events['outcome'][idx]
+    xt = np.zeros(len(idx), dtype=np.float32)
+    if XT_AVAILABLE:
+        ok = outcome & ~np.isnan(end_x) & ~np.isnan(end_y)
+        xt[ok] = get_xt_values(end_x[ok], end_y[ok]) - get_xt_values(x[ok], y[ok])
+    return {
+        'player_id': events['player_ids'][events['player'][idx]] if len(idx) else np.zeros(0, dtype=str),
+        'x': x,
+        'y': y,
+        'end_x': end_x,
+        'end_y': end_y,
+        'outcome': outcome,
+        'period': events['period'][idx],
+        'xt': xt
+    }
+
+
+def calculate_pass_network_positions(passes, player_names, invert_coords=False):
+    """Calcula posiciones promedio y conexiones entre jugadores con xT.
+
+    passes puede ser una lista de dicts o un dict de arrays (extract_passes_from_events).
+    Las coordenadas llegan canónicas desde la ingesta; invert_coords solo espeja las
+    posiciones promedio para dibujar al equipo atacando hacia la izquierda.
+    """
+    df = pd.DataFrame(passes)
+    if df.empty:
+        return {}, {}
+    successful = (df['outcome'] == True).to_numpy()
+    avg_locs = df.groupby('player_id').agg({'x': 'mean', 'y': 'mean'})
+    pass_counts = df[successful].groupby('player_id').size()
+    if 'xt' in df.columns:
+        player_xt = df[successful].groupby('player_id')['xt'].sum()
+    else:
+        player_xt = pd.Series(dtype=float)
+    player_ids = avg_locs.index.to_numpy()
+    pos_x = avg_locs['x'].to_numpy(dtype=float)
+    pos_y = avg_locs['y'].to_numpy(dtype=float)
+
+    # Receptor = jugador (distinto del pasador) con posición promedio más cercana al destino
+    connections = {}
+    with_end = successful & df['end_x'].notnull().to_numpy() & df['end_y'].notnull().to_numpy()
+    if with_end.any() and len(player_ids) > 1:
+        end_x = df['end_x'].to_numpy(dtype=float)[with_end]
+        end_y = df['end_y'].to_numpy(dtype=float)[with_end]
+        passer = avg_locs.index.get_indexer(df['player_id'].to_numpy()[with_end])
+        receiver, close = infer_receivers(passer, pos_x, pos_y, end_x, end_y)
+        pass_xt = df['xt'].to_numpy(dtype=float)[with_end] if 'xt' in df.columns else np.zeros(len(passer))
+        links = pd.DataFrame({'passer': passer[close], 'receiver': receiver[close], 'xt': pass_xt[close]})
+        grouped = links.groupby(['passer', 'receiver'], sort=False)['xt'].agg(['size', 'sum'])
+        for (p, r), row in grouped.iterrows():
+            connections[(player_ids[p], player_ids[r])] = {'count': int(row['size']), 'xt': float(row['sum'])}
+
+    if invert_coords:
+        pos_x = 100 - pos_x
+        pos_y = 100 - pos_y
+    avg_positions = {}
+    for i, player_id in enumerate(player_ids):
+        avg_positions[player_id] = {
+            'x': pos_x[i],
+            'y': pos_y[i],
+            'name': player_names.get(player_id, f'Player {player_id}'),
+            'passes': int(pass_counts.get(player_id, 0)),
+            'xt': float(player_xt.get(player_id, 0.0))
+        }
+    return avg_positions, connections
+
+
+def build_match_networks(events, period=None, time_range=None):
+    """Redes de pases de ambos equipos (el segundo con coordenadas invertidas)"""
+    player_names = dict(zip(events['player_ids'].tolist(), events['player_names'].tolist()))
+    networks = []
+    for team in range(2):
+        passes = extract_passes_from_events(events, team, period, time_range)
+        positions, connections = calculate_pass_network_positions(passes, player_names, invert_coords=team == 1)
+        networks.append({
+            'positions': positions,
+            'connections': connections,
+            'total': len(passes['x']),
+            'successful': int(passes['outcome'].sum())
+        })
+    return networks
@@ -9,27 +9,32 @@ from mplsoccer import Pitch
 import numpy as np
 import sys
 import tempfile
+import hashlib
+import io
 
 # Agregar carpeta Codigos al path
 codigos_path = Path(__file__).parent / 'Codigos'
 if codigos_path.exists():
     sys.path.insert(0, str(codigos_path))
 
-# Importar módulo xT
-try:
-    from xt_calculator import calculate_pass_xt, get_xt_value
-    XT_AVAILABLE = True
-except ImportError:
-    XT_AVAILABLE = False
+from match_events import read_match_file, normalize_events
+from pass_network import XT_AVAILABLE, extract_passes_from_events, build_match_networks
+from ingest import load_stage, events_identity
+from disk_cache import get_cache
+from dimensions import short_name
+from network_embeddings import similar_networks
+from live_feed import LiveMatch, LIVE_REFRESH_SECONDS, DEFAULT_LIVE_DIR, list_live_feeds
+from lineup_segments import build_segment_networks
+from raw_storage import DEFAULT_RAW_DIR, iter_match_files, match_key
+from processed_store import DEFAULT_PROCESSED_DIR
 
 def scan_data_directories():
     """Escanea las carpetas de datos y devuelve archivos disponibles"""
-    project_root = Path(__file__).parent
-    raw_dir = project_root / 'data' / 'raw'
-    processed_dir = project_root / 'data' / 'processed'
+    raw_dir = Path(DEFAULT_RAW_DIR)
+    processed_dir = Path(DEFAULT_PROCESSED_DIR)
     raw_dir.mkdir(parents=True, exist_ok=True)
     processed_dir.mkdir(parents=True, exist_ok=True)
-    json_files = sorted(raw_dir.glob('*.json'))
+    json_files = iter_match_files(raw_dir)
     parquet_files = sorted(processed_dir.glob('*.parquet'))
     for subdir in processed_dir.iterdir():
         if subdir.is_dir():
@@ -44,114 +49,33 @@ def scan_data_directories():
 def load_match_data(json_path):
     """Carga datos del archivo JSON y detecta formato automáticamente"""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        if 'Event' in data:
-            return {'format': 'f24', 'data': data}
-        elif 'matchInfo' in data and 'liveData' in data:
-            return {'format': 'stats_perform', 'data': data}
-        elif 'events' in data:
-            return {'format': 'generic', 'data': data}
-        else:
+        match_obj = read_match_file(json_path)
+        if match_obj['format'] == 'unknown':
             st.warning("⚠️ Formato de JSON no reconocido")
-            return {'format': 'unknown', 'data': data}
+        return match_obj
     except Exception as e:
         st.error(f"Error cargando archivo: {e}")
         return None
 
 def extract_passes(match_obj, team_id, period=None, time_range=None):
-    """Extrae todos los pases de un equipo específico"""
-    if match_obj is None:
+    """Extrae todos los pases de un equipo específico desde el JSON (normaliza al vuelo)"""
+    events = normalize_events(match_obj)
+    if events is None:
+        if match_obj is not None:
+            st.error(f"❌ Formato '{match_obj.get('format', 'unknown')}' no soportado")
         return []
-    format_type = match_obj.get('format', 'unknown')
-    match_data = match_obj.get('data', {})
-    if format_type == 'stats_perform':
-        return extract_passes_stats_perform(match_data, team_id, period, time_range)
-    elif format_type == 'f24':
-        return extract_passes_f24(match_data, team_id, period)
-    else:
-        st.error(f"❌ Formato '{format_type}' no soportado")
+    team = np.flatnonzero(events['team_ids'] == str(team_id))
+    if not len(team):
         return []
+    return extract_passes_from_events(events, int(team[0]), period, time_range)
 
 def extract_passes_stats_perform(match_data, team_id, period=None, time_range=None):
     """Extrae pases del formato Stats Perform"""
-    passes = []
-    if 'liveData' not in match_data or 'event' not in match_data['liveData']:
-        return passes
-    for event in match_data['liveData']['event']:
-        if event.get('typeId') != 1:
-            continue
-        if str(event.get('contestantId')) != str(team_id):
-            continue
-        if period and int(event.get('periodId', 0)) != period:
-            continue
-        if time_range:
-            event_min = int(event.get('timeMin', 0))
-            if period == 2:
-                event_min += 45
-            if not (time_range[0] <= event_min <= time_range[1]):
-                continue
-        x = float(event.get('x', 0))
-        y = float(event.get('y', 0))
-        end_x, end_y = None, None
-        qualifiers = event.get('qualifier', [])
-        for q in qualifiers:
-            if q.get('qualifierId') == 140:
-                end_x = float(q.get('value', 0))
-            elif q.get('qualifierId') == 141:
-                end_y = float(q.get('value', 0))
-        outcome = event.get('outcome', 0)
-        is_successful = outcome == 1
-        xt_value = 0.0
-        if XT_AVAILABLE and is_successful and end_x is not None and end_y is not None:
-            xt_value = calculate_pass_xt(x, y, end_x, end_y)
-        passes.append({
-            'player_id': event.get('playerId'),
-            'x': x,
-            'y': y,
-            'end_x': end_x,
-            'end_y': end_y,
-            'outcome': is_successful,
-            'timestamp': event.get('timeStamp'),
-            'period': event.get('periodId'),
-            'xt': xt_value
-        })
-    return passes
-
-def extract_passes_f24(match_data, team_id, period=None):
+    return extract_passes({'format': 'stats_perform', 'data': match_data}, team_id, period, time_range)
+
+def extract_passes_f24(match_data, team_id, period=None, time_range=None):
     """Extrae pases del formato F24"""
-    passes = []
-    for event in match_data.get('Event', []):
-        if event.get('type_id') != 1:
-            continue
-        if str(event.get('team_id')) != str(team_id):
-            continue
-        if period and int(event.get('period_id', 0)) != period:
-            continue
-        x = float(event.get('x', 0))
-        y = float(event.get('y', 0))
-        end_x, end_y = None, None
-        for q in event.get('qualifier', []):
-            if q.get('qualifier_id') == 140:
-                end_x = float(q.get('value', 0))
-            elif q.get('qualifier_id') == 141:
-                end_y = float(q.get('value', 0))
-        outcome = event.get('outcome', 1)
-        is_successful = outcome == 1
-        xt_value = 0.0
-        if XT_AVAILABLE and is_successful and end_x is not None and end_y is not None:
-            xt_value = calculate_pass_xt(x, y, end_x, end_y)
-        passes.append({
-            'player_id': event.get('player_id'),
-            'x': x,
-            'y': y,
-            'end_x': end_x,
-            'end_y': end_y,
-            'outcome': is_successful,
-            'timestamp': event.get('timestamp'),
-            'xt': xt_value
-        })
-    return passes
+    return extract_passes({'format': 'f24', 'data': match_data}, team_id, period, time_range)
 
 def get_player_names(match_obj, team_id):
     """Extrae nombres de jugadores"""
@@ -240,75 +164,7 @@ def get_team_names_f24(match_data):
 
 def get_player_short_name(full_name):
     """Convierte nombre completo a formato con inicial"""
-    if not full_name or pd.isna(full_name):
-        return "Unknown"
-    parts = str(full_name).strip().split()
-    if len(parts) == 1:
-        return parts[0]
-    elif len(parts) == 2:
-        return f"{parts[0][0]}. {parts[1]}"
-    else:
-        return f"{parts[0][0]}. {parts[-1]}"
-
-def calculate_pass_network_positions(passes, player_names, invert_coords=False):
-    """Calcula posiciones promedio y conexiones entre jugadores con xT"""
-    import pandas as pd
-    if not passes:
-        return {}, {}
-    df = pd.DataFrame(passes)
-    if invert_coords:
-        df['x'] = 100 - df['x']
-        df['y'] = 100 - df['y']
-        df.loc[df['end_x'].notnull(), 'end_x'] = 100 - df.loc[df['end_x'].notnull(), 'end_x']
-        df.loc[df['end_y'].notnull(), 'end_y'] = 100 - df.loc[df['end_y'].notnull(), 'end_y']
-    avg_locs = df.groupby('player_id').agg({'x': 'mean', 'y': 'mean'})
-    pass_counts = df[df['outcome'] == True].groupby('player_id').size()
-    if 'xt' in df.columns:
-        player_xt = df[df['outcome'] == True].groupby('player_id')['xt'].sum()
-    else:
-        player_xt = pd.Series(dtype=float)
-    avg_positions = {}
-    for player_id in avg_locs.index:
-        avg_positions[player_id] = {
-            'x': avg_locs.loc[player_id, 'x'],
-            'y': avg_locs.loc[player_id, 'y'],
-            'name': player_names.get(player_id, f'Player {player_id}'),
-            'passes': int(pass_counts.get(player_id, 0)),
-            'xt': float(player_xt.get(player_id, 0.0))
-        }
-    connections = {}
-    connection_xt = {}
-    successful_passes = df[
-        (df['outcome'] == True) & 
-        (df['end_x'].notnull()) & 
-        (df['end_y'].notnull())
-    ].copy()
-    if len(successful_passes) == 0:
-        return avg_positions, connections
-    for idx, pass_row in successful_passes.iterrows():
-        passer_id = pass_row['player_id']
-        end_x = pass_row['end_x']
-        end_y = pass_row['end_y']
-        pass_xt = pass_row.get('xt', 0.0)
-        min_distance = float('inf')
-        receiver_id = None
-        for player_id, pos in avg_positions.items():
-            if player_id == passer_id:
-                continue
-            distance = ((pos['x'] - end_x)**2 + (pos['y'] - end_y)**2)**0.5
-            if distance < min_distance:
-                min_distance = distance
-                receiver_id = player_id
-        if receiver_id and min_distance < 25:
-            key = (passer_id, receiver_id)
-            connections[key] = connections.get(key, 0) + 1
-            connection_xt[key] = connection_xt.get(key, 0.0) + pass_xt
-    for key in connections.keys():
-        connections[key] = {
-            'count': connections[key],
-            'xt': connection_xt.get(key, 0.0)
-        }
-    return avg_positions, connections
+    return short_name(full_name)
 
 def add_legend(ax, team_color='red'):
     """Agrega leyenda visual explicativa con 3 variables"""
@@ -494,15 +350,72 @@ def plot_passing_network(avg_positions, connections, team_name, ax, min_passes=3
                 fontsize=16, weight='bold', color='white', pad=15)
     ax.axis('off')
 
-def process_json_file(json_path):
-    """Procesa un archivo JSON y muestra la red de pases"""
+def match_cache_source(json_path, match_meta=None):
+    """Identidad del partido para la caché compartida (catálogo: archivo + versión de eventos; subidos: contenido)"""
+    if match_meta is not None and Path(json_path).exists():
+        return f'{match_key(match_meta)}:{events_identity(json_path)}'
+    return 'upload:' + hashlib.sha1(Path(json_path).read_bytes()).hexdigest()
+
+
+def render_networks_png(networks, team_names, min_passes=2):
+    """Renderiza las dos redes en un PNG (bytes) para cachearlo entre procesos"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(24, 11), facecolor='#0e1117')
+    plot_passing_network(networks[0]['positions'], networks[0]['connections'], team_names[0], ax1, min_passes, team_color='red')
+    plot_passing_network(networks[1]['positions'], networks[1]['connections'], team_names[1], ax2, min_passes, team_color='orange')
+    plt.tight_layout()
+    buffer = io.BytesIO()
+    # Mismos parámetros que st.pyplot
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight', facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def get_match_networks(events, source, period=None, time_range=None):
+    """Redes de ambos equipos desde la caché compartida (se calculan si faltan)"""
+    params = {'period': period, 'time_range': list(time_range) if time_range else None}
+    return get_cache().get_or_compute('network', source, params,
+                                      lambda: build_match_networks(events, period, time_range))
+
+
+def get_segment_networks(events, source):
+    """Segmentos de alineación y sus redes desde la caché compartida (todos de una vez)"""
+    return get_cache().get_or_compute('segment_networks', source, None,
+                                      lambda: build_segment_networks(events))
+
+
+def get_networks_figure(networks, team_names, source, period=None, time_range=None, min_passes=2,
+                        segment=None):
+    """PNG de las redes desde la caché compartida (se renderiza si falta)"""
+    params = {'period': period, 'time_range': list(time_range) if time_range else None,
+              'min_passes': min_passes, 'segment': segment}
+    return get_cache().get_or_compute('network_figure', source, params,
+                                      lambda: render_networks_png(networks, team_names, min_passes),
+                                      dumps=bytes, loads=bytes)
+
+
+def process_json_file(json_path, match_meta=None, raw_dir=None):
+    """Procesa un archivo JSON y muestra la red de pases.
+
+    Con match_meta (partido del catálogo) usa los eventos normalizados de la ingesta;
+    para archivos subidos normaliza el JSON al vuelo.
+    """
+    events = None
+    match_data = None
+    cache = get_cache()
+    source = match_cache_source(json_path, match_meta)
     with st.spinner('Cargando match data...'):
-        match_data = load_match_data(json_path)
-    
-    if match_data is None:
+        if match_meta is not None:
+            events = load_stage(match_meta, 'events', raw_dir)
+        if events is None:
+            match_data = load_match_data(json_path)
+            events = cache.get_or_compute('events', source, None, lambda: normalize_events(match_data))
+    
+    if events is None:
+        if match_data is not None:
+            st.error(f"❌ Formato '{match_data.get('format', 'unknown')}' no soportado")
         return
     
-    format_type = match_data.get('format', 'unknown')
+    format_type = str(events['format'])
     format_label = {
         'f24': '🟢 Formato: Opta F24',
         'stats_perform': '🟡 Formato: Stats Perform / Opta API',
@@ -511,7 +424,7 @@ def process_json_file(json_path):
     }
     st.info(format_label.get(format_type, format_type))
     
-    teams = get_team_names(match_data)
+    teams = dict(zip(events['team_ids'].tolist(), events['team_names'].tolist()))
     
     if len(teams) < 2:
         st.error("❌ No se encontraron 2 equipos en el archivo")
@@ -542,11 +455,8 @@ def process_json_file(json_path):
         )
     
     with col3:
-        max_minutes = 90
-        if period == 1:
-            max_minutes = 45
-        elif period == 2:
-            max_minutes = 90
+        # Minutos absolutos del partido: el 2do tiempo arranca en el 45
+        min_minutes, max_minutes = (45, 90) if period == 2 else (0, 45 if period == 1 else 90)
         
         use_time_filter = st.checkbox(
             "Filtrar por minutos",
@@ -559,35 +469,50 @@ def process_json_file(json_path):
         st.markdown("**Rango de tiempo:**")
         time_range = st.slider(
             "Selecciona rango de minutos:",
-            min_value=0,
+            min_value=min_minutes,
             max_value=max_minutes,
-            value=(0, max_minutes),
+            value=(min_minutes, max_minutes),
             help="Arrastra para seleccionar el rango de minutos a analizar"
         )
         st.info(f"🕒 Analizando minutos {time_range[0]} - {time_range[1]}")
     
+    # Todos los segmentos se calculan juntos: cambiar de segmento no recalcula nada
+    segmented = get_segment_networks(events, source)
+    segment_labels = {i: s['label'] for i, s in enumerate(segmented['segments'])}
+    segment = st.selectbox(
+        "Segmento de alineación:",
+        [None] + list(segment_labels),
+        format_func=lambda i: "Todo el rango" if i is None else segment_labels[i],
+        help="Tramos entre cambios y expulsiones: las dos alineaciones son fijas dentro de cada uno"
+    )
+    
     st.markdown("---")
     
-    passes_team1 = extract_passes(match_data, team_ids[0], period, time_range)
-    passes_team2 = extract_passes(match_data, team_ids[1], period, time_range)
+    if segment is not None:
+        st.info("🔄 Segmento seleccionado: se ignoran los filtros de período y minutos")
+        period, time_range = None, None
+        networks = segmented['networks'][segment]
+    else:
+        networks = get_match_networks(events, source, period, time_range)
     
-    if not passes_team1 and not passes_team2:
+    if networks[0]['total'] == 0 and networks[1]['total'] == 0:
         st.error("❌ No se encontraron pases en el rango seleccionado")
         st.info("💡 Intenta ajustar los filtros")
         return
     
-    players_team1 = get_player_names(match_data, team_ids[0])
-    players_team2 = get_player_names(match_data, team_ids[1])
+    player_names = dict(zip(events['player_ids'].tolist(), events['player_names'].tolist()))
+    players_team1 = player_names
+    players_team2 = player_names
     
-    positions1, connections1 = calculate_pass_network_positions(passes_team1, players_team1, invert_coords=False)
-    positions2, connections2 = calculate_pass_network_positions(passes_team2, players_team2, invert_coords=True)
+    positions1, connections1 = networks[0]['positions'], networks[0]['connections']
+    positions2, connections2 = networks[1]['positions'], networks[1]['connections']
     
     col1, col2, col3, col4 = st.columns(4)
     
-    successful_passes_1 = len([p for p in passes_team1 if p['outcome']])
-    successful_passes_2 = len([p for p in passes_team2 if p['outcome']])
-    total_passes_1 = len(passes_team1)
-    total_passes_2 = len(passes_team2)
+    successful_passes_1 = networks[0]['successful']
+    successful_passes_2 = networks[1]['successful']
+    total_passes_1 = networks[0]['total']
+    total_passes_2 = networks[1]['total']
     
     with col1:
         st.metric(f"{teams[team_ids[0]]} - Pases", successful_passes_1)
@@ -600,14 +525,9 @@ def process_json_file(json_path):
         acc2 = (successful_passes_2 / total_passes_2 * 100) if total_passes_2 > 0 else 0
         st.metric("Precisión", f"{acc2:.1f}%")
     
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(24, 11), facecolor='#0e1117')
-    
-    plot_passing_network(positions1, connections1, teams[team_ids[0]], ax1, min_passes, team_color='red')
-    plot_passing_network(positions2, connections2, teams[team_ids[1]], ax2, min_passes, team_color='orange')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    figure = get_networks_figure(networks, [teams[team_ids[0]], teams[team_ids[1]]], source,
+                                 period, time_range, min_passes, segment)
+    st.image(figure, use_container_width=True)
     
     # TABLAS CON xT
     st.markdown("---")
@@ -776,6 +696,89 @@ def process_json_file(json_path):
             
             styled = df_p2.style.applymap(color_scale, subset=['Pases'])
             st.dataframe(styled, use_container_width=True, hide_index=True)
+    
+    # REDES SIMILARES (índice de embeddings de la ingesta)
+    if match_meta is not None:
+        show_similar_networks(match_key(match_meta), list(events['team_ids']), list(events['team_names']))
+
+
+def show_similar_networks(match_id, team_ids, team_names, k=10):
+    """Tabla con las redes más parecidas del archivo para el equipo elegido"""
+    st.markdown("---")
+    st.subheader("🔎 Redes similares")
+    team = st.radio("Equipo:", range(len(team_ids)), format_func=lambda i: team_names[i],
+                    horizontal=True, key="similar_team")
+    similar = similar_networks(match_id, team_ids[team], k)
+    if not similar:
+        st.info("💡 Ejecuta `python ingest.py` para construir el índice de redes similares")
+        return
+    table = pd.DataFrame({
+        'Equipo': [row['team_name'] for row in similar],
+        'Rival': [row['opponent'] for row in similar],
+        'Fecha': [row['date'] for row in similar],
+        'Competición': [row['competition'] for row in similar],
+        'Similitud': [f"{row['similarity']:.2f}" for row in similar]
+    })
+    table.insert(0, '#', range(1, len(table) + 1))
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+def show_live_network(feed_path):
+    """Redes de pases en vivo: en cada actualización se leen solo los eventos nuevos del feed"""
+    key = f"live_match:{feed_path}"
+    if key not in st.session_state:
+        st.session_state[key] = LiveMatch(feed_path)
+    live = st.session_state[key]
+    st.info(f"🔴 En vivo: {feed_path}")
+    col1, col2 = st.columns(2)
+    with col1:
+        period = st.selectbox(
+            "Período:",
+            [("Partido Completo", None), ("1er Tiempo", 1), ("2do Tiempo", 2)],
+            format_func=lambda x: x[0],
+            key="live_period"
+        )[1]
+    with col2:
+        min_passes = st.slider("Pases mínimos (conexiones):", min_value=1, max_value=10, value=2,
+                               key="live_min_passes")
+
+    def render():
+        added = live.poll()
+        network = live.network
+        if live.feed.error:
+            st.warning(f"⚠️ Feed con errores ({live.feed.error})")
+        if live.feed.skipped:
+            st.caption(f"⚠️ {live.feed.skipped} líneas inválidas descartadas del feed")
+        if network.n_events == 0:
+            st.warning("⏳ Esperando eventos del feed...")
+            return
+        if st.button("🔁 Recalcular receptores", help="Reasigna todos los pases con las posiciones promedio actuales"):
+            network.reassign_receivers()
+            live.figure = None
+        team_names = live.team_names()
+        networks = network.snapshot(period)
+        cols = st.columns(4)
+        for i, net in enumerate(networks):
+            with cols[2 * i]:
+                st.metric(f"{team_names[i]} - Pases", net['successful'])
+            with cols[2 * i + 1]:
+                acc = (net['successful'] / net['total'] * 100) if net['total'] > 0 else 0
+                st.metric("Precisión", f"{acc:.1f}%")
+        # La figura solo se vuelve a dibujar si llegaron eventos o cambiaron los filtros
+        params = (period, min_passes, network.n_events)
+        if live.figure is None or live.figure_params != params:
+            live.figure = render_networks_png(networks, team_names, min_passes)
+            live.figure_params = params
+        st.image(live.figure, use_container_width=True)
+        st.caption(f"📡 {network.n_events} eventos (+{added} en la última lectura) · "
+                   f"se actualiza cada {LIVE_REFRESH_SECONDS}s")
+
+    # st.fragment refresca solo este bloque; en versiones sin fragmentos, actualización manual
+    fragment = getattr(st, 'fragment', None)
+    if fragment is not None:
+        fragment(run_every=LIVE_REFRESH_SECONDS)(render)()
+    else:
+        render()
+        st.button("🔄 Actualizar")
 
 def load_matches_metadata(raw_dir, scope='global', country=None, competition=None):
     """Carga metadata de partidos"""
@@ -788,6 +791,10 @@ def load_matches_metadata(raw_dir, scope='global', country=None, competition=Non
         metadata_file = raw_dir / country / competition / 'matches_metadata.json'
     if metadata_file and metadata_file.exists():
         try:
+            # Se relee solo si el archivo cambió (evita parsear el catálogo en cada rerun)
+            version = (str(metadata_file), metadata_file.stat().st_mtime_ns)
+            if version in _metadata_cache:
+                return _metadata_cache[version]
             with open(metadata_file, 'r', encoding='utf-8') as f:
                 metadata = json.load(f)
             if metadata:
@@ -795,11 +802,67 @@ def load_matches_metadata(raw_dir, scope='global', country=None, competition=Non
                 df['date'] = pd.to_datetime(df['date'])
                 if 'filepath' in df.columns:
                     df['filepath'] = df['filepath'].str.replace('\\', '/', regex=False)
-                return df.sort_values('date', ascending=False)
+                df = df.sort_values('date', ascending=False)
+                ids = df['id'].fillna('') if 'id' in df.columns else [''] * len(df)
+                df['match_key'] = [match_key({'id': m, 'filename': f}) for m, f in zip(ids, df['filename'])]
+                _metadata_cache.clear()
+                _metadata_cache[version] = df
+                return df
         except Exception as e:
             st.error(f"Error cargando metadata: {e}")
     return None
 
+_metadata_cache = {}
+
+MATCHES_PER_PAGE = 25
+
+def query_matches(df_matches, search=None, offset=0, limit=MATCHES_PER_PAGE):
+    """Página de partidos del catálogo filtrado (búsqueda por texto). Devuelve (página, total)"""
+    if search:
+        text = df_matches['description'].str.cat(df_matches['stage'].fillna(''), sep=' ')
+        df_matches = df_matches[text.str.contains(search, case=False, regex=False, na=False)]
+    return df_matches.iloc[offset:offset + limit], len(df_matches)
+
+def match_labels(page):
+    """Etiquetas solo para los partidos de la página visible"""
+    codes = page['competition_code'].where(page['competition_code'] != '', page['competition'].str[:3].str.upper())
+    stages = page['stage'].fillna('').map(lambda stage: f" | {stage}" if stage else '')
+    return dict(zip(page['match_key'],
+                    '📅 ' + page['date'].dt.strftime('%d/%m/%Y') + ' | ' + codes + stages + ' | ' + page['description']))
+
+def select_match_paginated(filtered_df, key='pn'):
+    """Selector paginado con búsqueda; en session_state solo se guardan la página y el id del partido"""
+    filters_key = f"{key}_filters"
+    signature = (len(filtered_df), tuple(filtered_df['match_key'].head(1)))
+    search = st.text_input("🔍 Buscar partido:", key=f"{key}_search", placeholder="Equipo, fase...")
+    if st.session_state.get(filters_key) != (signature, search):
+        st.session_state[filters_key] = (signature, search)
+        st.session_state[f"{key}_page"] = 0
+    page_number = st.session_state.get(f"{key}_page", 0)
+    page, total = query_matches(filtered_df, search, page_number * MATCHES_PER_PAGE)
+    if total == 0:
+        st.warning("⚠️ Ningún partido coincide con la búsqueda")
+        return None
+    n_pages = (total - 1) // MATCHES_PER_PAGE + 1
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if st.button("◀ Anterior", key=f"{key}_prev", disabled=page_number == 0):
+            st.session_state[f"{key}_page"] = page_number - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Página {page_number + 1} de {n_pages} · {total} partidos")
+    with col3:
+        if st.button("Siguiente ▶", key=f"{key}_next", disabled=page_number >= n_pages - 1):
+            st.session_state[f"{key}_page"] = page_number + 1
+            st.rerun()
+    labels = match_labels(page)
+    options = list(labels)
+    current = st.session_state.get(f"{key}_match_id")
+    selected_id = st.selectbox("Partido:", options, index=options.index(current) if current in labels else 0,
+                               format_func=labels.get, label_visibility="collapsed", key=f"{key}_match_select")
+    st.session_state[f"{key}_match_id"] = selected_id
+    return page[page['match_key'] == selected_id].iloc[0]
+
 def show_passing_network_tab():
     """Muestra la pestaña de análisis de redes de pases"""
     st.markdown("### 🕸️ Passing Network Analysis")
@@ -822,6 +885,22 @@ def show_passing_network_tab():
         st.info(f"📄 Archivo subido: {uploaded_file.name}")
         process_json_file(tmp_path)
         return
+    st.sidebar.markdown("### 🔴 Partido en vivo")
+    # Solo feeds de la carpeta configurada: la sesión no elige rutas arbitrarias del servidor
+    live_feeds = list_live_feeds()
+    if live_feeds:
+        live_feed = st.sidebar.selectbox(
+            "Feed en vivo:",
+            [None] + live_feeds,
+            format_func=lambda p: "— Ninguno —" if p is None else p.name,
+            help=f"Feeds NDJSON (por append) o JSON (reescrito) en {DEFAULT_LIVE_DIR}",
+            key="live_feed_path"
+        )
+        if live_feed is not None:
+            show_live_network(live_feed)
+            return
+    else:
+        st.sidebar.caption(f"Sin feeds en `{DEFAULT_LIVE_DIR}`")
     st.sidebar.markdown("---")
     global_metadata_file = raw_dir / 'matches_metadata.json'
     if not global_metadata_file.exists():
@@ -864,15 +943,7 @@ def show_passing_network_tab():
         st.info(f"📅 **Partido más reciente:** {selected_match['description']} ({selected_match['date'].strftime('%d/%m/%Y')})")
     else:
         st.markdown("#### 📋 Selecciona el partido:")
-        match_options = {}
-        for idx, row in filtered_df.iterrows():
-            date_str = row['date'].strftime('%d/%m/%Y')
-            code = row['competition_code'] if row['competition_code'] else row['competition'][:3].upper()
-            stage = f" | {row['stage']}" if row['stage'] else ''
-            display_name = f"📅 {date_str} | {code}{stage} | {row['description']}"
-            match_options[display_name] = row
-        selected_display = st.selectbox("Partido:", list(match_options.keys()), label_visibility="collapsed")
-        selected_match = match_options[selected_display]
+        selected_match = select_match_paginated(filtered_df)
     if selected_match is not None:
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
@@ -889,6 +960,6 @@ def show_passing_network_tab():
         st.markdown("---")
         selected_file = raw_dir / selected_match['filepath']
         if selected_file.exists():
-            process_json_file(selected_file)
+            process_json_file(selected_file, selected_match, raw_dir)
         else:
             st.error(f"❌ Archivo no encontrado: {selected_file}")
\ No newline at end of file
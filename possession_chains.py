@@ -0,0 +1,125 @@
+"""
+Segmentación de cadenas de posesión sobre los arrays de match_events.
+Una cadena termina cuando cambia el equipo en control del balón, hay un evento
+de balón parado (salida, falta, gol, córner, offside), se reanuda con un balón
+parado o cambia el período. Todo el cálculo es vectorizado por partido.
+"""
+
+import time
+
+import numpy as np
+
+from match_events import (PASS, OFFSIDE_PASS, TAKE_ON, FOUL, OUT, CORNER_AWARDED, TACKLE,
+                          INTERCEPTION, SAVE, CLAIM, CLEARANCE, MISS, POST, ATTEMPT_SAVED, GOAL,
+                          BALL_RECOVERY, KEEPER_PICKUP, BALL_TOUCH, SHOT_TYPES, has_qualifier)
+from xt_calculator import get_xt_values
+
+# Eventos que indican que el equipo del evento controla el balón
+CONTROL_TYPES = (PASS, TAKE_ON, INTERCEPTION, SAVE, CLAIM, CLEARANCE, MISS, POST,
+                 ATTEMPT_SAVED, GOAL, BALL_RECOVERY, KEEPER_PICKUP, BALL_TOUCH)
+# Eventos de balón parado: cortan la cadena en curso
+DEAD_BALL_TYPES = (OFFSIDE_PASS, FOUL, OUT, CORNER_AWARDED, GOAL)
+# Qualifiers de reanudación (tiro libre, córner, lateral, saque de arco, saque inicial)
+RESTART_QUALIFIERS = (5, 6, 107, 124, 279)
+
+
+def segment_possessions(events):
+    """Divide los eventos de un partido en cadenas de posesión.
+
+    Devuelve un dict con 'chain_id' por evento (-1 para eventos sin control de balón)
+    y arrays por cadena: start/end (índices de evento), team, period, n_events,
+    start_time, end_time, start/end x,y, xt_gain y ends_in_shot.
+    """
+    type_id = events['type_id']
+    n = len(type_id)
+    control = np.isin(type_id, CONTROL_TYPES)
+    # Una entrada fallida no gana el balón
+    control |= (type_id == TACKLE) & events['outcome']
+    dead = np.isin(type_id, DEAD_BALL_TYPES)
+    restart = (type_id == PASS) & has_qualifier(events, RESTART_QUALIFIERS)
+
+    idx = np.flatnonzero(control)
+    chain_id = np.full(n, -1, dtype=np.int32)
+    if len(idx) == 0:
+        return _empty_chains(chain_id)
+
+    team = events['team'][idx]
+    period = events['period'][idx]
+    dead_before = np.cumsum(dead) - dead  # balones parados estrictamente antes de cada evento
+    dead_between = dead_before[idx[1:]] - dead_before[idx[:-1]]
+    new_chain = np.empty(len(idx), dtype=bool)
+    new_chain[0] = True
+    new_chain[1:] = ((team[1:] != team[:-1]) | (period[1:] != period[:-1])
+                     | (dead_between > 0) | restart[idx[1:]])
+    control_chain = np.cumsum(new_chain) - 1
+    chain_id[idx] = control_chain
+
+    first = np.flatnonzero(new_chain)
+    last = np.append(first[1:] - 1, len(idx) - 1)
+    start = idx[first]
+    end = idx[last]
+
+    x, y = events['x'], events['y']
+    end_x, end_y = events['end_x'], events['end_y']
+    # La cadena termina donde llega el último pase exitoso o, si no, donde ocurre el último evento
+    use_end = (type_id[end] == PASS) & events['outcome'][end] & ~np.isnan(end_x[end])
+    final_x = np.where(use_end, end_x[end], x[end])
+    final_y = np.where(use_end, end_y[end], y[end])
+    xt_gain = get_xt_values(final_x, final_y) - get_xt_values(x[start], y[start])
+
+    return {
+        'chain_id': chain_id,
+        'chain_start': start.astype(np.int32),
+        'chain_end': end.astype(np.int32),
+        'chain_team': events['team'][start],
+        'chain_period': events['period'][start],
+        'chain_n_events': (last - first + 1).astype(np.int16),
+        'chain_start_time': events['time_s'][start],
+        'chain_end_time': events['time_s'][end],
+        'chain_start_x': x[start],
+        'chain_start_y': y[start],
+        'chain_end_x': final_x.astype(np.float32),
+        'chain_end_y': final_y.astype(np.float32),
+        'chain_xt_gain': xt_gain.astype(np.float32),
+        'chain_ends_in_shot': np.isin(type_id[end], SHOT_TYPES)
+    }
+
+
+def _empty_chains(chain_id):
+    empty_i = np.zeros(0, dtype=np.int32)
+    empty_f = np.zeros(0, dtype=np.float32)
+    return {
+        'chain_id': chain_id,
+        'chain_start': empty_i, 'chain_end': empty_i,
+        'chain_team': np.zeros(0, dtype=np.int8), 'chain_period': np.zeros(0, dtype=np.int8),
+        'chain_n_events': np.zeros(0, dtype=np.int16),
+        'chain_start_time': empty_f, 'chain_end_time': empty_f,
+        'chain_start_x': empty_f, 'chain_start_y': empty_f,
+        'chain_end_x': empty_f, 'chain_end_y': empty_f,
+        'chain_xt_gain': empty_f, 'chain_ends_in_shot': np.zeros(0, dtype=bool)
+    }
+
+
+def segment_matches(events_list, verbose=False):
+    """Segmenta una lista de partidos (con verbose=True reporta el tiempo total)"""
+    t0 = time.perf_counter()
+    results = [segment_possessions(events) for events in events_list]
+    elapsed = time.perf_counter() - t0
+    if verbose:
+        n_chains = sum(len(r['chain_start']) for r in results)
+        print(f"⛓️  {len(results)} partidos, {n_chains} cadenas en {elapsed:.2f}s")
+    return results
+
+
+def chain_summary(events, chains):
+    """Métricas por equipo: número de cadenas, eventos medios, xT ganado y cadenas que terminan en tiro"""
+    summary = {}
+    for team in range(len(events['team_ids'])):
+        mask = chains['chain_team'] == team
+        summary[str(events['team_ids'][team])] = {
+            'chains': int(mask.sum()),
+            'avg_events': float(chains['chain_n_events'][mask].mean()) if mask.any() else 0.0,
+            'xt_gain': float(chains['chain_xt_gain'][mask].sum()),
+            'shot_chains': int(chains['chain_ends_in_shot'][mask].sum())
+        }
+    return summary
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Precalienta la caché compartida con los partidos más recientes de cada competición.
+Para los N partidos más nuevos por competición ingiere los eventos y deja en la
+caché las redes de pases y la figura con los filtros por defecto de la pestaña
+(partido completo, sin filtro de minutos), para que el primer analista no pague
+el costo en frío. Pensado para ejecutarse después de generate_metadata.py o como
+hilo en segundo plano al arrancar la app (FUTBOL_PREWARM=1).
+
+Uso: python prewarm.py [--per-competition 5] [--workers 2] [--cpu-budget 0.5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from ingest import DEFAULT_RAW_DIR, load_catalog, load_stage
+from raw_storage import match_key
+
+DEFAULT_PER_COMPETITION = int(os.environ.get('FUTBOL_PREWARM_MATCHES', 5))
+DEFAULT_CPU_BUDGET = float(os.environ.get('FUTBOL_PREWARM_CPU', 0.5))
+# Períodos a precalcular: None = partido completo (vista por defecto)
+DEFAULT_PERIODS = (None,)
+DEFAULT_MIN_PASSES = 2
+
+
+def newest_matches(catalog, per_competition=DEFAULT_PER_COMPETITION):
+    """Los N partidos más recientes de cada competición (más nuevos primero)"""
+    by_competition = {}
+    for match in catalog:
+        key = (match.get('country', ''), match.get('competition_full_name') or match.get('competition', ''))
+        by_competition.setdefault(key, []).append(match)
+    selected = []
+    for matches in by_competition.values():
+        matches.sort(key=lambda m: (str(m.get('date', '')), str(m.get('time', ''))), reverse=True)
+        selected.extend(matches[:per_competition])
+    selected.sort(key=lambda m: (str(m.get('date', '')), str(m.get('time', ''))), reverse=True)
+    return selected
+
+
+def workers_for_budget(cpu_budget=DEFAULT_CPU_BUDGET, workers=None):
+    """Número de procesos: el pedido, limitado por la fracción de núcleos permitida"""
+    limit = max(1, int((os.cpu_count() or 1) * cpu_budget))
+    return min(workers, limit) if workers else limit
+
+
+def lower_priority():
+    """Baja la prioridad del proceso actual (workers en segundo plano)"""
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+def warm_match(match, raw_dir, periods=DEFAULT_PERIODS, min_passes=DEFAULT_MIN_PASSES):
+    """Ingiere un partido y deja sus redes y figuras en la caché compartida"""
+    # Import diferido: los workers solo cargan matplotlib/mplsoccer al trabajar
+    from passing_network_tab import match_cache_source, get_match_networks, get_networks_figure
+    json_path = Path(raw_dir) / str(match['filepath']).replace('\\', '/')
+    events = load_stage(match, 'events', raw_dir)
+    if events is None:
+        return False
+    source = match_cache_source(json_path, match)
+    team_names = [str(name) for name in events['team_names'][:2]]
+    if len(team_names) < 2:
+        return False
+    for period in periods:
+        networks = get_match_networks(events, source, period)
+        get_networks_figure(networks, team_names, source, period, None, min_passes)
+    return True
+
+
+def prewarm(raw_dir=DEFAULT_RAW_DIR, per_competition=DEFAULT_PER_COMPETITION, workers=None,
+            cpu_budget=DEFAULT_CPU_BUDGET, periods=DEFAULT_PERIODS, verbose=True):
+    """Precalienta los partidos más recientes en un pool de procesos de baja prioridad"""
+    matches = newest_matches(load_catalog(raw_dir), per_competition)
+    n_workers = workers_for_budget(cpu_budget, workers)
+    if verbose:
+        print(f"🔥 Precalentando {len(matches)} partidos con {n_workers} procesos")
+    t0 = time.perf_counter()
+    warmed = errors = 0
+    # spawn: seguro también cuando se lanza desde un hilo del servidor Streamlit
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, initializer=lower_priority) as pool:
+        futures = {pool.submit(warm_match, match, str(raw_dir), periods): match for match in matches}
+        for future in as_completed(futures):
+            try:
+                warmed += bool(future.result())
+            except Exception as e:
+                errors += 1
+                if verbose:
+                    print(f"  ⚠️  Error en {match_key(futures[future])}: {e}")
+    if verbose:
+        print(f"✅ {warmed} partidos en caché en {time.perf_counter() - t0:.1f}s ({errors} errores)")
+    return warmed, errors
+
+
+_background_thread = None
+
+
+def start_background_prewarm(raw_dir=DEFAULT_RAW_DIR, **kwargs):
+    """Lanza prewarm en un hilo daemon (una sola vez por proceso)"""
+    global _background_thread
+    if _background_thread is None:
+        _background_thread = threading.Thread(
+            target=prewarm, args=(raw_dir,), kwargs=dict(kwargs, verbose=False),
+            name='prewarm', daemon=True)
+        _background_thread.start()
+    return _background_thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precalienta la caché con los partidos más recientes')
+    parser.add_argument('--raw-dir', default=str(DEFAULT_RAW_DIR))
+    parser.add_argument('--per-competition', type=int, default=DEFAULT_PER_COMPETITION,
+                        help='Partidos más recientes por competición')
+    parser.add_argument('--workers', type=int, help='Procesos en paralelo (por defecto: según --cpu-budget)')
+    parser.add_argument('--cpu-budget', type=float, default=DEFAULT_CPU_BUDGET,
+                        help='Fracción máxima de núcleos a usar (0-1)')
+    parser.add_argument('--halves', action='store_true', help='Precalcular también 1er y 2do tiempo')
+    args = parser.parse_args()
+    periods = (None, 1, 2) if args.halves else DEFAULT_PERIODS
+    _, errors = prewarm(args.raw_dir, args.per_competition, args.workers, args.cpu_budget, periods)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
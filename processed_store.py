@@ -0,0 +1,279 @@
+"""
+Almacenamiento de resultados precalculados por partido en data/processed.
+Cada etapa de ingesta guarda un archivo por partido con un formato binario fijo,
+junto con la identidad del archivo fuente (tamaño + mtime) para saber si está
+actualizado:
+
+    b'FUTSTORE' | versión (uint32) | largo del encabezado (uint32) | encabezado JSON
+    | arrays contiguos, cada uno alineado a 64 bytes
+
+El encabezado lista nombre, dtype, forma y offset de cada array. La lectura es
+un memory-map de solo lectura: las sesiones y procesos que abren el mismo partido
+comparten las páginas en la caché del sistema operativo en lugar de tener cada
+uno su propia copia, y solo se leen del disco las columnas que se usan.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_PROCESSED_DIR = Path(os.environ.get(
+    'FUTBOL_PROCESSED_DIR', Path(__file__).parent / 'data' / 'processed'))
+
+STORE_SUFFIX = '.fms'
+STORE_MAGIC = b'FUTSTORE'
+STORE_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct('<8sII')
+
+# Mapas abiertos por proceso (cada uno retiene un descriptor de archivo)
+MAX_OPEN_MAPS = int(os.environ.get('FUTBOL_STORE_MAX_MAPS', 128))
+_maps = OrderedDict()
+_maps_lock = threading.Lock()
+
+
+def source_identity(json_path):
+    """Identidad del archivo fuente: 'tamaño:mtime_ns'"""
+    stat = os.stat(json_path)
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def temp_path(path):
+    """Nombre temporal único por llamada junto a `path` (las sesiones de Streamlit son hilos del mismo proceso)"""
+    path = Path(path)
+    return path.with_name(f'{path.name}.{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}.tmp')
+
+
+def stage_path(stage, match_id, processed_dir=None):
+    return Path(processed_dir or DEFAULT_PROCESSED_DIR) / stage / f'{match_id}{STORE_SUFFIX}'
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_arrays(stage, match_id, arrays, source=None, processed_dir=None):
+    """Guarda un dict de arrays para una etapa y partido (escritura atómica)"""
+    path = stage_path(stage, match_id, processed_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {k: np.asarray(v) for k, v in arrays.items()}
+    for name, array in payload.items():
+        if array.dtype.hasobject:
+            raise TypeError(f"'{name}': los arrays de objetos no se pueden guardar en el store")
+
+    # Offsets relativos al inicio de la zona de datos
+    fields, offset = {}, 0
+    for name, array in payload.items():
+        fields[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({'source': source, 'fields': fields}, ensure_ascii=False).encode('utf-8')
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    tmp_path = temp_path(path)
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(STORE_MAGIC, STORE_VERSION, len(header)))
+        f.write(header)
+        for name, array in payload.items():
+            f.write(b'\0' * (data_start + fields[name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    _release(path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _read_header(f):
+    prefix = f.read(_PREFIX.size)
+    if len(prefix) < _PREFIX.size:
+        raise ValueError('archivo del store truncado')
+    magic, version, header_size = _PREFIX.unpack(prefix)
+    if magic != STORE_MAGIC or version != STORE_VERSION:
+        raise ValueError('formato de store desconocido')
+    header = json.loads(f.read(header_size).decode('utf-8'))
+    return header, _aligned(_PREFIX.size + header_size)
+
+
+def _release(path):
+    """Olvida el mapa de un archivo (en Windows no se puede reemplazar un archivo mapeado)"""
+    with _maps_lock:
+        _maps.pop(str(path), None)
+
+
+def _open_mapped(path):
+    """Encabezado y mapa de solo lectura de un archivo, reutilizado mientras no cambie en disco"""
+    stat = os.stat(path)
+    version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    key = str(path)
+    with _maps_lock:
+        cached = _maps.get(key)
+        if cached is not None and cached[0] == version:
+            _maps.move_to_end(key)
+            return cached[1], cached[2], cached[3]
+    with open(path, 'rb') as f:
+        header, data_start = _read_header(f)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with _maps_lock:
+        # Los arrays ya entregados mantienen vivo su mapa aunque salga de la caché
+        _maps[key] = (version, header, data_start, mapped)
+        _maps.move_to_end(key)
+        while len(_maps) > MAX_OPEN_MAPS:
+            _maps.popitem(last=False)
+    return header, data_start, mapped
+
+
+def _field_array(mapped, data_start, field):
+    dtype = np.dtype(field['dtype'])
+    shape = tuple(field['shape'])
+    count = int(np.prod(shape, dtype=np.int64))
+    if count == 0 or dtype.itemsize == 0:
+        array = np.zeros(shape, dtype=dtype)
+        array.flags.writeable = False
+        return array
+    return np.frombuffer(mapped, dtype=dtype, count=count,
+                         offset=data_start + field['offset']).reshape(shape)
+
+
+def load_arrays(stage, match_id, processed_dir=None, keys=None):
+    """Carga los arrays de una etapa y partido, o None si no existen.
+
+    Los arrays son vistas de solo lectura sobre el archivo mapeado (sin copia);
+    keys limita el resultado a esos arrays.
+    """
+    path = stage_path(stage, match_id, processed_dir)
+    try:
+        header, data_start, mapped = _open_mapped(path)
+    except FileNotFoundError:
+        return None
+    return {name: _field_array(mapped, data_start, field) for name, field in header['fields'].items()
+            if keys is None or name in keys}
+
+
+def delete_arrays(stage, match_id, processed_dir=None):
+    """Borra los arrays de una etapa y partido (si existen)"""
+    path = stage_path(stage, match_id, processed_dir)
+    _release(path)
+    path.unlink(missing_ok=True)
+
+
+def stage_source(stage, match_id, processed_dir=None):
+    """Fuente con la que se calculó la etapa (None si no existe)"""
+    path = stage_path(stage, match_id, processed_dir)
+    try:
+        # Solo el encabezado: no hace falta mapear el archivo
+        with open(path, 'rb') as f:
+            header, _ = _read_header(f)
+    except (OSError, ValueError):
+        return None
+    return header.get('source')
+
+
+def is_fresh(stage, match_id, source, processed_dir=None):
+    """True si la etapa ya fue calculada para esta versión del archivo fuente"""
+    return stage_source(stage, match_id, processed_dir) == source
+
+
+class StackedWriter:
+    """Apila una fila por partido-equipo en un .npy por clave sin retener las filas en memoria.
+
+    Cada .npy temporal es un memory-map con capacidad fija (p. ej. partidos del catálogo × equipos);
+    commit() lo recorta a las filas escritas y lo reemplaza de forma atómica.
+    """
+
+    COPY_ROWS = 4096
+
+    def __init__(self, out_dir, capacity):
+        self.out_dir = Path(out_dir)
+        self.capacity = capacity
+        self.rows = 0
+        self._arrays = {}
+
+    def append(self, arrays):
+        """Agrega una fila con un array por clave (misma forma y dtype en todas las filas)"""
+        for key, row in arrays.items():
+            row = np.asarray(row)
+            if key not in self._arrays:
+                self.out_dir.mkdir(parents=True, exist_ok=True)
+                path = temp_path(self.out_dir / f'{key}.npy')
+                self._arrays[key] = (path, np.lib.format.open_memmap(
+                    path, mode='w+', dtype=row.dtype, shape=(self.capacity,) + row.shape))
+            self._arrays[key][1][self.rows] = row
+        self.rows += 1
+
+    def commit(self):
+        """Recorta y reemplaza los .npy; devuelve {clave: forma} (vacío si no hubo filas)"""
+        if not self.rows:
+            self.discard()
+            return {}
+        shapes = {}
+        for key in list(self._arrays):
+            path, array = self._arrays.pop(key)
+            if self.rows < self.capacity:
+                trimmed_path = temp_path(self.out_dir / f'{key}.npy')
+                trimmed = np.lib.format.open_memmap(trimmed_path, mode='w+', dtype=array.dtype,
+                                                    shape=(self.rows,) + array.shape[1:])
+                for start in range(0, self.rows, self.COPY_ROWS):
+                    stop = min(start + self.COPY_ROWS, self.rows)
+                    trimmed[start:stop] = array[start:stop]
+                del array
+                path.unlink()
+                path, array = trimmed_path, trimmed
+            array.flush()
+            shapes[key] = list(array.shape)
+            # Se suelta el mapa antes de reemplazar (Windows no reemplaza archivos mapeados)
+            del array
+            os.replace(path, self.out_dir / f'{key}.npy')
+        return shapes
+
+    def discard(self):
+        """Borra los temporales sin tocar los .npy anteriores"""
+        for path, _ in self._arrays.values():
+            path.unlink(missing_ok=True)
+        self._arrays = {}
+
+
+STACKED_INDEX = 'index.json'
+
+
+def write_stacked_index(out_dir, rows, shapes):
+    """index.json de un apilado (filas y forma de cada .npy), escrito al final y de forma atómica"""
+    path = Path(out_dir) / STACKED_INDEX
+    tmp_path = temp_path(path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'shapes': shapes, 'rows': rows}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_stacked_index(out_dir):
+    """Índice de un apilado ({'shapes', 'rows'}) o None si no existe o tiene el formato anterior"""
+    path = Path(out_dir) / STACKED_INDEX
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) and 'shapes' in index else None
+
+
+def load_stacked(out_dir, key):
+    """(filas del índice, .npy mapeado) si la forma del .npy coincide con el índice; ([], None) si no.
+
+    Los .npy se reemplazan antes que el índice: si una lectura cae en medio de un
+    reemplazo, se reintenta una vez con el índice nuevo.
+    """
+    for _ in range(2):
+        index = load_stacked_index(out_dir)
+        if index is None or key not in index['shapes']:
+            return [], None
+        try:
+            array = np.load(Path(out_dir) / f'{key}.npy', mmap_mode='r')
+        except (OSError, ValueError):
+            continue
+        if list(array.shape) == index['shapes'][key] and array.shape[0] == len(index['rows']):
+            return index['rows'], array
+    return [], None
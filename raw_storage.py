@@ -0,0 +1,70 @@
+"""
+Lectura transparente del archivo crudo de partidos.
+Los JSON de data/raw pueden estar sin comprimir (.json) o comprimidos
+(.json.gz, .json.zst); la descompresión es en streaming para no cargar
+el archivo comprimido completo en memoria. zstandard es opcional.
+"""
+
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MATCH_SUFFIXES = ('.json', '.json.gz', '.json.zst')
+METADATA_FILENAME = 'matches_metadata.json'
+DEFAULT_RAW_DIR = Path(os.environ.get('FUTBOL_RAW_DIR', Path(__file__).parent / 'data' / 'raw'))
+
+
+def match_suffix(path):
+    """Sufijo de partido reconocido ('' si no es un JSON de partido)"""
+    name = Path(path).name
+    for suffix in sorted(MATCH_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return suffix
+    return ''
+
+
+def is_match_file(path):
+    return bool(match_suffix(path)) and Path(path).name != METADATA_FILENAME
+
+
+def match_stem(path):
+    """Nombre del archivo sin sufijos de JSON ni de compresión"""
+    name = Path(path).name
+    suffix = match_suffix(name)
+    return name[:-len(suffix)] if suffix else Path(name).stem
+
+
+def match_key(match_meta):
+    """Identificador de partido usado como nombre de archivo en data/processed"""
+    return match_meta.get('id') or match_stem(match_meta.get('filename', ''))
+
+
+def iter_match_files(directory):
+    """JSONs de partido (comprimidos o no) de una carpeta, ordenados por nombre"""
+    return sorted(p for p in Path(directory).iterdir() if p.is_file() and is_match_file(p))
+
+
+def open_match_file(path, suffix=None):
+    """Abre un JSON de partido como stream de texto, descomprimiendo según la extensión"""
+    suffix = suffix or match_suffix(path)
+    if suffix == '.json.gz':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if suffix == '.json.zst':
+        if zstandard is None:
+            raise ImportError("Se necesita 'zstandard' para leer archivos .json.zst (pip install zstandard)")
+        raw = open(path, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def load_json(path, suffix=None):
+    with open_match_file(path, suffix) as f:
+        return json.load(f)
@@ -0,0 +1,318 @@
+"""
+Acumulados de temporada mantenidos de forma incremental: jugadores, equipos y conexiones
+(pasador -> receptor) por competición y temporada.
+Cada partido guarda su aporte en la etapa 'rollup' del store, con la identidad de las
+etapas de las que salió (player_stats, team_stats, network) y su competición/temporada.
+Al reingerir un partido se resta el aporte anterior y se suma el nuevo; un partido que
+sale del catálogo solo se resta. Las tablas acumuladas (Parquet en processed/rollups)
+son pequeñas y los rankings se leen de ahí sin tocar los partidos.
+Si una actualización se interrumpe, la siguiente reconstruye las tablas sumando los
+aportes guardados (que son la fuente de verdad). Las columnas de xT se redondean en
+los aportes y al combinar, así restar y volver a sumar un partido no deja residuos,
+y cada FUTBOL_ROLLUP_REBUILD_EVERY actualizaciones se reconstruyen desde los aportes.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from processed_store import (DEFAULT_PROCESSED_DIR, STORE_SUFFIX, save_arrays, load_arrays,
+                             delete_arrays, stage_source, temp_path)
+from raw_storage import match_key
+
+ROLLUP_STAGE = 'rollup'
+SOURCE_STAGES = ('player_stats', 'team_stats', 'network')
+SCOPE_KEYS = ['competition', 'season']
+# Tabla -> (claves, columnas sumables)
+ROLLUP_TABLES = {
+    'players': (SCOPE_KEYS + ['team_id', 'player_id'],
+                ['matches', 'passes', 'successful_passes', 'xt', 'action_xt']),
+    'teams': (SCOPE_KEYS + ['team_id'],
+              ['matches', 'passes', 'successful_passes', 'xt', 'action_xt']),
+    'connections': (SCOPE_KEYS + ['team_id', 'passer_id', 'receiver_id'],
+                    ['matches', 'passes', 'xt']),
+}
+STATE_FILENAME = 'state.json'
+# Decimales de las sumas de xT: restar y sumar aportes deja residuos de ~1e-15
+XT_DECIMALS = 9
+# Actualizaciones incrementales entre reconstrucciones completas desde los aportes
+REBUILD_EVERY = int(os.environ.get('FUTBOL_ROLLUP_REBUILD_EVERY', 50))
+
+_rollups = {}
+
+
+def rollups_dir(processed_dir=None):
+    return Path(processed_dir or DEFAULT_PROCESSED_DIR) / 'rollups'
+
+
+def _stats_contribution(arrays, id_keys):
+    """Filas del partido completo (período 0) de una etapa de estadísticas"""
+    full = arrays['period'] == 0
+    columns = {key: np.asarray(arrays[key][full]) for key in id_keys}
+    columns['matches'] = np.ones(int(full.sum()), dtype=np.int32)
+    for col in ('passes', 'successful_passes'):
+        columns[col] = arrays[col][full].astype(np.int32)
+    for col in ('xt', 'action_xt'):
+        columns[col] = arrays[col][full].astype(np.float64)
+    return columns
+
+
+def _connection_contribution(network, events):
+    """Conexiones con al menos un pase de ambos equipos, con ids de jugador"""
+    columns = {key: [] for key in ('team_id', 'passer_id', 'receiver_id', 'passes', 'xt')}
+    for team in range(len(network.get('net_player', []))):
+        slots = network['net_player'][team]
+        src, dst = np.nonzero(network['net_counts'][team])
+        keep = (slots[src] >= 0) & (slots[dst] >= 0)
+        src, dst = src[keep], dst[keep]
+        columns['team_id'].append(np.full(len(src), str(events['team_ids'][team])))
+        columns['passer_id'].append(events['player_ids'][slots[src]].astype(str))
+        columns['receiver_id'].append(events['player_ids'][slots[dst]].astype(str))
+        columns['passes'].append(network['net_counts'][team][src, dst].astype(np.int32))
+        columns['xt'].append(network['net_xt_flow'][team][src, dst].astype(np.float64))
+    if not columns['passes']:
+        return {'team_id': np.zeros(0, dtype=str), 'passer_id': np.zeros(0, dtype=str),
+                'receiver_id': np.zeros(0, dtype=str), 'matches': np.zeros(0, dtype=np.int32),
+                'passes': np.zeros(0, dtype=np.int32), 'xt': np.zeros(0)}
+    columns = {key: np.concatenate(parts) for key, parts in columns.items()}
+    columns['matches'] = np.ones(len(columns['passes']), dtype=np.int32)
+    return columns
+
+
+def match_contribution(match_id, processed_dir=None):
+    """Aporte de un partido a cada tabla acumulada (None si faltan etapas)"""
+    player_stats = load_arrays('player_stats', match_id, processed_dir)
+    team_stats = load_arrays('team_stats', match_id, processed_dir)
+    network = load_arrays('network', match_id, processed_dir)
+    events = load_arrays('events', match_id, processed_dir, keys=('team_ids', 'player_ids'))
+    if player_stats is None or team_stats is None or network is None or events is None:
+        return None
+    return {
+        'players': _stats_contribution(player_stats, ['team_id', 'player_id']),
+        'teams': _stats_contribution(team_stats, ['team_id']),
+        'connections': _connection_contribution(network, events),
+    }
+
+
+def _flatten(contribution):
+    return {f'{table}__{col}': values for table, columns in contribution.items() for col, values in columns.items()}
+
+
+def _unflatten(arrays):
+    contribution = {table: {} for table in ROLLUP_TABLES}
+    for name, values in arrays.items():
+        table, col = name.split('__', 1)
+        contribution[table][col] = values
+    return contribution
+
+
+def _delta_frames(contribution, scope, sign):
+    """DataFrames con el aporte (sign=-1 para restarlo) y la competición/temporada como claves"""
+    frames = {}
+    for table, (keys, values) in ROLLUP_TABLES.items():
+        df = pd.DataFrame({col: np.asarray(v) for col, v in contribution[table].items()})
+        if df.empty:
+            continue
+        df['competition'], df['season'] = scope
+        df[values] = df[values] * sign
+        # Aportes en la misma grilla que las sumas: el orden de las operaciones no cambia el resultado
+        xt_columns = [col for col in values if col.endswith('xt')]
+        df[xt_columns] = df[xt_columns].round(XT_DECIMALS)
+        frames[table] = df[keys + values]
+    return frames
+
+
+def _applied(match_id, processed_dir):
+    """(identidad, (competición, temporada)) del aporte ya aplicado de un partido, o None"""
+    source = stage_source(ROLLUP_STAGE, match_id, processed_dir)
+    if source is None:
+        return None
+    identity, competition, season = json.loads(source)
+    return identity, (competition, season)
+
+
+def _state(processed_dir):
+    path = rollups_dir(processed_dir) / STATE_FILENAME
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(processed_dir, **state):
+    path = rollups_dir(processed_dir) / STATE_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _write_tables(tables, processed_dir):
+    out_dir = rollups_dir(processed_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for table, df in tables.items():
+        path = out_dir / f'{table}.parquet'
+        tmp_path = temp_path(path)
+        df.to_parquet(tmp_path, index=False)
+        tmp_path.replace(path)
+
+
+def _combine(base, deltas):
+    """Suma agrupada de la tabla actual y los deltas (xT redondeado); descarta filas sin partidos"""
+    tables = {}
+    for table, (keys, values) in ROLLUP_TABLES.items():
+        frames = [df for df in [base.get(table)] + deltas.get(table, []) if df is not None and not df.empty]
+        if not frames:
+            tables[table] = pd.DataFrame({col: pd.Series(dtype=object if col in keys else float)
+                                          for col in keys + values})
+            continue
+        df = pd.concat(frames, ignore_index=True).groupby(keys, as_index=False, sort=False)[values].sum()
+        xt_columns = [col for col in values if col.endswith('xt')]
+        df[xt_columns] = df[xt_columns].round(XT_DECIMALS)
+        tables[table] = df[df['matches'] > 0].reset_index(drop=True)
+    return tables
+
+
+def _applied_matches(processed_dir):
+    stage_dir = Path(processed_dir or DEFAULT_PROCESSED_DIR) / ROLLUP_STAGE
+    return {path.name[:-len(STORE_SUFFIX)] for path in stage_dir.glob(f'*{STORE_SUFFIX}')}
+
+
+def rebuild_rollups(processed_dir=None):
+    """Reconstruye las tablas sumando todos los aportes guardados"""
+    deltas = {}
+    applied = _applied_matches(processed_dir)
+    for match_id in applied:
+        info = _applied(match_id, processed_dir)
+        arrays = load_arrays(ROLLUP_STAGE, match_id, processed_dir)
+        if info is None or arrays is None:
+            continue
+        for table, df in _delta_frames(_unflatten(arrays), info[1], 1).items():
+            deltas.setdefault(table, []).append(df)
+    _write_tables(_combine({}, deltas), processed_dir)
+    _write_state(processed_dir, clean=True, matches=len(applied), updates=0)
+    return len(applied)
+
+
+def update_rollups(catalog, processed_dir=None):
+    """Aplica a las tablas acumuladas los partidos nuevos, reingeridos o eliminados.
+
+    Devuelve (partidos aplicados, partidos eliminados).
+    """
+    state = _state(processed_dir)
+    tables_exist = all((rollups_dir(processed_dir) / f'{table}.parquet').exists() for table in ROLLUP_TABLES)
+    deltas, changed = {}, {}
+    in_catalog = set()
+    for match in catalog:
+        match_id = match_key(match)
+        in_catalog.add(match_id)
+        sources = [stage_source(stage, match_id, processed_dir) for stage in SOURCE_STAGES]
+        if None in sources:
+            continue  # sin ingerir (o con error): se conserva el aporte anterior
+        identity = '|'.join(sources)
+        scope = (match.get('competition_full_name', ''), str(match.get('season', '')))
+        previous = _applied(match_id, processed_dir)
+        if previous == (identity, scope):
+            continue
+        contribution = match_contribution(match_id, processed_dir)
+        if contribution is None:
+            continue
+        if previous is not None:
+            old = load_arrays(ROLLUP_STAGE, match_id, processed_dir)
+            for table, df in _delta_frames(_unflatten(old), previous[1], -1).items():
+                deltas.setdefault(table, []).append(df)
+        for table, df in _delta_frames(contribution, scope, 1).items():
+            deltas.setdefault(table, []).append(df)
+        changed[match_id] = (contribution, json.dumps([identity, *scope], ensure_ascii=False))
+
+    removed = []
+    for match_id in _applied_matches(processed_dir) - in_catalog:
+        info = _applied(match_id, processed_dir)
+        old = load_arrays(ROLLUP_STAGE, match_id, processed_dir)
+        if info is not None and old is not None:
+            for table, df in _delta_frames(_unflatten(old), info[1], -1).items():
+                deltas.setdefault(table, []).append(df)
+        removed.append(match_id)
+
+    if (changed or removed) or not tables_exist or not state.get('clean'):
+        # Marca sucia mientras aportes y tablas no coinciden: si se corta, la próxima vez se reconstruye
+        _write_state(processed_dir, clean=False)
+        for match_id, (contribution, source) in changed.items():
+            save_arrays(ROLLUP_STAGE, match_id, _flatten(contribution), source, processed_dir)
+        for match_id in removed:
+            delete_arrays(ROLLUP_STAGE, match_id, processed_dir)
+        updates = state.get('updates', 0) + 1
+        if tables_exist and state.get('clean') and updates < REBUILD_EVERY:
+            base = {table: load_rollup(table, processed_dir) for table in ROLLUP_TABLES}
+            _write_tables(_combine(base, deltas), processed_dir)
+            _write_state(processed_dir, clean=True, matches=len(_applied_matches(processed_dir)),
+                         updates=updates)
+        else:
+            rebuild_rollups(processed_dir)
+    return len(changed), len(removed)
+
+
+def load_rollup(table, processed_dir=None):
+    """Tabla acumulada completa (se relee solo si cambió en disco)"""
+    path = rollups_dir(processed_dir) / f'{table}.parquet'
+    try:
+        version = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _rollups.get(str(path))
+    if cached is None or cached[0] != version:
+        cached = (version, pd.read_parquet(path))
+        _rollups[str(path)] = cached
+    return cached[1]
+
+
+def _scoped(table, competition, season, team_id, processed_dir):
+    df = load_rollup(table, processed_dir)
+    if df is None:
+        return None
+    mask = np.ones(len(df), dtype=bool)
+    if competition is not None:
+        mask &= df['competition'].to_numpy() == competition
+    if season is not None:
+        mask &= df['season'].to_numpy() == str(season)
+    if team_id is not None:
+        mask &= df['team_id'].to_numpy() == str(team_id)
+    return df[mask].copy()
+
+
+def player_leaderboard(competition=None, season=None, team_id=None, sort_by='action_xt', min_passes=0,
+                       top=20, processed_dir=None):
+    """Ranking de jugadores de la temporada con precisión y xT por partido"""
+    df = _scoped('players', competition, season, team_id, processed_dir)
+    if df is None:
+        return None
+    df = df[df['passes'] >= min_passes]
+    df['pass_accuracy'] = np.where(df['passes'] > 0, df['successful_passes'] / df['passes'].clip(lower=1) * 100, 0.0)
+    df['xt_per_match'] = df['xt'] / df['matches']
+    df['action_xt_per_match'] = df['action_xt'] / df['matches']
+    return df.sort_values(sort_by, ascending=False).head(top).reset_index(drop=True)
+
+
+def team_leaderboard(competition=None, season=None, sort_by='action_xt', processed_dir=None):
+    """Ranking de equipos de la temporada"""
+    df = _scoped('teams', competition, season, None, processed_dir)
+    if df is None:
+        return None
+    df['pass_accuracy'] = np.where(df['passes'] > 0, df['successful_passes'] / df['passes'].clip(lower=1) * 100, 0.0)
+    df['action_xt_per_match'] = df['action_xt'] / df['matches']
+    return df.sort_values(sort_by, ascending=False).reset_index(drop=True)
+
+
+def connection_leaderboard(competition=None, season=None, team_id=None, sort_by='passes', top=20,
+                           processed_dir=None):
+    """Ranking de conexiones pasador -> receptor de la temporada"""
+    df = _scoped('connections', competition, season, team_id, processed_dir)
+    if df is None:
+        return None
+    df['xt_per_pass'] = df['xt'] / df['passes'].clip(lower=1)
+    return df.sort_values(sort_by, ascending=False).head(top).reset_index(drop=True)
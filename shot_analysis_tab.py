@@ -0,0 +1,81 @@
+# shot_analysis_tab.py
+# Pestaña de tiros: mapa de tiros y xG por jugador desde los tiros puntuados en la ingesta
+import streamlit as st
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from mplsoccer import VerticalPitch
+
+from ingest import load_stage
+from match_selector import select_match
+from passing_network_tab import scan_data_directories, get_player_short_name
+
+
+def plot_shot_map(shots, mask, team_name, ax):
+    """Mapa de tiros: tamaño = xG, goles resaltados"""
+    pitch = VerticalPitch(pitch_type='custom', pitch_length=105, pitch_width=68, half=True,
+                          line_color='white', pitch_color='#0a3d0a', linewidth=2)
+    pitch.draw(ax=ax)
+    x = shots['shot_x'][mask] * 105 / 100
+    y = shots['shot_y'][mask] * 68 / 100
+    xg = shots['shot_xg'][mask]
+    goal = shots['shot_goal'][mask]
+    sizes = 100 + xg * 1500
+    pitch.scatter(x[~goal], y[~goal], s=sizes[~goal], c='#9aa5b1', edgecolors='white',
+                  alpha=0.7, ax=ax, zorder=2)
+    pitch.scatter(x[goal], y[goal], s=sizes[goal], c='#00d9ff', edgecolors='white',
+                  linewidths=2, marker='football', ax=ax, zorder=3)
+    ax.set_title(f'{team_name} - Shot Map', fontsize=16, weight='bold', color='white', pad=15)
+
+
+def show_shot_analysis_tab():
+    """Muestra la pestaña de análisis de tiros"""
+    st.header("🎯 Shot Analysis")
+    raw_dir = scan_data_directories()['raw_dir']
+    match = select_match(raw_dir, key='shot')
+    if match is None:
+        return
+    with st.spinner('Cargando tiros precalculados...'):
+        events = load_stage(match, 'events', raw_dir)
+        shots = load_stage(match, 'shots', raw_dir)
+    if events is None or shots is None:
+        st.error("❌ No se pudieron cargar los tiros de este partido")
+        return
+
+    team_names = list(events['team_names'])
+    cols = st.columns(len(team_names) * 2)
+    for team, team_name in enumerate(team_names):
+        mask = shots['shot_team'] == team
+        with cols[team * 2]:
+            st.metric(f"{team_name} - Tiros", int(mask.sum()),
+                      delta=f"{int(shots['shot_goal'][mask].sum())} goles", delta_color="off")
+        with cols[team * 2 + 1]:
+            st.metric("xG", f"{shots['shot_xg'][mask].sum():.2f}")
+
+    fig, axes = plt.subplots(1, len(team_names), figsize=(20, 9), facecolor='#0e1117')
+    for team, ax in enumerate(np.atleast_1d(axes)):
+        plot_shot_map(shots, shots['shot_team'] == team, team_names[team], ax)
+    plt.tight_layout()
+    st.pyplot(fig)
+    plt.close()
+
+    st.subheader("📈 xG por jugador")
+    df = pd.DataFrame({
+        'team': shots['shot_team'],
+        'player': shots['shot_player'],
+        'xg': shots['shot_xg'],
+        'goal': shots['shot_goal']
+    })
+    if df.empty:
+        st.warning("⚠️ No hay tiros en este partido")
+        return
+    summary = df.groupby(['team', 'player']).agg(Tiros=('xg', 'size'), Goles=('goal', 'sum'), xG=('xg', 'sum'))
+    summary = summary.reset_index().sort_values('xG', ascending=False)
+    summary['Jugador'] = [get_player_short_name(events['player_names'][p]) if p >= 0 else 'Unknown'
+                          for p in summary['player']]
+    summary['Equipo'] = [team_names[t] for t in summary['team']]
+    summary['Goles'] = summary['Goles'].astype(int)
+    summary['xG'] = summary['xG'].map(lambda v: f"{v:.2f}")
+    table = summary[['Jugador', 'Equipo', 'Tiros', 'Goles', 'xG']].head(15).reset_index(drop=True)
+    table.insert(0, '#', range(1, len(table) + 1))
+    st.dataframe(table, use_container_width=True, hide_index=True)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Generador de partidos sintéticos en formato Stats Perform.
+Crea la estructura <output>/raw/País/Competición/Temporada con JSONs reproducibles
+(misma semilla = mismos partidos) para pruebas de carga y desarrollo sin datos reales.
+Por defecto escribe en data/synthetic, fuera del data/raw que escanean el catálogo y
+la app; nunca escribe en la carpeta de datos reales (FUTBOL_RAW_DIR).
+
+Uso: python synthetic_data.py [--output data/synthetic] --matches 20 --seed 7
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from raw_storage import DEFAULT_RAW_DIR
+
+DEFAULT_SYNTHETIC_DIR = Path(__file__).parent / 'data' / 'synthetic'
+
+TEAM_NAMES = [
+    'Estudiantes', 'Barracas Central', 'River Plate', 'Boca Juniors', 'Racing Club',
+    'Independiente', 'San Lorenzo', 'Huracán', 'Talleres', 'Belgrano',
+    'Lanús', 'Banfield', 'Vélez Sarsfield', 'Rosario Central', "Newell's Old Boys", 'Godoy Cruz'
+]
+FIRST_NAMES = ['Juan', 'Carlos', 'Luis', 'Matías', 'Santiago', 'Nicolás', 'Facundo', 'Lucas', 'Franco', 'Tomás']
+LAST_NAMES = ['González', 'Rodríguez', 'Gómez', 'Fernández', 'López', 'Díaz', 'Martínez', 'Pérez',
+              'Romero', 'Sosa', 'Álvarez', 'Torres', 'Ruiz', 'Ramírez', 'Flores', 'Benítez']
+# Posiciones medias (x, y) de un 4-3-3 atacando hacia x=100
+FORMATION = [(5, 50), (25, 15), (22, 38), (22, 62), (25, 85), (45, 30), (42, 50),
+             (45, 70), (70, 20), (75, 50), (70, 80)]
+
+
+def _make_squad(rng, team_id):
+    """Crea 16 jugadores (11 titulares + 5 suplentes)"""
+    squad = []
+    for i in range(16):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        squad.append({
+            'playerId': f'{team_id}p{i:02d}',
+            'firstName': first,
+            'lastName': last,
+            'matchName': f'{first[0]}. {last}',
+            'shortFirstName': first,
+            'shortLastName': last,
+            'position': 'Goalkeeper' if i == 0 else ('Substitute' if i >= 11 else 'Outfielder'),
+            'shirtNumber': i + 1
+        })
+    return squad
+
+
+def _qualifiers(pairs):
+    return [{'qualifierId': qid, 'value': str(value)} for qid, value in pairs]
+
+
+def generate_match(rng, match_id, home, away, match_date, competition):
+    """Genera un partido completo con posesiones, tiros, cambios y tarjetas"""
+    teams = [home, away]
+    squads = {t['id']: _make_squad(rng, t['id']) for t in teams}
+    on_pitch = {t['id']: list(range(11)) for t in teams}
+    events = []
+    event_id = [1]
+
+    def add(type_id, period, t, team_id, player, x, y, outcome=1, quals=()):
+        minute = int(t // 60)
+        events.append({
+            'id': 100000 + event_id[0],
+            'eventId': event_id[0],
+            'typeId': type_id,
+            'periodId': period,
+            'timeMin': minute,
+            'timeSec': int(t % 60),
+            'contestantId': team_id,
+            'playerId': player['playerId'] if player else None,
+            'playerName': player['matchName'] if player else None,
+            'outcome': outcome,
+            'x': round(min(max(x, 0.0), 100.0), 1),
+            'y': round(min(max(y, 0.0), 100.0), 1),
+            'timeStamp': f"{match_date.isoformat()}T00:00:00.000Z",
+            'qualifier': _qualifiers(quals)
+        })
+        event_id[0] += 1
+        return events[-1]
+
+    subs_done = {t['id']: 0 for t in teams}
+    for period, (start, end) in ((1, (0, 45 * 60)), (2, (45 * 60, 90 * 60))):
+        t = float(start)
+        team_idx = 0 if period == 1 else 1
+        kickoff = True
+        while t < end + rng.randint(60, 240):
+            team = teams[team_idx]
+            tid = team['id']
+            squad = squads[tid]
+            slot = rng.randrange(1, 11)
+            player = squad[on_pitch[tid][slot]]
+            x, y = FORMATION[slot]
+            x += rng.gauss(0, 8)
+            y += rng.gauss(0, 8)
+            if kickoff:
+                x, y = 50.0, 50.0
+            chain_len = max(1, int(rng.expovariate(1 / 5)))
+            for k in range(chain_len):
+                t += rng.uniform(2, 7)
+                quals = [(279, '')] if kickoff and k == 0 else []
+                if rng.random() < 0.05 and x > 40:
+                    add(3, period, t, tid, player, x, y, outcome=int(rng.random() < 0.5))
+                    x += rng.uniform(2, 8)
+                next_slot = rng.randrange(1, 11)
+                nx, ny = FORMATION[next_slot]
+                nx = min(nx + rng.gauss(8, 10), 99)
+                ny = ny + rng.gauss(0, 10)
+                if rng.random() < 0.1:
+                    quals.append((1, ''))
+                if ny < 20 or ny > 80:
+                    if x > 70 and rng.random() < 0.3:
+                        quals.append((2, ''))
+                ok = rng.random() < (0.9 - 0.3 * (x > 70))
+                add(1, period, t, tid, player, x, y, outcome=int(ok),
+                    quals=quals + [(140, round(min(max(nx, 0), 100), 1)), (141, round(min(max(ny, 0), 100), 1))])
+                if not ok:
+                    break
+                next_player = squad[on_pitch[tid][next_slot]]
+                if rng.random() < 0.4:
+                    t += rng.uniform(1, 5)
+                    cx, cy = nx + rng.uniform(0, 12), ny + rng.gauss(0, 4)
+                    player, x, y = next_player, min(cx, 99), cy
+                else:
+                    player, x, y = next_player, nx, ny
+            else:
+                if x > 65 and rng.random() < 0.35:
+                    t += rng.uniform(1, 4)
+                    sx, sy = rng.uniform(75, 98), rng.gauss(50, 12)
+                    shot_quals = [(rng.choice((20, 72, 15)), ''), (rng.choice((22, 22, 22, 23, 24)), '')]
+                    if rng.random() < 0.15:
+                        shot_quals.append((214, ''))
+                    if rng.random() < 0.6:
+                        shot_quals.append((29, ''))
+                    dist = ((100 - sx) ** 2 + (50 - sy) ** 2) ** 0.5
+                    p_goal = max(0.02, 0.45 - dist / 40)
+                    roll = rng.random()
+                    if roll < p_goal:
+                        shot_type = 16
+                    elif roll < p_goal + 0.3:
+                        shot_type = 15
+                    elif roll < p_goal + 0.35:
+                        shot_type = 14
+                    else:
+                        shot_type = 13
+                    add(shot_type, period, t, tid, player, sx, sy, quals=shot_quals)
+                    if shot_type != 16:
+                        add(5, period, t + 1, tid, None, 100, sy, outcome=0)
+                    team_idx = 1 - team_idx
+                    kickoff = shot_type == 16
+                    continue
+            kickoff = False
+            # Recuperación del rival
+            t += rng.uniform(1, 4)
+            opp = teams[1 - team_idx]
+            oid = opp['id']
+            oslot = rng.randrange(1, 11)
+            defender = squads[oid][on_pitch[oid][oslot]]
+            dx, dy = 100 - x, 100 - y
+            roll = rng.random()
+            if roll < 0.3:
+                add(7, period, t, oid, defender, dx, dy)
+            elif roll < 0.55:
+                add(8, period, t, oid, defender, dx, dy)
+            elif roll < 0.8:
+                add(49, period, t, oid, defender, dx, dy)
+            elif roll < 0.9:
+                add(4, period, t, tid, player, x, y, outcome=0)
+                add(4, period, t, oid, defender, dx, dy, outcome=1)
+                if rng.random() < 0.15:
+                    add(17, period, t + 5, oid, defender, dx, dy, quals=[(31 if rng.random() < 0.9 else 33, '')])
+            else:
+                add(5, period, t, tid, None, x, 0, outcome=0)
+            team_idx = 1 - team_idx
+            # Cambios en el segundo tiempo
+            if period == 2 and t > 55 * 60:
+                for team_ in teams:
+                    sid = team_['id']
+                    if subs_done[sid] < 5 and rng.random() < 0.01:
+                        off_slot = rng.randrange(1, 11)
+                        off_player = squads[sid][on_pitch[sid][off_slot]]
+                        on_index = 11 + subs_done[sid]
+                        add(18, period, t, sid, off_player, 0, 0)
+                        add(19, period, t, sid, squads[sid][on_index], 0, 0)
+                        on_pitch[sid][off_slot] = on_index
+                        subs_done[sid] += 1
+
+    lineups = []
+    for team in teams:
+        lineups.append({
+            'contestantId': team['id'],
+            'formationUsed': '433',
+            'player': squads[team['id']]
+        })
+    return {
+        'matchInfo': {
+            'id': match_id,
+            'description': f"{home['name']} vs {away['name']}",
+            'localDate': match_date.isoformat(),
+            'localTime': '18:30:00',
+            'week': '',
+            'competition': {'name': competition['name'], 'competitionCode': competition['code']},
+            'stage': {'name': 'Fase Regular'},
+            'contestant': [
+                {'id': home['id'], 'name': home['name'], 'position': 'home'},
+                {'id': away['id'], 'name': away['name'], 'position': 'away'}
+            ]
+        },
+        'liveData': {
+            'event': events,
+            'lineup': lineups
+        }
+    }
+
+
+def generate_archive(output_dir, n_matches=20, seed=7, country='Argentina',
+                     competition='Liga_Profesional', season='2025'):
+    """Escribe n_matches partidos sintéticos en output_dir/raw/País/Competición/Temporada"""
+    rng = random.Random(seed)
+    season_dir = Path(output_dir) / 'raw' / country / competition / season
+    season_dir.mkdir(parents=True, exist_ok=True)
+    teams = [{'id': f't{i:02d}', 'name': name} for i, name in enumerate(TEAM_NAMES)]
+    comp = {'name': competition.replace('_', ' ') + f' {country}', 'code': competition[:3].upper()}
+    start = date(int(season) if season.isdigit() else 2025, 2, 1)
+    paths = []
+    for i in range(n_matches):
+        home, away = rng.sample(teams, 2)
+        match_id = f'synth{seed:03d}{i:05d}'
+        match = generate_match(rng, match_id, home, away, start + timedelta(days=3 * i), comp)
+        path = season_dir / f'{match_id}.json'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(match, f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera partidos sintéticos Stats Perform')
+    parser.add_argument('--output', default=str(DEFAULT_SYNTHETIC_DIR), help='Carpeta de destino (contendrá raw/)')
+    parser.add_argument('--matches', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--country', default='Argentina')
+    parser.add_argument('--competition', default='Liga_Profesional')
+    parser.add_argument('--season', default='2025')
+    args = parser.parse_args()
+    if (Path(args.output) / 'raw').resolve() == Path(DEFAULT_RAW_DIR).resolve():
+        print(f"❌ {Path(args.output) / 'raw'} es la carpeta de datos reales: elige otra --output")
+        sys.exit(1)
+    paths = generate_archive(args.output, args.matches, args.seed, args.country, args.competition, args.season)
+    print(f"✅ {len(paths)} partidos sintéticos generados en {Path(args.output) / 'raw'}")
+
+
+if __name__ == "__main__":
+    main()
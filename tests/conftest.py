@@ -0,0 +1,21 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_metadata import match_metadata  # noqa: E402
+from synthetic_data import generate_archive  # noqa: E402
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Tres partidos sintéticos en tmp_path/raw con su catálogo y un data/processed vacío"""
+    paths = generate_archive(tmp_path, n_matches=3, seed=11)
+    raw_dir = tmp_path / 'raw'
+    catalog = [match_metadata(path, raw_dir) for path in paths]
+    with open(raw_dir / 'matches_metadata.json', 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False)
+    return {'raw_dir': raw_dir, 'processed_dir': tmp_path / 'processed', 'catalog': catalog, 'paths': paths}
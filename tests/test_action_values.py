@@ -0,0 +1,30 @@
+import numpy as np
+
+from action_values import ACTION_KINDS
+from ingest import load_stage
+from match_events import OFFSIDE_PASS
+from xt_calculator import get_xt_values
+
+
+def test_action_values_follow_xt_grid(archive):
+    match, raw_dir, processed_dir = archive['catalog'][0], archive['raw_dir'], archive['processed_dir']
+    events = load_stage(match, 'events', raw_dir, processed_dir)
+    values = load_stage(match, 'action_values', raw_dir, processed_dir)
+    kind, value = values['action_kind'], values['action_xt'].astype(float)
+    assert len(kind) == len(events['type_id'])
+    start = get_xt_values(np.nan_to_num(events['x']), np.nan_to_num(events['y']))
+
+    moves = np.isin(kind, (ACTION_KINDS.index('pass'), ACTION_KINDS.index('cross')))
+    failed = moves & (~events['outcome'] | (events['type_id'] == OFFSIDE_PASS))
+    done = moves & ~failed & ~np.isnan(events['end_x'])
+    assert done.any() and failed.any()
+    end = get_xt_values(events['end_x'][done], events['end_y'][done])
+    assert np.allclose(value[done], end - start[done], atol=1e-6)
+    assert np.allclose(value[failed], -start[failed], atol=1e-6)
+
+    recovery = kind == ACTION_KINDS.index('recovery')
+    loss = kind == ACTION_KINDS.index('loss')
+    assert np.allclose(value[recovery], start[recovery], atol=1e-6)
+    assert np.allclose(value[loss], -start[loss], atol=1e-6)
+    assert np.all(value[kind == 0] == 0)
+
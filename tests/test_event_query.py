@@ -0,0 +1,32 @@
+import numpy as np
+import pyarrow.parquet as pq
+
+from event_query import materialize_event_table
+from ingest import ingest_match
+from match_stats import tables_dir
+from processed_store import load_arrays
+from raw_storage import match_key
+
+
+def test_event_table_zero_fills_missing_action_values(archive, capsys):
+    full, events_only, missing = archive['catalog']
+    processed_dir = archive['processed_dir']
+    ingest_match(archive['paths'][0], match_key(full), processed_dir)
+    ingest_match(archive['paths'][1], match_key(events_only), processed_dir, stages=['events'])
+    assert load_arrays('action_values', match_key(events_only), processed_dir) is None
+
+    rows = materialize_event_table(archive['catalog'], processed_dir)
+    table = pq.read_table(tables_dir(processed_dir) / 'events.parquet').to_pandas()
+    assert rows == len(table)
+    assert set(table['match_id']) == {match_key(full), match_key(events_only)}
+    counts = table.groupby('match_id').size()
+    for match in (full, events_only):
+        events = load_arrays('events', match_key(match), processed_dir)
+        assert counts[match_key(match)] == len(events['type_id'])
+
+    zero_filled = table[table['match_id'] == match_key(events_only)]
+    assert (zero_filled['action_xt'] == 0).all() and (zero_filled['action_kind'] == 0).all()
+    values = load_arrays('action_values', match_key(full), processed_dir)
+    valued = table[table['match_id'] == match_key(full)].sort_values('event_index')
+    assert np.allclose(valued['action_xt'].to_numpy(), values['action_xt'])
+    assert '1 partidos sin eventos procesados' in capsys.readouterr().out
@@ -0,0 +1,53 @@
+import json
+import os
+
+import numpy as np
+
+import ingest
+from ingest import STAGES, ingest_match, load_stage, stage_identity, events_identity
+from processed_store import is_fresh, load_arrays
+from raw_storage import match_key
+
+
+def _truncate_events(path, n_removed):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['liveData']['event'] = data['liveData']['event'][:-n_removed]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    # mtime distinto aunque la escritura caiga en el mismo tick del reloj
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_dependent_stage_recomputed_after_raw_change(archive):
+    match, path = archive['catalog'][0], archive['paths'][0]
+    raw_dir, processed_dir = archive['raw_dir'], archive['processed_dir']
+    ingest_match(path, match_key(match), processed_dir)
+
+    _truncate_events(path, 300)
+    carries = load_stage(match, 'carries', raw_dir, processed_dir)
+    events = load_arrays('events', match_key(match), processed_dir)
+    n = len(events['type_id'])
+    assert carries['carry_end_event'].max(initial=0) < n
+    # La dependencia (chains) también se recalculó para la nueva versión del JSON
+    chains = load_arrays('chains', match_key(match), processed_dir)
+    assert len(chains['chain_id']) == n
+    assert is_fresh('chains', match_key(match), stage_identity(events_identity(path), 'chains'), processed_dir)
+
+
+def test_dependency_version_bump_invalidates_dependents(archive, monkeypatch):
+    match, path = archive['catalog'][0], archive['paths'][0]
+    processed_dir = archive['processed_dir']
+    ingest_match(path, match_key(match), processed_dir)
+    assert ingest_match(path, match_key(match), processed_dir) == []
+
+    bumped = [(name, func, 99 if name == 'chains' else version) for name, func, version in STAGES]
+    monkeypatch.setattr(ingest, 'STAGES', bumped)
+    updated = ingest_match(path, match_key(match), processed_dir, stages=['carries'])
+    assert set(updated) >= {'chains', 'carries'}
+    # Las demás dependientes de chains quedan viejas hasta que se ingieran
+    for name in ('action_values', 'timeline'):
+        assert not is_fresh(name, match_key(match), stage_identity(events_identity(path), name), processed_dir)
+    assert np.array_equal(load_arrays('carries', match_key(match), processed_dir)['carry_end_event'],
+                          load_stage(match, 'carries', archive['raw_dir'], processed_dir)['carry_end_event'])
@@ -0,0 +1,65 @@
+import json
+
+from live_feed import FeedTail, list_live_feeds
+
+
+def test_malformed_ndjson_line_is_skipped(tmp_path):
+    feed_path = tmp_path / 'partido.ndjson'
+    feed_path.write_text('{"typeId": 1, "id": 1}\n{"typeId": 1, "id":\n{"typeId": 1, "id": 2}\n',
+                         encoding='utf-8')
+    feed = FeedTail(feed_path)
+    events, _ = feed.poll()
+    assert [e['id'] for e in events] == [1, 2]
+    assert feed.error is not None and feed.skipped == 1
+
+    # Lo que llega después se sigue leyendo: la línea rota no congela el feed
+    with open(feed_path, 'a', encoding='utf-8') as f:
+        f.write('{"typeId": 1, "id": 3}\n')
+    events, reset = feed.poll()
+    assert not reset
+    assert [e['id'] for e in events] == [3]
+    assert feed.error is None and feed.skipped == 1
+
+
+def test_incomplete_ndjson_line_is_retried(tmp_path):
+    feed_path = tmp_path / 'partido.ndjson'
+    feed_path.write_text('{"typeId": 1, "id": 1}\n{"typeId": 1, "id"', encoding='utf-8')
+    feed = FeedTail(feed_path)
+    events, _ = feed.poll()
+    assert [e['id'] for e in events] == [1]
+
+    with open(feed_path, 'a', encoding='utf-8') as f:
+        f.write(': 2}\n')
+    events, _ = feed.poll()
+    assert [e['id'] for e in events] == [2]
+    assert feed.error is None and feed.skipped == 0
+
+
+def test_partially_rewritten_json_keeps_previous_state(tmp_path):
+    feed_path = tmp_path / 'partido.json'
+    data = {'matchInfo': {'id': 'm1'}, 'liveData': {'event': [{'typeId': 1, 'id': 1}]}}
+    feed_path.write_text(json.dumps(data), encoding='utf-8')
+    feed = FeedTail(feed_path)
+    events, _ = feed.poll()
+    assert len(events) == 1
+
+    feed_path.write_text(json.dumps(data)[:-10], encoding='utf-8')
+    events, reset = feed.poll()
+    assert events == [] and not reset
+    assert feed.error is not None and feed.match_info == {'id': 'm1'}
+
+    data['liveData']['event'].append({'typeId': 1, 'id': 2})
+    feed_path.write_text(json.dumps(data), encoding='utf-8')
+    events, _ = feed.poll()
+    assert [e['id'] for e in events] == [2]
+    assert feed.error is None
+
+
+def test_live_feeds_limited_to_live_dir(tmp_path):
+    (tmp_path / 'a.ndjson').write_text('', encoding='utf-8')
+    (tmp_path / 'b.json').write_text('{}', encoding='utf-8')
+    (tmp_path / 'notas.txt').write_text('', encoding='utf-8')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'c.ndjson').write_text('', encoding='utf-8')
+    assert [p.name for p in list_live_feeds(tmp_path)] == ['a.ndjson', 'b.json']
+    assert list_live_feeds(tmp_path / 'no_existe') == []
@@ -0,0 +1,61 @@
+import copy
+
+import numpy as np
+
+from match_events import GOAL, Q_OWN_GOAL, Q_PASS_END_X, Q_PASS_END_Y, SHOT_TYPES, normalize_events
+from raw_storage import load_json
+
+
+def _mirror(data, team_id, period):
+    """Invierte las coordenadas crudas de un equipo en un período (como cuando ataca hacia x=0)"""
+    data = copy.deepcopy(data)
+    for event in data['liveData']['event']:
+        if event.get('contestantId') != team_id or event.get('periodId') != period:
+            continue
+        for key in ('x', 'y'):
+            if key in event:
+                event[key] = 100 - float(event[key])
+        for qualifier in event.get('qualifier', []):
+            if qualifier['qualifierId'] in (Q_PASS_END_X, Q_PASS_END_Y) and qualifier.get('value') not in ('', None):
+                qualifier['value'] = str(100 - float(qualifier['value']))
+    return data
+
+
+def test_direction_normalized_per_team_and_period(archive):
+    data = load_json(archive['paths'][0])
+    reference = normalize_events({'format': 'stats_perform', 'data': data})
+    team_id = data['matchInfo']['contestant'][1]['id']
+    mirrored = normalize_events({'format': 'stats_perform', 'data': _mirror(data, team_id, 2)})
+
+    team = list(mirrored['team_ids']).index(team_id)
+    assert mirrored['direction_flipped'][team, 2] and not reference['direction_flipped'][team, 2]
+    for key in ('x', 'y', 'end_x', 'end_y'):
+        assert np.allclose(mirrored[key], reference[key], equal_nan=True)
+    # Canónico: los tiros de cada equipo y período quedan en campo rival
+    shots = np.isin(mirrored['type_id'], SHOT_TYPES)
+    for t in range(2):
+        for period in (1, 2):
+            group = shots & (mirrored['team'] == t) & (mirrored['period'] == period)
+            if group.any():
+                assert np.median(mirrored['x'][group]) > 50
+
+
+def test_own_goals_do_not_flip_direction(archive):
+    data = load_json(archive['paths'][0])
+    reference = normalize_events({'format': 'stats_perform', 'data': data})
+    team_id = data['matchInfo']['contestant'][1]['id']
+    shots = [e for e in data['liveData']['event']
+             if e.get('contestantId') == team_id and e.get('periodId') == 2 and e['typeId'] in SHOT_TYPES]
+    assert shots
+
+    # Más goles en contra (junto al arco propio) que tiros: sin filtrarlos, la mediana cae bajo 50
+    own_goals = []
+    for i in range(len(shots) + 1):
+        own_goal = copy.deepcopy(shots[0])
+        own_goal.update({'typeId': GOAL, 'eventId': 90000 + i, 'x': 3.0, 'y': 50.0,
+                         'qualifier': [{'qualifierId': Q_OWN_GOAL}]})
+        own_goals.append(own_goal)
+    data = copy.deepcopy(data)
+    data['liveData']['event'].extend(own_goals)
+    with_own_goals = normalize_events({'format': 'stats_perform', 'data': data})
+    assert np.array_equal(with_own_goals['direction_flipped'], reference['direction_flipped'])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from ingest import load_stage
+from network_analytics import infer_receivers, network_metrics
+
+nx = pytest.importorskip('networkx')
+
+
+def test_network_metrics_match_networkx(archive):
+    network = load_stage(archive['catalog'][0], 'network', archive['raw_dir'], archive['processed_dir'])
+    counts = np.asarray(network['net_counts'], dtype=float)
+    metrics = network_metrics(counts, network['net_xt_flow'])
+    for b, A in enumerate(counts):
+        active = np.flatnonzero(A.sum(axis=0) + A.sum(axis=1) > 0)
+        G = nx.DiGraph()
+        G.add_nodes_from(active.tolist())
+        for i, j in zip(*np.nonzero(A)):
+            G.add_edge(i, j, weight=A[i, j], distance=1 / A[i, j])
+        W = A + A.T
+        U = nx.Graph()
+        U.add_nodes_from(active.tolist())
+        for i, j in zip(*np.nonzero(np.triu(W, 1))):
+            U.add_edge(i, j, weight=W[i, j])
+
+        pagerank = nx.pagerank(G, weight='weight', tol=1e-12, max_iter=1000)
+        betweenness = nx.betweenness_centrality(G, weight='distance', normalized=True)
+        clustering = nx.clustering(U, weight='weight')
+        for n in active:
+            assert metrics['pagerank'][b, n] == pytest.approx(pagerank[n], abs=1e-8)
+            assert metrics['betweenness'][b, n] == pytest.approx(betweenness[n], abs=1e-9)
+            assert metrics['clustering'][b, n] == pytest.approx(clustering[n], abs=1e-9)
+            assert metrics['degree'][b, n] == len(set(G.successors(n)) | set(G.predecessors(n)))
+        eigenvector = nx.eigenvector_centrality_numpy(U, weight='weight')
+        expected = np.array([eigenvector[n] for n in active])
+        got = metrics['eigenvector'][b, active]
+        assert np.allclose(got / np.linalg.norm(got), expected / np.linalg.norm(expected), atol=1e-6)
+
+
+def test_infer_receivers_matches_loop():
+    rng = np.random.default_rng(3)
+    pos_x, pos_y = rng.uniform(0, 100, 11), rng.uniform(0, 100, 11)
+    passer = rng.integers(0, 11, 200)
+    end_x, end_y = rng.uniform(0, 100, 200), rng.uniform(0, 100, 200)
+    receiver, close = infer_receivers(passer, pos_x, pos_y, end_x, end_y)
+    for k in range(200):
+        best, best_distance = None, np.inf
+        for p in range(11):
+            distance = np.hypot(pos_x[p] - end_x[k], pos_y[p] - end_y[k])
+            if p != passer[k] and distance < best_distance:
+                best, best_distance = p, distance
+        assert receiver[k] == best
+        assert close[k] == (best_distance < 25)
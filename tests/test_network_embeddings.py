@@ -0,0 +1,26 @@
+import numpy as np
+
+from ingest import ingest_match
+from network_embeddings import embeddings_dir, load_embedding_index, materialize_embedding_index, similar_networks
+from raw_storage import match_key
+
+
+def test_embedding_index_rows_travel_with_matrix(archive):
+    processed_dir, catalog = archive['processed_dir'], archive['catalog']
+    for path, match in zip(archive['paths'], catalog):
+        ingest_match(path, match_key(match), processed_dir)
+    assert materialize_embedding_index(catalog, processed_dir) == 6
+    index = load_embedding_index(processed_dir)
+    assert index['matrix'].shape[0] == len(index['rows']) == 6
+    row = index['rows'][0]
+    similar = similar_networks(row['match_id'], row['team_id'], k=3, processed_dir=processed_dir)
+    assert len(similar) == 3 and all(r['match_id'] != row['match_id'] for r in similar)
+
+    # Matriz y filas que no coinciden: el índice se ignora en lugar de devolver filas cruzadas
+    path = embeddings_dir(processed_dir) / 'index.npz'
+    with np.load(path) as npz:
+        arrays = dict(npz)
+    arrays['matrix'] = arrays['matrix'][:4]
+    np.savez(path, **arrays)
+    assert load_embedding_index(processed_dir) is None
+    assert similar_networks(row['match_id'], row['team_id'], processed_dir=processed_dir) == []
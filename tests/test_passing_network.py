@@ -0,0 +1,14 @@
+import numpy as np
+
+from ingest import load_stage
+from match_events import PASS
+from pass_network import extract_passes_from_events
+
+
+def test_second_half_minute_filter_uses_absolute_minutes(archive):
+    events = load_stage(archive['catalog'][0], 'events', archive['raw_dir'], archive['processed_dir'])
+    passes = extract_passes_from_events(events, 0, period=2, time_range=(60, 75))
+    expected = ((events['type_id'] == PASS) & (events['team'] == 0) & (events['period'] == 2)
+                & (events['minute'] >= 60) & (events['minute'] <= 75))
+    assert len(passes['x']) == int(expected.sum()) > 0
+    assert np.all(passes['period'] == 2)
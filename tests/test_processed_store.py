@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from processed_store import ALIGNMENT, _read_header, is_fresh, load_arrays, save_arrays, stage_path, stage_source
+
+
+def test_store_round_trip(tmp_path):
+    arrays = {
+        'x': np.linspace(0, 100, 7, dtype=np.float32),
+        'ids': np.array(['a', 'bb', 'ccc']),
+        'flags': np.array([True, False, True]),
+        'grid': np.arange(24, dtype=np.int64).reshape(2, 3, 4),
+        'empty': np.zeros(0, dtype=np.int16),
+    }
+    save_arrays('events', 'm1', arrays, source='10:20', processed_dir=tmp_path)
+    loaded = load_arrays('events', 'm1', tmp_path)
+    assert list(loaded) == list(arrays)
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype and loaded[name].shape == array.shape
+        assert np.array_equal(loaded[name], array)
+    # Vistas de solo lectura sobre el archivo mapeado
+    assert not loaded['x'].flags.writeable
+    assert stage_source('events', 'm1', tmp_path) == '10:20'
+    assert is_fresh('events', 'm1', '10:20', tmp_path) and not is_fresh('events', 'm1', '10:21', tmp_path)
+    assert list(load_arrays('events', 'm1', tmp_path, keys=('ids',))) == ['ids']
+
+    with open(stage_path('events', 'm1', tmp_path), 'rb') as f:
+        header, data_start = _read_header(f)
+    assert data_start % ALIGNMENT == 0
+    assert all(field['offset'] % ALIGNMENT == 0 for field in header['fields'].values())
+
+
+def test_store_overwrite_and_missing(tmp_path):
+    assert load_arrays('events', 'm1', tmp_path) is None
+    assert stage_source('events', 'm1', tmp_path) is None
+    save_arrays('events', 'm1', {'x': np.arange(3)}, source='a', processed_dir=tmp_path)
+    first = load_arrays('events', 'm1', tmp_path)['x']
+    save_arrays('events', 'm1', {'x': np.arange(5)}, source='b', processed_dir=tmp_path)
+    assert np.array_equal(load_arrays('events', 'm1', tmp_path)['x'], np.arange(5))
+    # Las vistas entregadas antes del reemplazo siguen siendo válidas
+    assert np.array_equal(first, np.arange(3))
+    assert not list(stage_path('events', 'm1', tmp_path).parent.glob('*.tmp'))
+    with pytest.raises(TypeError):
+        save_arrays('events', 'm2', {'x': np.array([{}, None])}, processed_dir=tmp_path)
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pandas as pd
+
+import season_rollups
+from ingest import ingest_match
+from raw_storage import match_key
+from season_rollups import ROLLUP_TABLES, load_rollup, rebuild_rollups, rollups_dir, update_rollups
+
+
+def _ingest(archive):
+    for path, match in zip(archive['paths'], archive['catalog']):
+        ingest_match(path, match_key(match), archive['processed_dir'])
+
+
+def _tables(processed_dir):
+    tables = {}
+    for table, (keys, _) in ROLLUP_TABLES.items():
+        tables[table] = load_rollup(table, processed_dir).sort_values(keys).reset_index(drop=True)
+    return tables
+
+
+def _state(processed_dir):
+    with open(rollups_dir(processed_dir) / 'state.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_incremental_updates_match_full_rebuild(archive):
+    processed_dir, catalog = archive['processed_dir'], archive['catalog']
+    _ingest(archive)
+    assert update_rollups(catalog, processed_dir) == (3, 0)
+
+    # Sale un partido, vuelve, y otro se reingiere con menos eventos
+    assert update_rollups(catalog[:2], processed_dir) == (0, 1)
+    assert update_rollups(catalog, processed_dir) == (1, 0)
+    path = archive['paths'][0]
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['liveData']['event'] = data['liveData']['event'][:-200]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    ingest_match(path, match_key(catalog[0]), processed_dir)
+    assert update_rollups(catalog, processed_dir) == (1, 0)
+    assert _state(processed_dir)['updates'] == 3
+
+    incremental = _tables(processed_dir)
+    rebuild_rollups(processed_dir)
+    rebuilt = _tables(processed_dir)
+    for table in ROLLUP_TABLES:
+        pd.testing.assert_frame_equal(incremental[table], rebuilt[table], check_exact=True)
+
+
+def test_periodic_rebuild_from_contributions(archive, monkeypatch):
+    processed_dir, catalog = archive['processed_dir'], archive['catalog']
+    _ingest(archive)
+    monkeypatch.setattr(season_rollups, 'REBUILD_EVERY', 2)
+    update_rollups(catalog, processed_dir)
+    update_rollups(catalog[:2], processed_dir)
+    assert _state(processed_dir)['updates'] == 1
+    update_rollups(catalog, processed_dir)
+    assert _state(processed_dir) == {'clean': True, 'matches': 3, 'updates': 0}
@@ -0,0 +1,58 @@
+import numpy as np
+
+from ingest import ingest_match
+from match_timeline import load_timeline_index, materialize_timelines, sum_timelines, timelines_dir
+from processed_store import StackedWriter, delete_arrays
+from raw_storage import match_key
+from zone_heatmaps import heatmaps_dir, materialize_heatmaps, sum_heatmaps
+
+
+def test_stacked_writer_trims_to_written_rows(tmp_path):
+    writer = StackedWriter(tmp_path, capacity=10)
+    rows = [np.full((2, 3), i, dtype=np.float32) for i in range(4)]
+    for row in rows:
+        writer.append({'a': row, 'b': row[0].astype(np.uint16)})
+    assert writer.commit() == {'a': [4, 2, 3], 'b': [4, 3]}
+    assert np.array_equal(np.load(tmp_path / 'a.npy'), np.stack(rows))
+    assert np.load(tmp_path / 'b.npy').dtype == np.uint16
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.npy', 'b.npy']
+
+
+def test_materialized_heatmaps_skip_missing_matches(archive):
+    processed_dir = archive['processed_dir']
+    for path, match in zip(archive['paths'], archive['catalog']):
+        ingest_match(path, match_key(match), processed_dir)
+    delete_arrays('heatmaps', match_key(archive['catalog'][1]), processed_dir)
+    assert materialize_heatmaps(archive['catalog'], processed_dir) == 4
+    stacked = np.load(heatmaps_dir(processed_dir) / 'counts_xt.npy')
+    assert stacked.shape[0] == 4 and stacked.sum() > 0
+    assert not list(heatmaps_dir(processed_dir).glob('*.tmp'))
+
+
+def test_heatmap_sum_ignores_tensor_that_does_not_match_index(archive):
+    processed_dir = archive['processed_dir']
+    for path, match in zip(archive['paths'], archive['catalog']):
+        ingest_match(path, match_key(match), processed_dir)
+    materialize_heatmaps(archive['catalog'], processed_dir)
+    total, matches = sum_heatmaps('counts', 'xt', processed_dir=processed_dir)
+    assert matches == 6 and total.sum() > 0
+
+    # .npy ya reemplazado con otra cantidad de filas y el índice todavía anterior
+    path = heatmaps_dir(processed_dir) / 'counts_xt.npy'
+    np.save(path, np.load(path)[:2])
+    assert sum_heatmaps('counts', 'xt', processed_dir=processed_dir)[1] == 0
+
+
+def test_timeline_sum_ignores_series_that_does_not_match_index(archive):
+    processed_dir = archive['processed_dir']
+    for path, match in zip(archive['paths'], archive['catalog']):
+        ingest_match(path, match_key(match), processed_dir)
+    assert materialize_timelines(archive['catalog'], processed_dir) == 6
+    index = load_timeline_index(processed_dir)
+    team = index[0]['team_name']
+    total, matches = sum_timelines('passes', team_name=team, processed_dir=processed_dir)
+    assert matches == sum(row['team_name'] == team for row in index) and total.sum() > 0
+
+    path = timelines_dir(processed_dir) / 'passes.npy'
+    np.save(path, np.load(path)[:, :2])
+    assert sum_timelines('passes', team_name=team, processed_dir=processed_dir)[1] == 0
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Modelo de Expected Goals (xG) liviano: regresión logística en NumPy.
+Extrae los tiros y sus qualifiers (parte del cuerpo, tipo de asistencia,
+gran ocasión, jugada) a una matriz de features en una sola pasada vectorizada,
+entrena con el corpus local y puntúa en bloque durante la ingesta.
+
+Uso: python xg_model.py --train [--workers 2]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from archive_pipeline import PIPELINE_MEMORY_MB, ArchivePipeline
+from match_events import PASS, SHOT_TYPES, GOAL, Q_OWN_GOAL, has_qualifier, qualifier_value
+
+DEFAULT_MODEL_PATH = Path(os.environ.get(
+    'FUTBOL_XG_MODEL', Path(__file__).parent / 'data' / 'models' / 'xg_model.json'))
+
+# Pase filtrado (qualifier del pase) y evento relacionado (en el tiro: eventId de la asistencia)
+Q_THROUGH_BALL = 4
+Q_RELATED_EVENT = 55
+
+# (nombre, qualifiers Opta del tiro) de las features binarias; None = se lee en el pase asistente
+QUALIFIER_FEATURES = [
+    ('header', (15,)),
+    ('left_foot', (72,)),
+    ('other_body_part', (21,)),
+    ('big_chance', (214,)),
+    ('assisted', (29,)),
+    ('through_ball_assist', None),
+    ('fast_break', (23,)),
+    ('set_piece', (24,)),
+    ('from_corner', (25,)),
+    ('direct_free_kick', (26,)),
+    ('penalty', (9,)),
+]
+FEATURE_NAMES = ['distance', 'angle'] + [name for name, _ in QUALIFIER_FEATURES]
+
+# Coeficientes por defecto (aprox. de modelos públicos) cuando aún no hay modelo entrenado
+DEFAULT_MODEL = {
+    'features': FEATURE_NAMES,
+    'intercept': -1.0,
+    'coef': [-0.10, 1.2, -0.9, 0.0, -0.4, 1.3, 0.1, 0.3, 0.3, -0.2, -0.3, 0.2, 2.6],
+    'mean': [0.0] * len(FEATURE_NAMES),
+    'std': [1.0] * len(FEATURE_NAMES),
+    'trained_on': 0
+}
+
+GOAL_WIDTH_M = 7.32
+PITCH_LENGTH = 105.0
+PITCH_WIDTH = 68.0
+
+
+def through_ball_assists(events, shot_idx):
+    """Máscara por tiro: la asistencia (qualifier 55 del tiro) fue un pase filtrado"""
+    through = np.flatnonzero((events['type_id'] == PASS) & has_qualifier(events, Q_THROUGH_BALL))
+    related = qualifier_value(events, Q_RELATED_EVENT)[shot_idx]
+    linked = ~np.isnan(related)
+    # Los eventId de Opta son correlativos por equipo: la clave es (equipo, eventId)
+    pass_keys = events['team'][through].astype(np.int64) << 32 | events['event_id'][through]
+    shot_keys = events['team'][shot_idx].astype(np.int64) << 32 | np.where(linked, related, 0).astype(np.int64)
+    return linked & np.isin(shot_keys, pass_keys)
+
+
+def extract_shot_features(events):
+    """Devuelve (índices de tiro, matriz de features float32, goles bool).
+
+    Los goles en contra (qualifier 28) no son tiros del equipo que los registra.
+    """
+    shot_idx = np.flatnonzero(np.isin(events['type_id'], SHOT_TYPES) & ~has_qualifier(events, Q_OWN_GOAL))
+    dx = (100 - events['x'][shot_idx]) * PITCH_LENGTH / 100
+    dy = (50 - events['y'][shot_idx]) * PITCH_WIDTH / 100
+    distance = np.hypot(dx, dy)
+    # Ángulo visible del arco desde la posición del tiro
+    half = GOAL_WIDTH_M / 2
+    angle = np.abs(np.arctan2(dy + half, dx) - np.arctan2(dy - half, dx))
+    columns = [distance, angle]
+    for _, qualifiers in QUALIFIER_FEATURES:
+        if qualifiers is None:
+            columns.append(through_ball_assists(events, shot_idx))
+        else:
+            columns.append(has_qualifier(events, qualifiers)[shot_idx])
+    features = np.column_stack(columns).astype(np.float32) if len(shot_idx) else \
+        np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+    goals = events['type_id'][shot_idx] == GOAL
+    return shot_idx, features, goals
+
+
+def predict_xg(features, model=None):
+    """Probabilidad de gol de cada fila de la matriz de features"""
+    model = model or load_model()
+    if len(features) == 0:
+        return np.zeros(0, dtype=np.float32)
+    z = (features - np.asarray(model['mean'])) / np.asarray(model['std'])
+    logits = model['intercept'] + z @ np.asarray(model['coef'])
+    return (1 / (1 + np.exp(-logits))).astype(np.float32)
+
+
+def fit_logistic(features, goals, l2=1.0, iterations=50):
+    """Regresión logística con regularización L2 (Newton-Raphson / IRLS)"""
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    std[std == 0] = 1.0
+    X = np.column_stack([np.ones(len(features)), (features - mean) / std])
+    y = goals.astype(float)
+    w = np.zeros(X.shape[1])
+    penalty = np.full(X.shape[1], l2)
+    penalty[0] = 0.0
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-(X @ w)))
+        gradient = X.T @ (p - y) + penalty * w
+        hessian = (X.T * (p * (1 - p))) @ X + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < 1e-6:
+            break
+    return {
+        'features': FEATURE_NAMES,
+        'intercept': float(w[0]),
+        'coef': w[1:].tolist(),
+        'mean': mean.tolist(),
+        'std': std.tolist(),
+        'trained_on': int(len(features))
+    }
+
+
+_MODEL_CACHE = {}
+
+
+def load_model(path=None):
+    """Carga el modelo entrenado (o el modelo por defecto si no existe)"""
+    path = Path(path or DEFAULT_MODEL_PATH)
+    mtime = path.stat().st_mtime_ns if path.exists() else None
+    cached = _MODEL_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    model = DEFAULT_MODEL
+    if mtime is not None:
+        with open(path, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+        if model.get('features') != FEATURE_NAMES:
+            print("⚠️  Modelo xG con features distintas, usando el modelo por defecto")
+            model = DEFAULT_MODEL
+    _MODEL_CACHE[path] = (mtime, model)
+    return model
+
+
+def model_version(path=None):
+    """Hash corto del modelo en uso (invalida los xG guardados al reentrenar)"""
+    model = load_model(path)
+    return hashlib.sha1(json.dumps(model, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def score_shots(events, model=None):
+    """Etapa de ingesta: tiros con features y xG puntuado en bloque"""
+    shot_idx, features, goals = extract_shot_features(events)
+    return {
+        'shot_event': shot_idx.astype(np.int32),
+        'shot_team': events['team'][shot_idx],
+        'shot_player': events['player'][shot_idx],
+        'shot_period': events['period'][shot_idx],
+        'shot_time': events['time_s'][shot_idx],
+        'shot_x': events['x'][shot_idx],
+        'shot_y': events['y'][shot_idx],
+        'shot_type': events['type_id'][shot_idx],
+        'shot_goal': goals,
+        'shot_features': features,
+        'shot_xg': predict_xg(features, model)
+    }
+
+
+def _shot_sample(match, arrays):
+    """Map del pipeline: features y goles de los tiros de un partido"""
+    _, features, goals = extract_shot_features(arrays['events'])
+    return features, goals
+
+
+def _append_sample(blocks, match, sample):
+    blocks[0].append(sample[0])
+    blocks[1].append(sample[1])
+    return blocks
+
+
+def train_from_corpus(raw_dir=None, processed_dir=None, output=None, l2=1.0, catalog=None, workers=0,
+                      memory_mb=None):
+    """Entrena el modelo con todos los tiros del catálogo local (streaming: un partido a la vez)"""
+    from ingest import DEFAULT_RAW_DIR, load_catalog
+    raw_dir = raw_dir or DEFAULT_RAW_DIR
+    pipeline = ArchivePipeline(catalog if catalog is not None else load_catalog(raw_dir), ('events',),
+                               raw_dir, processed_dir, workers=workers, memory_mb=memory_mb or PIPELINE_MEMORY_MB)
+    # Solo se retienen las features de los tiros, no los eventos
+    feature_blocks, goal_blocks = pipeline.map(_shot_sample).run(_append_sample, ([], []))
+    pipeline.report()
+    if not feature_blocks or sum(len(g) for g in goal_blocks) == 0:
+        print("⚠️  No hay tiros para entrenar")
+        return None
+    features = np.concatenate(feature_blocks)
+    goals = np.concatenate(goal_blocks)
+    model = fit_logistic(features, goals, l2=l2)
+    output = Path(output or DEFAULT_MODEL_PATH)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(model, f, indent=2)
+    print(f"✅ Modelo xG entrenado con {len(goals)} tiros ({int(goals.sum())} goles) → {output}")
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Modelo xG (regresión logística)')
+    parser.add_argument('--train', action='store_true', help='Entrenar con el corpus local')
+    parser.add_argument('--raw-dir', default=None)
+    parser.add_argument('--processed-dir', default=None)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--l2', type=float, default=1.0)
+    parser.add_argument('--workers', type=int, default=0, help='Procesos para leer el corpus (0 = en este proceso)')
+    args = parser.parse_args()
+    if args.train:
+        train_from_corpus(args.raw_dir, args.processed_dir, args.output, args.l2, workers=args.workers)
+        print("💡 Ejecuta `python ingest.py --stage shots` para re-puntuar los tiros")
+    else:
+        model = load_model()
+        print(f"📈 Modelo xG {model_version()} (entrenado con {model['trained_on']} tiros)")
+        for name, coef in zip(model['features'], model['coef']):
+            print(f"  {name:>20}: {coef:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
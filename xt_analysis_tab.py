@@ -0,0 +1,213 @@
+# xt_analysis_tab.py
+# Pestaña de xT: mapas de calor desde los tensores precalculados (partido o temporada)
+import json
+import streamlit as st
+import pandas as pd
+import numpy as np
+import altair as alt
+import matplotlib.pyplot as plt
+from mplsoccer import Pitch
+
+from ingest import load_stage
+from match_selector import select_match
+from passing_network_tab import scan_data_directories
+from dimensions import resolve_short_names
+from zone_heatmaps import GRIDS, ACTIONS, PERIODS, sum_heatmaps
+from action_values import season_action_xt
+from match_timeline import (flatten_timeline, minute_label, momentum, minute_buckets, sum_timelines,
+                            MOMENTUM_WINDOW, PERIOD_END)
+
+ACTION_LABELS = {'touches': 'Toques', 'passes': 'Pases', 'take_ons': 'Regates',
+                 'defensive': 'Acciones defensivas', 'shots': 'Tiros'}
+TEAM_COLORS = ['red', 'orange']
+KIND_LABELS = {'pass': 'Pases', 'cross': 'Centros', 'take_on': 'Regates', 'carry': 'Conducciones',
+               'recovery': 'Recuperaciones', 'loss': 'Pérdidas', 'total': 'xT total'}
+
+
+def plot_zone_heatmap(matrix, title, ax, cmap='magma'):
+    """Dibuja una matriz gx×gy (coordenadas Opta 0-100) sobre el campo"""
+    pitch = Pitch(pitch_type='custom', pitch_length=105, pitch_width=68,
+                  line_color='white', pitch_color='#0a3d0a', linewidth=2, line_zorder=2)
+    pitch.draw(ax=ax)
+    gx, gy = matrix.shape
+    x_edges = np.linspace(0, 105, gx + 1)
+    y_edges = np.linspace(0, 68, gy + 1)
+    ax.pcolormesh(x_edges, y_edges, matrix.T, cmap=cmap, alpha=0.85, zorder=1,
+                  vmin=min(0.0, float(matrix.min())))
+    ax.set_title(title, fontsize=16, weight='bold', color='white', pad=15)
+
+
+def timeline_frame(timeline, team_names):
+    """Una fila por minuto jugado y equipo: xT, xT acumulado, pases y % de posesión"""
+    frames = []
+    possession = [flatten_timeline(timeline, 'possession', team)[0] for team in range(2)]
+    total_possession = possession[0] + possession[1]
+    for team, team_name in enumerate(team_names):
+        xt, periods, minutes = flatten_timeline(timeline, 'xt', team)
+        share = np.divide(possession[team], total_possession, out=np.full(len(xt), np.nan),
+                          where=total_possession > 0)
+        frames.append(pd.DataFrame({
+            'pos': np.arange(len(xt)),
+            'Minuto': [minute_label(p, m) for p, m in zip(periods, minutes)],
+            'Equipo': team_name,
+            'xT': xt,
+            'xT acumulado': np.cumsum(xt),
+            'Pases': flatten_timeline(timeline, 'passes', team)[0].astype(int),
+            'Posesión': share * 100
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def momentum_chart(timeline, team_names):
+    """xT acumulado por equipo y barras de momentum (xT móvil del local menos el del visitante)"""
+    df = timeline_frame(timeline, team_names)
+    color = alt.Color('Equipo:N', scale=alt.Scale(domain=list(team_names), range=TEAM_COLORS))
+    cumulative = alt.Chart(df).mark_line(interpolate='step-after').encode(
+        x=alt.X('pos:Q', title=None, axis=alt.Axis(labels=False, ticks=False)),
+        y=alt.Y('xT acumulado:Q'),
+        color=color,
+        tooltip=['Minuto', 'Equipo', alt.Tooltip('xT:Q', format='.3f'),
+                 alt.Tooltip('xT acumulado:Q', format='.3f'), 'Pases', alt.Tooltip('Posesión:Q', format='.0f')]
+    ).properties(height=220)
+    values, periods, minutes = momentum(timeline)
+    bars = pd.DataFrame({
+        'pos': np.arange(len(values)),
+        'Minuto': [minute_label(p, m) for p, m in zip(periods, minutes)],
+        'Momentum': values,
+        'Equipo': np.where(values >= 0, team_names[0], team_names[1])
+    })
+    # Marcas cada 15 minutos reglamentarios; el descuento ocupa posiciones propias en el eje
+    ticks = {int(i): f"{m}'" for i, (p, m) in enumerate(zip(periods, minutes))
+             if m % 15 == 0 and m < PERIOD_END[p]}
+    momentum_bars = alt.Chart(bars).mark_bar().encode(
+        x=alt.X('pos:Q', title='Minuto', axis=alt.Axis(values=list(ticks), labelExpr=f"{json.dumps(ticks)}[datum.value]")),
+        y=alt.Y('Momentum:Q', title=f'Momentum (xT {MOMENTUM_WINDOW} min)'),
+        color=color,
+        tooltip=['Minuto', alt.Tooltip('Momentum:Q', format='.3f')]
+    ).properties(height=160)
+    return alt.vconcat(cumulative, momentum_bars).resolve_scale(x='shared')
+
+
+def season_threat_chart(team_names, competition, season):
+    """xT generado y concedido por tramo de 15 minutos, promedio por partido de la temporada"""
+    rows = []
+    for team_name in team_names:
+        for label, against in (('Generado', False), ('Concedido', True)):
+            matrix, n_matches = sum_timelines('xt', team_name, competition, season, against=against)
+            if n_matches == 0:
+                return None
+            buckets, values = minute_buckets(matrix / n_matches)
+            rows.extend({'Equipo': team_name, 'Tramo': b, 'xT': v, 'Tipo': label}
+                        for b, v in zip(buckets, values))
+    df = pd.DataFrame(rows)
+    return alt.Chart(df).mark_bar().encode(
+        x=alt.X('Tramo:N', sort=None, title='Minutos'),
+        xOffset='Tipo:N',
+        y=alt.Y('xT:Q', title='xT por partido'),
+        color=alt.Color('Tipo:N', scale=alt.Scale(domain=['Generado', 'Concedido'], range=['#2ca02c', '#d62728'])),
+        column=alt.Column('Equipo:N', title=None),
+        tooltip=['Equipo', 'Tramo', 'Tipo', alt.Tooltip('xT:Q', format='.3f')]
+    ).properties(width=320, height=220)
+
+
+def show_xt_analysis_tab():
+    """Muestra la pestaña de análisis de Expected Threat"""
+    st.header("📈 Expected Threat Analysis")
+    raw_dir = scan_data_directories()['raw_dir']
+    match = select_match(raw_dir, key='xt')
+    if match is None:
+        return
+    events = load_stage(match, 'events', raw_dir)
+    heatmaps = load_stage(match, 'heatmaps', raw_dir)
+    if events is None or heatmaps is None:
+        st.error("❌ No se pudieron cargar los mapas de calor de este partido")
+        return
+    team_names = list(events['team_names'])[:2]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        scope = st.radio("Alcance:", ["Partido", "Temporada"], horizontal=True, key="xt_scope")
+    with col2:
+        metric = st.selectbox("Mapa:", ['xt'] + list(ACTIONS), key="xt_metric",
+                              format_func=lambda m: 'xT generado' if m == 'xt' else ACTION_LABELS[m])
+    with col3:
+        grid = st.selectbox("Grilla:", list(GRIDS), key="xt_grid",
+                            format_func=lambda g: f"{GRIDS[g][0]}×{GRIDS[g][1]}")
+    with col4:
+        period = st.selectbox("Período:", [None, 1, 2], key="xt_period",
+                              format_func=lambda p: "Partido Completo" if p is None else f"{p}º Tiempo")
+
+    matrices, titles = [], []
+    for team, team_name in enumerate(team_names):
+        if scope == "Partido":
+            period_idx = [PERIODS.index(period)] if period else slice(None)
+            if metric == 'xt':
+                matrix = heatmaps[f'xt_{grid}'][team][period_idx].sum(axis=0)
+            else:
+                matrix = heatmaps[f'counts_{grid}'][team][period_idx][:, ACTIONS.index(metric)].sum(axis=0)
+            title = team_name
+        else:
+            kind = 'xt' if metric == 'xt' else 'counts'
+            matrix, n_matches = sum_heatmaps(kind, grid, team_name=team_name,
+                                             competition=match['competition_full_name'],
+                                             season=match['season'],
+                                             periods=[period] if period else None,
+                                             action=None if metric == 'xt' else metric)
+            if n_matches == 0:
+                st.info("💡 Ejecuta `python ingest.py` para habilitar los mapas de temporada")
+                return
+            matrix = matrix / n_matches
+            title = f"{team_name} (promedio {n_matches} partidos)"
+        matrices.append(matrix.astype(float))
+        titles.append(title)
+
+    fig, axes = plt.subplots(1, len(matrices), figsize=(24, 9), facecolor='#0e1117')
+    for matrix, title, ax in zip(matrices, titles, np.atleast_1d(axes)):
+        plot_zone_heatmap(matrix, title, ax)
+    plt.tight_layout()
+    st.pyplot(fig)
+    plt.close()
+
+    st.subheader("⏱️ Línea de tiempo")
+    if scope == "Partido":
+        timeline = load_stage(match, 'timeline', raw_dir)
+        if timeline is not None:
+            st.altair_chart(momentum_chart(timeline, team_names), use_container_width=True)
+    else:
+        chart = season_threat_chart(team_names, match['competition_full_name'], match['season'])
+        if chart is None:
+            st.info("💡 Ejecuta `python ingest.py` para habilitar las series de temporada")
+        else:
+            st.caption("¿Cuándo generamos peligro? xT promedio por partido en cada tramo")
+            st.altair_chart(chart)
+
+    st.subheader("🎯 Jugadores con mayor xT")
+    player_stats = load_stage(match, 'player_stats', raw_dir)
+    if player_stats is None:
+        return
+    players = pd.DataFrame(player_stats)
+    # xT total = todas las acciones con balón (pases, centros, regates, recuperaciones, pérdidas y carries)
+    players = players[players['period'] == (period or 0)].sort_values('action_xt', ascending=False).head(10)
+    team_lookup = dict(zip(events['team_ids'], events['team_names']))
+    table = pd.DataFrame({
+        'Jugador': resolve_short_names(players['player_id'], players['player_name']),
+        'Equipo': players['team_id'].map(team_lookup),
+        'Pases': players['passes'],
+        'xT pases': players['xt'].map(lambda v: f"{v:.3f}"),
+        'xT total': players['action_xt'].map(lambda v: f"{v:.3f}")
+    })
+    table.insert(0, '#', range(1, len(table) + 1))
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+    if scope == "Temporada":
+        st.subheader("🧮 xT de la temporada por tipo de acción")
+        season_xt = season_action_xt(competition=match['competition_full_name'], season=match['season'])
+        if season_xt is None:
+            st.info("💡 Ejecuta `python ingest.py` para habilitar el xT por acción de la temporada")
+            return
+        top = season_xt.head(15)
+        breakdown = pd.DataFrame({'Jugador': resolve_short_names(top.index, top.index)})
+        for kind, label in KIND_LABELS.items():
+            breakdown[label] = top[kind].to_numpy().round(3)
+        breakdown.insert(0, '#', range(1, len(breakdown) + 1))
+        st.dataframe(breakdown, use_container_width=True, hide_index=True)
@@ -3,6 +3,8 @@ Expected Threat (xT) Calculator
 Basado en Karun Singh's xT model
 """
 
+import hashlib
+
 import numpy as np
 import pandas as pd
 
@@ -18,6 +20,10 @@ XT_MATRIX = np.array([
     [0.00361, 0.00433, 0.00520, 0.00629, 0.00763, 0.00921, 0.01111, 0.01331, 0.01594, 0.01915, 0.02306, 0.02776]
 ]).T
 
+def xt_version():
+    """Huella de la matriz xT (invalida resultados cacheados si cambia)"""
+    return hashlib.sha1(XT_MATRIX.tobytes()).hexdigest()[:12]
+
 def get_xt_value(x, y, grid_width=12, grid_height=8):
     """Obtiene el valor xT para una coordenada"""
     grid_x = int(np.clip(x / 100 * grid_width, 0, grid_width - 1))
@@ -85,3 +91,11 @@ def get_xt_color_intensity(xt_value, max_xt):
         return 0.5
     normalized = xt_value / max_xt
     return 0.3 + (normalized * 0.7)
+
+def get_xt_values(x, y, grid_width=12, grid_height=8):
+    """Versión vectorizada de get_xt_value para arrays de coordenadas"""
+    x = np.nan_to_num(np.asarray(x, dtype=float))
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    grid_x = np.clip((x / 100 * grid_width).astype(int), 0, grid_width - 1)
+    grid_y = np.clip((y / 100 * grid_height).astype(int), 0, grid_height - 1)
+    return XT_MATRIX[grid_x, grid_y]
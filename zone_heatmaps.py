@@ -0,0 +1,138 @@
+"""
+Tensores de mapas de calor por zonas, precalculados por partido.
+Para cada partido se guardan conteos y xT en grillas fijas con forma
+(equipo, período, acción, gx, gy). materialize_heatmaps apila todos los
+partidos en un .npy por grilla (escrito de a una fila, sin juntar el archivo
+en memoria) para sumar temporadas con memory-map, sin recargar eventos.
+index.json (filas y forma de cada .npy) se reemplaza último; las lecturas
+descartan un .npy cuya forma no coincide con el índice.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from match_events import PASS, TAKE_ON, SHOT_TYPES
+from match_stats import DEFENSIVE_ACTION_TYPES
+from possession_chains import CONTROL_TYPES
+from processed_store import (DEFAULT_PROCESSED_DIR, StackedWriter, load_arrays, load_stacked,
+                             load_stacked_index, write_stacked_index)
+from raw_storage import match_key
+from xt_calculator import XT_MATRIX, get_xt_values
+
+# 'xt' coincide con la grilla de XT_MATRIX; 'fine' es una grilla más fina para visualización
+GRIDS = {
+    'xt': XT_MATRIX.shape,
+    'fine': (24, 16),
+}
+ACTIONS = ('touches', 'passes', 'take_ons', 'defensive', 'shots')
+PERIODS = (1, 2, 3, 4)
+N_TEAMS = 2
+
+
+def _action_masks(events):
+    type_id = events['type_id']
+    return [
+        np.isin(type_id, CONTROL_TYPES),
+        type_id == PASS,
+        type_id == TAKE_ON,
+        np.isin(type_id, DEFENSIVE_ACTION_TYPES),
+        np.isin(type_id, SHOT_TYPES),
+    ]
+
+
+def compute_heatmaps(events):
+    """Conteos y xT (pases exitosos, por celda de origen) en cada grilla"""
+    team, period = events['team'], events['period']
+    x, y = np.nan_to_num(events['x']), np.nan_to_num(events['y'])
+    valid = (team >= 0) & (team < N_TEAMS) & np.isin(period, PERIODS)
+    period_idx = np.clip(period.astype(int) - 1, 0, len(PERIODS) - 1)
+    ok_pass = (events['type_id'] == PASS) & events['outcome'] & ~np.isnan(events['end_x'])
+    pass_xt = np.zeros(len(x), dtype=np.float64)
+    pass_xt[ok_pass] = (get_xt_values(events['end_x'][ok_pass], events['end_y'][ok_pass])
+                        - get_xt_values(x[ok_pass], y[ok_pass]))
+    masks = _action_masks(events)
+
+    result = {}
+    for grid, (gx, gy) in GRIDS.items():
+        cx = np.clip((x / 100 * gx).astype(int), 0, gx - 1)
+        cy = np.clip((y / 100 * gy).astype(int), 0, gy - 1)
+        cell = cx * gy + cy
+        n_cells = gx * gy
+        base = (team.astype(int) * len(PERIODS) + period_idx) * len(ACTIONS)
+        counts = np.zeros(N_TEAMS * len(PERIODS) * len(ACTIONS) * n_cells, dtype=np.int64)
+        for a, mask in enumerate(masks):
+            sel = valid & mask
+            flat = (base[sel] + a) * n_cells + cell[sel]
+            counts += np.bincount(flat, minlength=counts.size)
+        sel = valid & ok_pass
+        flat = (team[sel].astype(int) * len(PERIODS) + period_idx[sel]) * n_cells + cell[sel]
+        xt = np.bincount(flat, weights=pass_xt[sel], minlength=N_TEAMS * len(PERIODS) * n_cells)
+        result[f'counts_{grid}'] = counts.reshape(N_TEAMS, len(PERIODS), len(ACTIONS), gx, gy).astype(np.uint16)
+        result[f'xt_{grid}'] = xt.reshape(N_TEAMS, len(PERIODS), gx, gy).astype(np.float32)
+    return result
+
+
+def heatmaps_dir(processed_dir=None):
+    return Path(processed_dir or DEFAULT_PROCESSED_DIR) / 'heatmaps_stacked'
+
+
+def materialize_heatmaps(catalog, processed_dir=None):
+    """Apila los tensores de todos los partidos (una fila por partido-equipo) en .npy por grilla"""
+    keys = [key for grid in GRIDS for key in (f'counts_{grid}', f'xt_{grid}')]
+    rows = []
+    writer = StackedWriter(heatmaps_dir(processed_dir), len(catalog) * N_TEAMS)
+    for match in catalog:
+        match_id = match_key(match)
+        heatmaps = load_arrays('heatmaps', match_id, processed_dir)
+        events = load_arrays('events', match_id, processed_dir) if heatmaps is not None else None
+        if heatmaps is None or events is None:
+            continue
+        for team in range(min(N_TEAMS, len(events['team_ids']))):
+            rows.append({
+                'match_id': match_id,
+                'team_id': str(events['team_ids'][team]),
+                'team_name': str(events['team_names'][team]),
+                'competition': match.get('competition_full_name', ''),
+                'season': str(match.get('season', '')),
+                'date': match.get('date', '')
+            })
+            writer.append({key: heatmaps[key][team] for key in keys})
+    shapes = writer.commit()
+    if not shapes:
+        return 0
+    # El índice va último: hasta acá los lectores siguen con el anterior
+    write_stacked_index(heatmaps_dir(processed_dir), rows, shapes)
+    return len(rows)
+
+
+def load_heatmap_index(processed_dir=None):
+    index = load_stacked_index(heatmaps_dir(processed_dir))
+    return index['rows'] if index is not None else []
+
+
+def sum_heatmaps(kind='xt', grid='xt', team_name=None, competition=None, season=None,
+                 periods=None, action=None, processed_dir=None):
+    """Suma de tensores de varios partidos leyendo solo las filas seleccionadas (memory-map).
+
+    kind: 'counts' o 'xt'. periods: lista de períodos (None = todos).
+    action: nombre en ACTIONS (solo para 'counts'; None = todas).
+    Devuelve (matriz gx×gy, número de partidos sumados).
+    """
+    index, tensor = load_stacked(heatmaps_dir(processed_dir), f'{kind}_{grid}')
+    rows = [i for i, row in enumerate(index)
+            if (team_name is None or row['team_name'] == team_name)
+            and (competition is None or row['competition'] == competition)
+            and (season is None or row['season'] == str(season))]
+    gx, gy = GRIDS[grid]
+    if not rows:
+        return np.zeros((gx, gy)), 0
+    period_idx = [PERIODS.index(p) for p in periods] if periods else slice(None)
+    total = np.zeros((gx, gy))
+    # Suma por bloques de filas para no materializar todo el tensor
+    for start in range(0, len(rows), 256):
+        chunk = tensor[rows[start:start + 256]][:, period_idx]
+        if kind == 'counts':
+            chunk = chunk[:, :, ACTIONS.index(action)] if action else chunk.sum(axis=2)
+        total += chunk.sum(axis=(0, 1))
+    return total, len(rows)